@@ -0,0 +1,161 @@
+"""
+청크 분할 벤치마크: 이전 단락/단어 리스트 기반 split_text와 오프셋 기반 split_text_spans 비교
+
+수 MB 크기의 기획서 형태 텍스트(일반 단락 + 줄바꿈 없는 긴 단락)를 생성해
+분할 시간, 청크 수, 최대 청크 길이, 청크 크기 초과 수, 청크 텍스트 총량(문서 대비)을 측정합니다.
+
+사용 예:
+    python benchmarks/chunking_benchmark.py --sizes-mb 1 4 16 --chunk-size 1000 --chunk-overlap 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from processor.document_processor import split_text_spans
+
+_SENTENCES = [
+    "캐릭터가 무기를 장착하면 공격력이 15% 증가한다.",
+    "세트 효과(2/4/6 부위)가 완성되면 새로운 스킬이 해금된다.",
+    "쿨다운 감소 장비는 선택한 스킬 분류의 재사용 대기시간을 줄인다.",
+    "장착 버튼은 레벨, 직업, 능력치 조건을 확인한 뒤 활성화된다.",
+    "Inventory slots are locked while the equip animation is playing.",
+    "The server rejects the request when the item durability is zero.",
+]
+
+
+def make_text(size_bytes: int, long_paragraph_ratio: float = 0.2, seed: int = 0) -> str:
+    """
+    기획서 형태의 합성 텍스트 생성
+
+    Args:
+        size_bytes: 목표 크기 (UTF-8 바이트)
+        long_paragraph_ratio: 줄바꿈 없는 긴 단락(수천 자, PDF 추출 결과와 같은 형태)의 비율
+        seed: 난수 시드
+
+    Returns:
+        생성한 텍스트
+    """
+    rng = np.random.default_rng(seed)
+    paragraphs, total = [], 0
+    while total < size_bytes:
+        sentences = int(rng.integers(40, 120)) if rng.random() < long_paragraph_ratio else int(rng.integers(1, 6))
+        para = " ".join(_SENTENCES[i] for i in rng.integers(0, len(_SENTENCES), sentences))
+        paragraphs.append(para)
+        total += len(para.encode('utf-8')) + 1
+    return "\n".join(paragraphs)
+
+
+def legacy_split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """이전 split_text 구현 (비교용, 단락/단어 리스트를 다시 만들며 겹침은 근사)"""
+    if not text:
+        return []
+
+    paragraphs = [p for p in text.split('\n') if p.strip()]
+    chunks, current_chunk, current_size = [], [], 0
+    for para in paragraphs:
+        if len(para) > chunk_size:
+            if current_chunk:
+                chunks.append('\n'.join(current_chunk))
+                current_chunk = current_chunk[-1:]
+                current_size = sum(len(p) for p in current_chunk)
+            temp_chunk, temp_size = [], 0
+            for word in para.split():
+                if temp_size + len(word) + 1 > chunk_size:
+                    chunks.append(' '.join(temp_chunk))
+                    overlap_point = max(0, len(temp_chunk) - int(chunk_overlap / 5))
+                    temp_chunk = temp_chunk[overlap_point:]
+                    temp_size = sum(len(w) + 1 for w in temp_chunk)
+                temp_chunk.append(word)
+                temp_size += len(word) + 1
+            if temp_chunk:
+                current_chunk.append(' '.join(temp_chunk))
+                current_size += temp_size
+        elif current_size + len(para) > chunk_size:
+            chunks.append('\n'.join(current_chunk))
+            current_chunk = current_chunk[-1:]
+            current_size = sum(len(p) for p in current_chunk)
+            current_chunk.append(para)
+            current_size += len(para)
+        else:
+            current_chunk.append(para)
+            current_size += len(para)
+    if current_chunk:
+        chunks.append('\n'.join(current_chunk))
+    return chunks
+
+
+def _timed(split, repeats: int):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = split()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def _summary(lengths, seconds: float, text_length: int, chunk_size: int):
+    lengths = np.asarray(lengths)
+    return {
+        'seconds': seconds,
+        'chunks': len(lengths),
+        'max_length': int(lengths.max()) if len(lengths) else 0,
+        'oversized': int((lengths > chunk_size).sum()),
+        'stored_ratio': float(lengths.sum()) / max(text_length, 1),
+    }
+
+
+def run_benchmark(sizes_mb, chunk_size: int, chunk_overlap: int, repeats: int):
+    """
+    크기별 이전/오프셋 분할 비교
+
+    Args:
+        sizes_mb: 측정할 텍스트 크기 목록 (MB)
+        chunk_size: 청크 크기
+        chunk_overlap: 청크 겹침
+        repeats: 반복 횟수 (최소 시간 사용)
+
+    Returns:
+        [(크기 MB, 문자 수, 이전 결과 요약, 오프셋 결과 요약, 오프셋 겹침이 모두 정확한지)]
+    """
+    results = []
+    for size_mb in sizes_mb:
+        text = make_text(int(size_mb * 1024 * 1024))
+        legacy, legacy_time = _timed(lambda: legacy_split_text(text, chunk_size, chunk_overlap), repeats)
+        spans, spans_time = _timed(lambda: split_text_spans(text, chunk_size, chunk_overlap), repeats)
+        exact = all(first_end - next_start == chunk_overlap
+                    for (_, first_end), (next_start, _) in zip(spans, spans[1:]))
+        results.append((size_mb, len(text),
+                        _summary([len(chunk) for chunk in legacy], legacy_time, len(text), chunk_size),
+                        _summary([end - start for start, end in spans], spans_time, len(text), chunk_size),
+                        exact))
+    return results
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="청크 분할 벤치마크 (이전 split_text 대 split_text_spans)")
+    parser.add_argument("--sizes-mb", type=float, nargs='+', default=[1, 4, 16], help="텍스트 크기 목록 (MB)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="청크 크기 (기본값: 1000)")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="청크 겹침 (기본값: 200)")
+    parser.add_argument("--repeats", type=int, default=3, help="반복 횟수 (기본값: 3)")
+    args = parser.parse_args()
+
+    print(f"청크 크기 {args.chunk_size}, 겹침 {args.chunk_overlap}")
+    for size_mb, length, legacy, spans, exact in run_benchmark(args.sizes_mb, args.chunk_size,
+                                                               args.chunk_overlap, args.repeats):
+        print(f"- {size_mb:g} MB ({length:,}자): 이전 {legacy['seconds']:.3f}초 | 오프셋 {spans['seconds']:.3f}초 | "
+              f"{legacy['seconds'] / spans['seconds']:.1f}배")
+        for name, summary in (("이전", legacy), ("오프셋", spans)):
+            print(f"    {name}: 청크 {summary['chunks']:,}개, 최대 {summary['max_length']}자, "
+                  f"크기 초과 {summary['oversized']}개, 청크 텍스트 총량 {summary['stored_ratio']:.2f}배")
+        print(f"    오프셋 겹침 정확히 {args.chunk_overlap}자: {'예' if exact else '아니오'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+임베딩 메모리 레이아웃 벤치마크: 청크별 float 리스트 방식과 공유 float32 행렬 방식 비교
+
+사용 예:
+    python benchmarks/embedding_layout_benchmark.py --chunks 20000 --dim 384
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedding.embedder import get_embedding_matrix
+
+
+def _measure(build):
+    """build()를 실행하면서 (유지 메모리, 최대 메모리, 소요 시간)을 측정"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def run_benchmark(num_chunks: int, dimension: int):
+    """
+    두 레이아웃의 메모리 사용량 비교
+
+    Args:
+        num_chunks: 청크 수
+        dimension: 벡터 차원
+
+    Returns:
+        레이아웃별 측정 결과
+    """
+    rng = np.random.default_rng(0)
+    encoded = rng.random((num_chunks, dimension), dtype=np.float32)
+
+    def list_layout():
+        # 기존 방식: embed_texts().tolist() 후 청크마다 float 리스트, build_vector_db에서 다시 배열화
+        chunks = [{'text': '', 'metadata': {}} for _ in range(num_chunks)]
+        for i, embedding in enumerate(encoded.tolist()):
+            chunks[i]['embedding'] = embedding
+        matrix = np.array([chunk['embedding'] for chunk in chunks], dtype=np.float32)
+        return chunks, matrix
+
+    def matrix_layout():
+        # 현재 방식: 하나의 float32 행렬을 공유하고 청크는 행을 참조
+        chunks = [{'text': '', 'metadata': {}} for _ in range(num_chunks)]
+        matrix = encoded.copy()
+        for i, chunk in enumerate(chunks):
+            chunk['embedding_matrix'] = matrix
+            chunk['embedding_row'] = i
+            chunk['embedding'] = matrix[i]
+        return chunks, get_embedding_matrix(chunks)
+
+    results = {}
+    for name, build in (("list", list_layout), ("matrix", matrix_layout)):
+        _, current, peak, elapsed = _measure(build)
+        results[name] = {'retained_bytes': current, 'peak_bytes': peak, 'seconds': elapsed}
+    return results
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="임베딩 메모리 레이아웃 벤치마크")
+    parser.add_argument("--chunks", type=int, default=20000, help="청크 수 (기본값: 20000)")
+    parser.add_argument("--dim", type=int, default=384, help="벡터 차원 (기본값: 384)")
+    args = parser.parse_args()
+
+    raw_bytes = args.chunks * args.dim * 4
+    print(f"청크 {args.chunks}개, 차원 {args.dim} (원시 행렬 {raw_bytes / 1024 / 1024:.1f} MB)")
+
+    results = run_benchmark(args.chunks, args.dim)
+    for name, r in results.items():
+        print(f"- {name:6s}: 유지 {r['retained_bytes'] / 1024 / 1024:8.1f} MB | "
+              f"최대 {r['peak_bytes'] / 1024 / 1024:8.1f} MB | {r['seconds']:.3f}초")
+
+    ratio = results['list']['retained_bytes'] / max(1, results['matrix']['retained_bytes'])
+    print(f"리스트 방식 대비 행렬 방식 메모리 절감: {ratio:.1f}배")
+
+
+if __name__ == "__main__":
+    main()
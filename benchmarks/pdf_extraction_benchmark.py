@@ -0,0 +1,97 @@
+"""
+PDF 추출 벤치마크: 페이지 수별 순차 추출과 페이지 병렬 추출의 소요 시간 비교
+
+PyMuPDF로 기획서 형태의 텍스트 페이지를 가진 PDF를 생성해 사용합니다.
+
+사용 예:
+    python benchmarks/pdf_extraction_benchmark.py --pages 50 100 300 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from processor.pdf_pages import DEFAULT_PAGES_PER_TASK, default_workers, extract_pages, shutdown_pdf_pools
+
+_LINES = [
+    "Skill system - item equip: equipping a weapon increases attack power by 15%.",
+    "Set effect (2/4/6 pieces) unlocks a new skill when the set is complete.",
+    "Cooldown reduction gear lowers the reuse time of the selected skill category.",
+    "Level, class and stat requirements are checked before the equip button is enabled.",
+]
+
+
+def make_pdf(path: str, page_count: int, lines_per_page: int = 40) -> None:
+    """텍스트 페이지로 구성된 PDF 생성"""
+    with fitz.open() as doc:
+        for page_number in range(page_count):
+            page = doc.new_page()
+            text = "\n".join(f"{page_number + 1}-{i + 1}. {_LINES[i % len(_LINES)]}" for i in range(lines_per_page))
+            page.insert_textbox(fitz.Rect(36, 36, 576, 806), text, fontsize=9)
+        doc.save(path)
+
+
+def _timed(extract, repeats: int):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = extract()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_benchmark(page_counts, workers: int, pages_per_task: int, repeats: int):
+    """
+    페이지 수별 순차/병렬 추출 시간 측정
+
+    Args:
+        page_counts: 측정할 페이지 수 목록
+        workers: 병렬 추출 작업자 수
+        pages_per_task: 작업 하나가 처리할 페이지 수
+        repeats: 반복 횟수 (최소 시간 사용)
+
+    Returns:
+        [(페이지 수, 순차 시간, 병렬 시간, 결과 일치 여부)]
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        # 풀 생성 비용은 첫 요청에서만 발생하므로 미리 생성
+        warmup_path = os.path.join(directory, "warmup.pdf")
+        make_pdf(warmup_path, pages_per_task * 2)
+        extract_pages(warmup_path, pages_per_task * 2, workers=workers, pages_per_task=pages_per_task)
+
+        for page_count in page_counts:
+            path = os.path.join(directory, f"doc_{page_count}.pdf")
+            make_pdf(path, page_count)
+            sequential, sequential_time = _timed(lambda: extract_pages(path, page_count, workers=1), repeats)
+            parallel, parallel_time = _timed(
+                lambda: extract_pages(path, page_count, workers=workers, pages_per_task=pages_per_task), repeats)
+            results.append((page_count, sequential_time, parallel_time, sequential == parallel))
+    shutdown_pdf_pools()
+    return results
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="PDF 페이지 병렬 추출 벤치마크")
+    parser.add_argument("--pages", type=int, nargs='+', default=[10, 50, 100, 300], help="측정할 페이지 수 목록")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="작업자 프로세스 수")
+    parser.add_argument("--pages-per-task", type=int, default=DEFAULT_PAGES_PER_TASK, help="작업당 페이지 수")
+    parser.add_argument("--repeats", type=int, default=3, help="반복 횟수 (기본값: 3)")
+    args = parser.parse_args()
+
+    print(f"작업자 {args.workers}개, 작업당 {args.pages_per_task}페이지 (CPU {os.cpu_count()}개)")
+    for page_count, sequential, parallel, same in run_benchmark(args.pages, args.workers, args.pages_per_task,
+                                                                 args.repeats):
+        print(f"- {page_count:4d}페이지: 순차 {sequential:.3f}초 | 병렬 {parallel:.3f}초 | "
+              f"{sequential / parallel:.2f}배 | 결과 일치 {'예' if same else '아니오'}")
+
+
+if __name__ == "__main__":
+    main()
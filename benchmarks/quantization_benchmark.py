@@ -0,0 +1,214 @@
+"""
+양자화 추론 벤치마크: fp32 임베딩 모델과 동적 int8 양자화 모델의 인코딩 속도와 검색 결과 일치도 비교
+
+모델 파일 없이 실행할 수 있도록 BERT 계열과 같은 구조(nn.Linear 기반 어텐션/FFN)의
+작은 인코더를 로컬에서 생성해 사용합니다.
+
+사용 예:
+    python benchmarks/quantization_benchmark.py --chunks 2000 --queries 200 --threads 1 4
+"""
+
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+import faiss
+import numpy as np
+import torch
+from torch import nn
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedding.lexical_index import tokenize
+from embedding.quantization import load_quantized_model, quantize_model, set_torch_threads
+
+
+class _EncoderLayer(nn.Module):
+    """셀프 어텐션 + FFN (pre-LayerNorm)"""
+
+    def __init__(self, dim: int, heads: int, ffn_dim: int):
+        super().__init__()
+        self.heads = heads
+        self.norm1 = nn.LayerNorm(dim)
+        self.qkv = nn.Linear(dim, dim * 3)
+        self.out = nn.Linear(dim, dim)
+        self.norm2 = nn.LayerNorm(dim)
+        self.ffn = nn.Sequential(nn.Linear(dim, ffn_dim), nn.GELU(), nn.Linear(ffn_dim, dim))
+
+    def forward(self, x: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        batch, length, dim = x.shape
+        q, k, v = self.qkv(self.norm1(x)).view(batch, length, 3, self.heads, -1).permute(2, 0, 3, 1, 4)
+        attention = nn.functional.scaled_dot_product_attention(q, k, v, attn_mask=mask[:, None, None, :])
+        x = x + self.out(attention.transpose(1, 2).reshape(batch, length, dim))
+        return x + self.ffn(self.norm2(x))
+
+
+class TinySentenceEncoder(nn.Module):
+    """토큰 해싱 + 작은 트랜스포머 + 평균 풀링 문장 인코더 (SentenceTransformer.encode 호환)"""
+
+    def __init__(self, vocab_size: int = 8192, dim: int = 256, layers: int = 4, heads: int = 4,
+                 ffn_dim: int = 1024, output_dim: int = 384, max_length: int = 128, seed: int = 0):
+        super().__init__()
+        torch.manual_seed(seed)
+        self.vocab_size = vocab_size
+        self.max_length = max_length
+        self.embedding = nn.Embedding(vocab_size, dim, padding_idx=0)
+        self.layers = nn.ModuleList(_EncoderLayer(dim, heads, ffn_dim) for _ in range(layers))
+        self.norm = nn.LayerNorm(dim)
+        self.projection = nn.Linear(dim, output_dim)
+
+    def _token_ids(self, texts):
+        ids = torch.zeros((len(texts), self.max_length), dtype=torch.long)
+        for row, text in enumerate(texts):
+            tokens = [1 + zlib.crc32(token.encode('utf-8')) % (self.vocab_size - 1)
+                      for token in tokenize(text)[:self.max_length]]
+            if tokens:
+                ids[row, :len(tokens)] = torch.tensor(tokens)
+        return ids[:, :max(1, int((ids != 0).sum(dim=1).max()))]
+
+    def forward(self, ids: torch.Tensor) -> torch.Tensor:
+        mask = ids != 0
+        x = self.embedding(ids)
+        for layer in self.layers:
+            x = layer(x, mask)
+        x = self.norm(x) * mask[..., None]
+        return self.projection(x.sum(dim=1) / mask.sum(dim=1, keepdim=True).clamp(min=1))
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        outputs = []
+        with torch.inference_mode():
+            for start in range(0, len(texts), batch_size):
+                outputs.append(self(self._token_ids(texts[start:start + batch_size])).numpy())
+        return np.concatenate(outputs).astype(np.float32)
+
+
+_SUBJECTS = ["캐릭터", "스킬", "아이템", "장비", "인벤토리", "퀘스트", "보상", "상점", "파티", "길드"]
+_ACTIONS = ["장착하면", "사용하면", "획득하면", "강화하면", "해제하면", "판매하면", "선택하면", "완료하면"]
+_EFFECTS = ["공격력이 증가한다", "쿨다운이 감소한다", "UI에 아이콘이 표시된다", "경험치를 획득한다",
+            "SET_EFFECT가 적용된다", "슬롯이 비활성화된다", "알림 팝업이 출력된다", "골드가 차감된다"]
+
+
+def make_corpus(num_chunks: int, num_queries: int, seed: int = 0):
+    """기획서 문장 형태의 합성 청크와 쿼리 생성"""
+    rng = np.random.default_rng(seed)
+
+    def sentence():
+        return (f"{rng.choice(_SUBJECTS)}을 {rng.choice(_ACTIONS)} {rng.choice(_EFFECTS)}. "
+                f"{rng.choice(_SUBJECTS)} {int(rng.integers(1, 100))}레벨 이상에서 {rng.choice(_EFFECTS)}.")
+
+    chunks = [" ".join(sentence() for _ in range(int(rng.integers(2, 6)))) for _ in range(num_chunks)]
+    queries = [f"{rng.choice(_SUBJECTS)} {rng.choice(_ACTIONS)} {rng.choice(_EFFECTS)}" for _ in range(num_queries)]
+    return chunks, queries
+
+
+def _measure_throughput(model, texts, batch_size: int) -> float:
+    model.encode(texts[:batch_size], batch_size=batch_size)  # 워밍업
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def retrieval_agreement(fp32_chunks, fp32_queries, int8_chunks, int8_queries, top_k: int):
+    """
+    fp32/int8 각각의 코사인 검색 결과 일치도
+
+    Returns:
+        (상위 k 결과 평균 겹침 비율, 1위 일치 비율)
+    """
+    results = []
+    for chunks, queries in ((fp32_chunks, fp32_queries), (int8_chunks, int8_queries)):
+        index = faiss.IndexFlatIP(chunks.shape[1])
+        index.add(_unit(chunks))
+        results.append(index.search(_unit(queries), top_k)[1])
+    overlap = np.mean([len(set(a) & set(b)) / top_k for a, b in zip(*results)])
+    top1 = float(np.mean(results[0][:, 0] == results[1][:, 0]))
+    return float(overlap), top1
+
+
+def run_benchmark(num_chunks: int, num_queries: int, thread_counts, batch_size: int, top_k: int):
+    """
+    fp32/int8 모델 비교
+
+    Args:
+        num_chunks: 인코딩할 청크 수
+        num_queries: 검색 일치도 측정 쿼리 수
+        thread_counts: 측정할 torch 스레드 수 목록
+        batch_size: 인코딩 배치 크기
+        top_k: 일치도 측정 상위 결과 수
+
+    Returns:
+        측정 결과 사전
+    """
+    chunks, queries = make_corpus(num_chunks, num_queries)
+    fp32 = TinySentenceEncoder().eval()
+
+    # 디스크 캐시: 첫 로드는 양자화 후 가중치 저장, 두 번째 로드는 저장된 가중치를 양자화 모듈에 복원
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        load_quantized_model("tiny-encoder", lambda name: copy.deepcopy(fp32), cache_dir=cache_dir)
+        first_load = time.perf_counter() - start
+        start = time.perf_counter()
+        int8 = load_quantized_model("tiny-encoder", lambda name: copy.deepcopy(fp32), cache_dir=cache_dir)
+        cached_load = time.perf_counter() - start
+
+    throughput = {}
+    for threads in thread_counts:
+        set_torch_threads(threads)
+        throughput[threads] = (_measure_throughput(fp32, chunks, batch_size),
+                               _measure_throughput(int8, chunks, batch_size))
+
+    fp32_chunks, int8_chunks = fp32.encode(chunks, batch_size), int8.encode(chunks, batch_size)
+    fp32_queries, int8_queries = fp32.encode(queries, batch_size), int8.encode(queries, batch_size)
+    cosine = float(np.mean(np.sum(_unit(fp32_chunks) * _unit(int8_chunks), axis=1)))
+    overlap, top1 = retrieval_agreement(fp32_chunks, fp32_queries, int8_chunks, int8_queries, top_k)
+
+    def model_bytes(model):
+        return sum(t.numel() * t.element_size() for t in model.state_dict().values() if torch.is_tensor(t))
+
+    return {
+        'throughput': throughput,
+        'cosine': cosine,
+        'overlap': overlap,
+        'top1': top1,
+        'first_load': first_load,
+        'cached_load': cached_load,
+        'fp32_bytes': model_bytes(fp32),
+        'int8_bytes': model_bytes(quantize_model(copy.deepcopy(fp32))),
+    }
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="동적 int8 양자화 임베딩 벤치마크")
+    parser.add_argument("--chunks", type=int, default=2000, help="청크 수 (기본값: 2000)")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수 (기본값: 200)")
+    parser.add_argument("--threads", type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help="측정할 torch 스레드 수 목록")
+    parser.add_argument("--batch-size", type=int, default=32, help="인코딩 배치 크기 (기본값: 32)")
+    parser.add_argument("--top-k", type=int, default=10, help="일치도 측정 상위 결과 수 (기본값: 10)")
+    args = parser.parse_args()
+
+    print(f"청크 {args.chunks}개, 쿼리 {args.queries}개, 양자화 엔진 {torch.backends.quantized.engine}")
+    results = run_benchmark(args.chunks, args.queries, sorted(set(args.threads)), args.batch_size, args.top_k)
+
+    for threads, (fp32_rate, int8_rate) in results['throughput'].items():
+        print(f"- 스레드 {threads:2d}: fp32 {fp32_rate:8.1f} chunks/sec | int8 {int8_rate:8.1f} chunks/sec "
+              f"({int8_rate / fp32_rate:.2f}배)")
+    print(f"모델 크기: fp32 {results['fp32_bytes'] / 1024 / 1024:.1f} MB | "
+          f"int8 {results['int8_bytes'] / 1024 / 1024:.1f} MB")
+    print(f"임베딩 코사인 유사도 평균 (fp32 대 int8): {results['cosine']:.4f}")
+    print(f"검색 일치도: 상위 {args.top_k}개 겹침 {results['overlap']:.1%}, 1위 일치 {results['top1']:.1%}")
+    print(f"양자화 모델 로드: 첫 실행(양자화+저장) {results['first_load']:.3f}초 | "
+          f"캐시 로드 {results['cached_load']:.3f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+압축 인덱스 벤치마크: IndexFlatL2 대비 SQ8 / fp16 / IVF-PQ의 벡터당 크기, 구축 시간, 검색 지연, recall@k 비교
+
+사용 예:
+    python benchmarks/quantized_index_benchmark.py --vectors 100000 --queries 200 --top-k 10 --rerank-factor 4
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedding.index_factory import compare_index_strategies, COMPRESSED_INDEX_TYPES
+from benchmarks.index_strategy_benchmark import make_clustered_vectors
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="압축 인덱스 벤치마크")
+    parser.add_argument("--vectors", type=int, default=100000, help="인덱싱할 벡터 수 (기본값: 100000)")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수 (기본값: 200)")
+    parser.add_argument("--dim", type=int, default=384, help="벡터 차원 (기본값: 384)")
+    parser.add_argument("--top-k", type=int, default=10, help="recall@k의 k (기본값: 10)")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="원본 벡터 재정렬 후보 배수 (0이면 재정렬 안 함)")
+    parser.add_argument("--nprobe", type=int, default=None, help="IVF-PQ nprobe")
+    args = parser.parse_args()
+
+    data = make_clustered_vectors(args.vectors + args.queries, args.dim)
+    embeddings, queries = data[:args.vectors], np.ascontiguousarray(data[args.vectors:])
+
+    report = compare_index_strategies(
+        embeddings, queries, top_k=args.top_k, index_types=COMPRESSED_INDEX_TYPES,
+        index_config={'rerank_factor': args.rerank_factor, 'nprobe': args.nprobe}
+    )
+
+    print(f"벡터 {args.vectors}개, 쿼리 {args.queries}개, 차원 {args.dim}, k={args.top_k}, 재정렬 배수 {args.rerank_factor}")
+    print(f"{'인덱스':8s} {'바이트/벡터':>12s} {'구축(초)':>10s} {'쿼리(ms)':>10s} {'recall@k':>10s}")
+    for row in report:
+        print(f"{row['index_type']:8s} {row['bytes_per_vector']:12.1f} {row['build_seconds']:10.2f} "
+              f"{row['query_ms']:10.3f} {row['recall_at_k']:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+배치 인코딩 모듈: 텍스트를 길이순 버킷으로 나누어 배치 인코딩하고, 선택적으로 프로세스 풀에 분산
+
+길이가 비슷한 텍스트끼리 배치를 구성하면 패딩 낭비가 줄어듭니다.
+결과는 항상 입력 순서대로 반환됩니다.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# 기본 배치 설정
+DEFAULT_BATCH_SIZE = 64
+
+# 작업 프로세스 전역 모델 (프로세스마다 하나씩 로드)
+_worker_model = None
+
+# (모델명, 작업자 수)별로 재사용하는 프로세스 풀
+_pools: Dict[Tuple[str, int], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def length_sorted_batches(texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE) -> List[np.ndarray]:
+    """
+    텍스트를 길이순으로 정렬하여 배치별 원래 위치 배열로 분할
+
+    Args:
+        texts: 텍스트 목록
+        batch_size: 배치당 텍스트 수
+
+    Returns:
+        배치별 원래 위치(int64) 배열 목록
+    """
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    order = np.argsort(lengths, kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), max(1, batch_size))]
+
+
+def _init_worker(model_name: str) -> None:
+    """작업 프로세스 초기화 - 프로세스 전용 모델을 한 번 로드"""
+    global _worker_model
+    try:
+        import torch
+        # 작업자끼리 CPU 코어를 나눠 쓰도록 내부 스레드 수 제한
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+    from embedding.embedder import get_model_registry
+    _worker_model = get_model_registry().get(model_name)
+
+
+def _cache_namespace_in_worker() -> str:
+    return getattr(_worker_model, 'cache_namespace', None)
+
+
+def _encode_in_worker(batch: List[str]) -> np.ndarray:
+    return np.ascontiguousarray(np.atleast_2d(_worker_model.encode(batch, batch_size=len(batch))),
+                                dtype=np.float32)
+
+
+def _get_pool(model_name: str, num_workers: int) -> ProcessPoolExecutor:
+    key = (model_name, num_workers)
+    with _pools_lock:
+        if key not in _pools:
+            # 멀티스레드 프로세스(Streamlit)에서 fork하면 다른 스레드가 잡고 있던 잠금이 복사되어
+            # 작업자가 멈출 수 있으므로 spawn 사용
+            _pools[key] = ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context('spawn'),
+                                              initializer=_init_worker, initargs=(model_name,))
+        return _pools[key]
+
+
+def uses_process_pool(num_workers: int) -> bool:
+    """작업자 수 설정으로 프로세스 풀을 사용할 수 있는지 (CPU 코어가 하나이면 항상 현재 프로세스)"""
+    return min(num_workers, os.cpu_count() or 1) > 1
+
+
+def worker_cache_namespace(model_name: str, num_workers: int) -> str:
+    """
+    작업 프로세스 모델의 임베딩 캐시 이름 (현재 프로세스에 모델을 로드하지 않고 확인)
+
+    Args:
+        model_name: 모델명
+        num_workers: 프로세스 풀 작업자 수
+
+    Returns:
+        모델의 cache_namespace (없으면 모델명)
+    """
+    namespace = _get_pool(model_name, min(num_workers, os.cpu_count() or 1)).submit(_cache_namespace_in_worker).result()
+    return namespace or model_name
+
+
+def shutdown_encoding_pools() -> None:
+    """생성된 인코딩 프로세스 풀을 모두 종료"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True)
+        _pools.clear()
+
+
+def encode_in_batches(load_model: Callable[[], Any], model_name: str, texts: List[str],
+                      batch_size: int = DEFAULT_BATCH_SIZE, num_workers: int = 0) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    길이순 버킷 배치로 텍스트를 인코딩
+
+    Args:
+        load_model: 현재 프로세스에서 사용할 모델(encode 메서드 필요)을 반환하는 함수.
+            프로세스 풀로 인코딩하면 호출하지 않으므로 현재 프로세스에 모델을 로드하지 않음
+        model_name: 작업 프로세스에서 로드할 모델명
+        texts: 인코딩할 텍스트 목록
+        batch_size: 배치당 텍스트 수
+        num_workers: 프로세스 풀 작업자 수 (1 이하이면 현재 프로세스에서 인코딩)
+
+    Returns:
+        (입력 순서의 (텍스트 수, 차원) float32 행렬, 처리 통계)
+    """
+    started = time.perf_counter()
+    batches = length_sorted_batches(texts, batch_size)
+    num_workers = min(num_workers, len(batches), os.cpu_count() or 1)
+
+    if num_workers > 1:
+        pool = _get_pool(model_name, num_workers)
+        results = pool.map(_encode_in_worker, [[texts[i] for i in batch] for batch in batches])
+    else:
+        model = load_model()
+        results = (np.atleast_2d(model.encode([texts[i] for i in batch], batch_size=len(batch)))
+                   for batch in batches)
+
+    embeddings = None
+    for batch, vectors in zip(batches, results):
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[batch] = vectors
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'texts': len(texts),
+        'batches': len(batches),
+        'workers': max(num_workers, 1),
+        'seconds': elapsed,
+        'chunks_per_sec': len(texts) / elapsed if elapsed > 0 else 0.0,
+    }
+    return embeddings, stats
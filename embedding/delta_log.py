@@ -0,0 +1,111 @@
+"""
+델타 로그 모듈: 벡터 DB에 대한 문서 단위 추가/삭제를 작은 바이너리 로그로 기록
+
+레코드 형식 (리틀 엔디안)
+- 헤더: 연산(1바이트, b'A' 추가 / b'R' 삭제), 청크 ID(int64), 벡터 차원(uint32), JSON 길이(uint32)
+- 본문: float32 벡터 (차원 x 4바이트) + UTF-8 JSON {'text', 'metadata'}
+"""
+
+import json
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DELTA_LOG_FILE = "delta.log"
+
+OP_ADD = b'A'
+OP_REMOVE = b'R'
+
+_HEADER = struct.Struct('<cqII')
+
+
+class DeltaLog:
+    """faiss_index.bin/metadata.sqlite 스냅샷 이후의 변경 사항을 누적하는 추가 전용 로그"""
+
+    def __init__(self, persist_directory: str):
+        """
+        델타 로그 초기화
+
+        Args:
+            persist_directory: 벡터 DB 저장 경로
+        """
+        self.path = os.path.join(persist_directory, DELTA_LOG_FILE)
+
+    @property
+    def size_bytes(self) -> int:
+        """현재 로그 크기 (바이트)"""
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _append(self, payload: bytes) -> None:
+        with open(self.path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append_add(self, ids: np.ndarray, vectors: np.ndarray, texts: List[str],
+                   metadatas: List[Dict[str, Any]]) -> None:
+        """
+        청크 추가 기록
+
+        Args:
+            ids: 청크 ID 배열
+            vectors: (청크 수, 차원) float32 행렬
+            texts: 청크 텍스트 목록
+            metadatas: 청크 메타데이터 목록
+        """
+        vectors = np.ascontiguousarray(vectors, dtype='<f4')
+        parts = []
+        for chunk_id, vector, text, metadata in zip(ids, vectors, texts, metadatas):
+            body = json.dumps({'text': text, 'metadata': metadata}, ensure_ascii=False).encode('utf-8')
+            parts.append(_HEADER.pack(OP_ADD, int(chunk_id), vector.shape[0], len(body)))
+            parts.append(vector.tobytes())
+            parts.append(body)
+        self._append(b''.join(parts))
+
+    def append_remove(self, ids: np.ndarray) -> None:
+        """
+        청크 삭제 기록
+
+        Args:
+            ids: 삭제할 청크 ID 배열
+        """
+        self._append(b''.join(_HEADER.pack(OP_REMOVE, int(chunk_id), 0, 0) for chunk_id in ids))
+
+    def replay(self) -> Iterator[Tuple[bytes, int, Optional[np.ndarray], Optional[Dict[str, Any]]]]:
+        """
+        기록된 레코드를 순서대로 반환
+
+        마지막 레코드가 중간에 잘린 경우(쓰기 도중 중단) 해당 레코드는 무시합니다.
+
+        Yields:
+            (연산, 청크 ID, 벡터 또는 None, {'text', 'metadata'} 또는 None)
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            op, chunk_id, dimension, body_len = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + dimension * 4 + body_len
+            if end > len(data):
+                print(f"델타 로그 끝부분이 손상되어 무시합니다: {self.path}")
+                break
+
+            vector = None
+            record = None
+            if op == OP_ADD:
+                vector_start = offset + _HEADER.size
+                vector = np.frombuffer(data, dtype='<f4', count=dimension, offset=vector_start)
+                record = json.loads(data[vector_start + dimension * 4:end].decode('utf-8'))
+            yield op, chunk_id, vector, record
+            offset = end
+
+    def truncate(self) -> None:
+        """스냅샷에 병합된 로그 제거"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
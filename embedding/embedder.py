@@ -3,9 +3,10 @@
 """
 
 import os
-from typing import List, Dict, Any
+import hashlib
+import shutil
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 import numpy as np
-import pickle
 import faiss
 import torch
 import sys
@@ -87,76 +88,199 @@ try:
     
 except ImportError as e:
     print(f"패치 모듈 가져오기 오류: {e}")
-    # 스텁 구현
-    import numpy as np
-    class SentenceTransformer:
+    # 해시 n-gram 임베딩 기반 로컬 구현
+    from embedding.hashing_embedder import HashingEmbedder
+    class SentenceTransformer(HashingEmbedder):
         def __init__(self, model_name_or_path=None, **kwargs):
+            super().__init__()
             self.model_name = model_name_or_path
-            print(f"[로컬 임베딩 스텁] SentenceTransformer 모델 '{model_name_or_path}' 로드")
-            
-        def encode(self, sentences, **kwargs):
-            print(f"[로컬 임베딩 스텁] 텍스트 {len(sentences) if isinstance(sentences, list) else 1}개 인코딩")
-            # 재현 가능한 임의 임베딩 벡터 생성
-            np.random.seed(42)
-            
-            # 입력 텍스트에 따라 다른 벡터 생성 (의미적 차이 유지)
-            if isinstance(sentences, list):
-                vectors = []
-                for text in sentences:
-                    # 텍스트 기반 해시 시드
-                    text_seed = sum(ord(c) for c in str(text)[:100]) % 10000
-                    np.random.seed(text_seed)
-                    vectors.append(np.random.rand(384).astype(np.float32))
-                return np.array(vectors)
-            else:
-                text_seed = sum(ord(c) for c in str(sentences)[:100]) % 10000
-                np.random.seed(text_seed)
-                return np.random.rand(384).astype(np.float32)
+            print(f"[로컬 해시 임베딩] SentenceTransformer 모델 '{model_name_or_path}' 로드")
+
+from embedding.model_registry import ModelRegistry
+from embedding.query_cache import QueryEmbeddingCache
+from embedding.batch_encoding import DEFAULT_BATCH_SIZE, encode_in_batches, uses_process_pool, worker_cache_namespace
+from embedding.embedding_cache import DEFAULT_CACHE_DIR, get_embedding_cache, normalize_text, text_key
+from embedding.index_factory import (create_index, apply_search_params, save_index_params, load_index_params,
+                                     supports_remove, prepare_vectors, scores_to_distances, is_hnsw_index,
+                                     make_filtered_search_params, IVF_INDEX_TYPES, METRIC_COSINE, METRIC_L2)
+from embedding.metadata_filter import matches_filters
+from embedding.lexical_index import BM25Index
+from embedding.mmr import MMR_CANDIDATE_FACTOR, mmr_select, relevance_from_distances, relevance_from_query
+from embedding.metadata_store import MetadataStore, METADATA_DB_FILE, metadata_store_exists, migrate_pickle_metadata
+from embedding.delta_log import DeltaLog, OP_ADD
+from embedding.exact_vectors import (ExactVectors, exact_vectors_exist, write_exact_vectors, rerank_exact,
+                                     EXACT_IDS_FILE, EXACT_VECTORS_FILE)
+from embedding.snapshots import begin_snapshot, publish_snapshot, snapshot_directory, current_version
+from embedding.search_client import ServerBusyError, get_search_client
+from embedding.quantization import load_quantized_model, quantized_model_name, set_torch_threads, split_quantized_name
+
+def _load_model(model_name: str):
+    """레지스트리 로더 - '@int8'로 끝나는 이름은 동적 int8 양자화 모델 (디스크 캐시 사용)"""
+    base_name, quantized = split_quantized_name(model_name)
+    if quantized:
+        return load_quantized_model(base_name, lambda name: SentenceTransformer(name))
+    return SentenceTransformer(model_name)
+
+# 프로세스 전역 모델 레지스트리 - Embedder, 검색 함수, RAG 엔진이 공유
+_model_registry = ModelRegistry(loader=_load_model)
+
+def get_model_registry() -> ModelRegistry:
+    """프로세스 전역 임베딩 모델 레지스트리 반환"""
+    return _model_registry
+
+def get_model_registry_stats() -> Dict[str, Any]:
+    """모델 레지스트리 적중/로드/제거 통계 반환"""
+    return _model_registry.stats()
+
+# 프로세스 전역 쿼리 임베딩 캐시 - 같은 쿼리의 반복 인코딩 방지
+_query_cache = QueryEmbeddingCache()
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """프로세스 전역 쿼리 임베딩 캐시 반환"""
+    return _query_cache
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """쿼리 임베딩 캐시 적중/미적중/무효화 통계 반환"""
+    return _query_cache.stats()
 
 class Embedder:
     """텍스트 임베딩 처리 클래스"""
     
-    def __init__(self, model_name: str = DEFAULT_MODEL_NAME):
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = DEFAULT_BATCH_SIZE,
+                 num_workers: int = 0, quantize: bool = False, num_threads: Optional[int] = None):
         """
         임베딩 처리기 초기화
         
         Args:
-            model_name: 사용할 임베딩 모델명
+            model_name: 사용할 임베딩 모델명 ('@int8'로 끝나면 양자화 모델)
+            batch_size: 인코딩 배치당 텍스트 수
+            num_workers: 인코딩 프로세스 풀 작업자 수 (0이면 현재 프로세스에서 인코딩)
+            quantize: True이면 선형 계층을 동적 int8로 양자화한 모델 사용 (CPU 전용).
+                model_name이 '모델명@int8'로 바뀌므로 벡터 DB 검색에도 같은 이름을 사용해야 함
+            num_threads: torch 연산 내부 스레드 수 (None이면 torch 기본값, 프로세스 전역 설정)
         """
+        self.model_name = quantized_model_name(model_name) if quantize else model_name
+        set_torch_threads(num_threads)
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.last_encode_stats: Dict[str, Any] = {}
+        self._model = None
+        self.model_generation = 0
+        # 검색 서버를 사용하면 쿼리 인코딩을 서버가 처리하고, 프로세스 풀을 사용하면 작업자가
+        # 모델을 로드하므로 현재 프로세스의 모델은 처음 필요할 때 로드
+        if get_search_client() is None and not uses_process_pool(num_workers):
+            self._load_model()
+    
+    def _load_model(self) -> None:
         try:
-            self.model = SentenceTransformer(model_name)
-            print(f"임베딩 모델 '{model_name}' 로드 완료")
+            is_loaded = self.model_name in _model_registry
+            self._model = _model_registry.get(self.model_name)
+            self.model_generation = _model_registry.generation(self.model_name)
+            if not is_loaded:
+                print(f"임베딩 모델 '{self.model_name}' 로드 완료")
         except Exception as e:
             print(f"임베딩 모델 초기화 오류: {e}")
             raise
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    @property
+    def model(self):
+        """임베딩 모델 (아직 로드하지 않았으면 로드)"""
+        if self._model is None:
+            self._load_model()
+        return self._model
+    
+    @property
+    def cache_namespace(self) -> str:
+        """임베딩 캐시 이름 (해시 임베딩처럼 모델명과 무관한 백엔드는 모델이 지정한 이름)"""
+        if self._model is None and uses_process_pool(self.num_workers):
+            return worker_cache_namespace(self.model_name, self.num_workers)
+        return getattr(self.model, 'cache_namespace', self.model_name)
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
         텍스트 목록을 임베딩 벡터로 변환
         
+        길이가 비슷한 텍스트끼리 배치를 구성해 인코딩하고 결과는 입력 순서대로 반환합니다.
+        처리량은 last_encode_stats에 기록됩니다.
+        
         Args:
             texts: 임베딩할 텍스트 목록
             
         Returns:
-            임베딩 벡터 목록
+            (텍스트 수, 차원) 형태의 연속 float32 행렬
         """
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
             
         try:
-            embeddings = self.model.encode(texts)
-            return embeddings.tolist()
+            embeddings, self.last_encode_stats = encode_in_batches(
+                lambda: self.model, self.model_name, texts, batch_size=self.batch_size,
+                num_workers=self.num_workers)
+            return embeddings
         except Exception as e:
             print(f"텍스트 임베딩 오류: {e}")
             raise
 
-def create_embeddings(chunks: List[Dict[str, Any]], model_name: str = DEFAULT_MODEL_NAME) -> List[Dict[str, Any]]:
+    def embed_queries(self, queries: List[str], use_cache: bool = True) -> np.ndarray:
+        """
+        쿼리 목록을 임베딩 벡터로 변환 (쿼리 캐시에 없는 쿼리만 인코딩)
+        
+        Args:
+            queries: 임베딩할 쿼리 목록
+            use_cache: 쿼리 임베딩 캐시 사용 여부
+            
+        Returns:
+            (쿼리 수, 차원) 형태의 연속 float32 행렬
+        """
+        client = get_search_client()
+        if client is not None and queries:
+            # 검색 서버가 다른 요청과 모아 한 번에 인코딩 (서버 캐시 사용)
+            try:
+                return client.encode(self.model_name, queries)
+            except (OSError, ConnectionError, ServerBusyError) as e:
+                print(f"검색 서버 인코딩 실패, 현재 프로세스에서 인코딩합니다: {e}")
+        
+        if not use_cache or not queries:
+            return self.embed_texts(queries)
+        if self._model is None and not uses_process_pool(self.num_workers):
+            self._load_model()
+        
+        cached = _query_cache.lookup(self.model_name, self.model_generation, queries)
+        miss_positions = [i for i, vector in enumerate(cached) if vector is None]
+        if not miss_positions:
+            return np.ascontiguousarray(np.stack(cached), dtype=np.float32)
+        
+        # 미적중 쿼리는 정규화 기준으로 중복 제거 후 한 번에 인코딩
+        unique = {}
+        for i in miss_positions:
+            unique.setdefault(normalize_text(queries[i]), queries[i])
+        new_queries = list(unique.values())
+        new_vectors = self.embed_texts(new_queries)
+        _query_cache.store(self.model_name, self.model_generation, new_queries, new_vectors)
+        
+        row_of = {key: row for row, key in enumerate(unique)}
+        embeddings = np.empty((len(queries), new_vectors.shape[1]), dtype=np.float32)
+        for i, vector in enumerate(cached):
+            embeddings[i] = new_vectors[row_of[normalize_text(queries[i])]] if vector is None else vector
+        return embeddings
+
+def create_embeddings(chunks: List[Dict[str, Any]], model_name: str = DEFAULT_MODEL_NAME,
+                      use_cache: bool = True, cache_dir: str = DEFAULT_CACHE_DIR,
+                      batch_size: int = DEFAULT_BATCH_SIZE, num_workers: int = 0) -> List[Dict[str, Any]]:
     """
     청크 리스트를 임베딩하여 벡터 정보 추가
     
+    모든 벡터는 하나의 연속 float32 행렬에 저장되며, 각 청크는
+    'embedding_matrix'(공유 행렬)와 'embedding_row'(행 번호)로 자신의 벡터를 참조합니다.
+    'embedding'에는 해당 행의 뷰가 들어가므로 파이썬 float 리스트가 만들어지지 않습니다.
+    
     Args:
         chunks: 텍스트 청크 리스트
         model_name: 사용할 임베딩 모델명
+        use_cache: 디스크 임베딩 캐시 사용 여부
+        cache_dir: 임베딩 캐시 디렉토리
+        batch_size: 인코딩 배치당 텍스트 수
+        num_workers: 인코딩 프로세스 풀 작업자 수 (0이면 현재 프로세스에서 인코딩)
         
     Returns:
         임베딩 벡터가 추가된 청크 리스트
@@ -164,23 +288,233 @@ def create_embeddings(chunks: List[Dict[str, Any]], model_name: str = DEFAULT_MO
     if not chunks:
         return []
         
-    embedder = Embedder(model_name)
+    embedder = Embedder(model_name, batch_size=batch_size, num_workers=num_workers)
     texts = [chunk['text'] for chunk in chunks]
-    embeddings = embedder.embed_texts(texts)
     
-    # 청크에 임베딩 추가
-    for i, embedding in enumerate(embeddings):
-        chunks[i]['embedding'] = embedding
+    if not use_cache:
+        embeddings = embedder.embed_texts(texts)
+    else:
+        # 캐시에 없는 청크만 모델로 인코딩
+        # 해시 임베딩처럼 모델명과 무관한 백엔드는 별도 이름으로 캐시를 분리
+        cache = get_embedding_cache(embedder.cache_namespace, cache_dir)
+        embeddings, hit_mask = cache.lookup(texts)
+        miss_positions = np.flatnonzero(~hit_mask)
+        
+        if len(miss_positions) > 0:
+            # 같은 내용의 청크는 한 번만 인코딩
+            unique_texts = {}
+            for pos in miss_positions:
+                unique_texts.setdefault(normalize_text(texts[pos]), texts[pos])
+            new_texts = list(unique_texts.values())
+            new_vectors = embedder.embed_texts(new_texts)
+            cache.store(new_texts, new_vectors)
+            
+            if embeddings is None:
+                embeddings = np.zeros((len(texts), new_vectors.shape[1]), dtype=np.float32)
+            row_of = {normalize_text(text): i for i, text in enumerate(new_texts)}
+            embeddings[miss_positions] = new_vectors[[row_of[normalize_text(texts[pos])] for pos in miss_positions]]
+        
+        cache.flush()
+        print(f"임베딩 캐시 적중률: {cache.last_run['hit_ratio']:.1%} "
+              f"(적중 {cache.last_run['hits']}개, 신규 인코딩 {cache.last_run['misses']}개)")
+    
+    if embedder.last_encode_stats:
+        stats = embedder.last_encode_stats
+        print(f"임베딩 인코딩: {stats['texts']}개, {stats['chunks_per_sec']:.1f} chunks/sec "
+              f"(배치 {stats['batches']}개, 작업자 {stats['workers']}개)")
+    
+    # 청크는 공유 행렬의 행을 참조
+    for i, chunk in enumerate(chunks):
+        chunk['embedding_matrix'] = embeddings
+        chunk['embedding_row'] = i
+        chunk['embedding'] = embeddings[i]
     
     return chunks
 
-def build_vector_db(chunks: List[Dict[str, Any]], persist_directory: str) -> Dict:
+def get_embedding_matrix(chunks: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    청크 목록에 대응하는 (청크 수, 차원) float32 행렬 반환
+    
+    create_embeddings가 만든 청크가 순서대로 주어지면 공유 행렬을 복사 없이 그대로 반환합니다.
+    일부만 선택되었거나 순서가 바뀐 경우 한 번의 행 인덱싱으로, 이전 형식(float 리스트)은
+    스택하여 행렬을 만듭니다.
+    
+    Args:
+        chunks: 임베딩 벡터가 포함된 청크 리스트
+        
+    Returns:
+        연속 float32 임베딩 행렬
+    """
+    matrix = chunks[0].get('embedding_matrix')
+    if matrix is not None and all(chunk.get('embedding_matrix') is matrix for chunk in chunks):
+        rows = np.fromiter((chunk['embedding_row'] for chunk in chunks), dtype=np.int64, count=len(chunks))
+        if len(rows) == len(matrix) and np.array_equal(rows, np.arange(len(rows))):
+            return np.ascontiguousarray(matrix, dtype=np.float32)
+        return np.ascontiguousarray(matrix[rows], dtype=np.float32)
+    
+    return np.ascontiguousarray(np.vstack([np.asarray(chunk['embedding'], dtype=np.float32) for chunk in chunks]))
+
+# 벡터 DB 파일명
+INDEX_FILE = "faiss_index.bin"
+METADATA_FILE = METADATA_DB_FILE
+
+# 델타 로그가 이 크기를 넘으면 스냅샷(faiss_index.bin/metadata.sqlite)에 병합
+DELTA_MERGE_BYTES = 16 * 1024 * 1024
+
+# 스트리밍 색인 시 한 번에 임베딩/색인할 청크 수
+DEFAULT_STREAM_BATCH_SIZE = 256
+
+# HNSW는 선택자로 걸러낸 그래프 탐색의 재현율이 낮으므로, 필터 결과가 이 수 이하면 직접 계산
+FILTER_BRUTE_FORCE_MAX = 50000
+
+# 검색 방식: 벡터, 키워드(BM25), 두 순위의 융합(RRF)
+SEARCH_MODE_VECTOR = 'vector'
+SEARCH_MODE_LEXICAL = 'lexical'
+SEARCH_MODE_FUSED = 'fused'
+SEARCH_MODES = (SEARCH_MODE_VECTOR, SEARCH_MODE_LEXICAL, SEARCH_MODE_FUSED)
+
+# 순위 융합 상수와, 융합 전에 각 검색기에서 가져올 후보 배수
+RRF_K = 60
+FUSION_CANDIDATE_FACTOR = 4
+
+def make_chunk_ids(chunks: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    (파일명, 청크 내용 해시)로부터 고정 청크 ID 생성
+    
+    같은 문서 안에 내용이 같은 청크가 여러 개 있으면 등장 순서로 구분합니다.
+    
+    Args:
+        chunks: 텍스트 청크 리스트
+        
+    Returns:
+        int64 청크 ID 배열
+    """
+    ids = np.empty(len(chunks), dtype=np.int64)
+    occurrences = {}
+    for i, chunk in enumerate(chunks):
+        metadata = chunk.get('metadata', {})
+        file_key = str(metadata.get('file_name') or metadata.get('source') or '').encode('utf-8')
+        base = file_key + b'\0' + text_key(chunk['text'])
+        occurrence = occurrences.get(base, 0)
+        occurrences[base] = occurrence + 1
+        digest = hashlib.blake2b(base + occurrence.to_bytes(4, 'little'), digest_size=8).digest()
+        ids[i] = int.from_bytes(digest, 'little') & 0x7FFFFFFFFFFFFFFF
+    return ids
+
+def _snapshot_directory(vector_db: Dict) -> str:
+    """벡터 DB가 읽고 있는 스냅샷 버전 디렉토리"""
+    return vector_db.get('snapshot_directory') or vector_db['persist_directory']
+
+def _metadata_store(vector_db: Dict) -> MetadataStore:
+    """벡터 DB의 SQLite 메타데이터 저장소 반환 (처음 사용할 때 열기)"""
+    if vector_db.get('metadata_store') is None:
+        vector_db['metadata_store'] = MetadataStore(_snapshot_directory(vector_db))
+    return vector_db['metadata_store']
+
+def _present_ids(vector_db: Dict, ids: Iterable[int]) -> Set[int]:
+    """
+    청크 ID 중 벡터 DB에 있는 ID 조회
+    
+    스냅샷 저장소는 공개된 버전이라 수정하지 않으므로, 스냅샷 이후 추가/삭제된 청크
+    (pending_added/pending_removed)를 먼저 확인하고 나머지만 저장소에서 조회합니다.
+    """
+    added, removed = vector_db['pending_added'], vector_db['pending_removed']
+    ids = [int(chunk_id) for chunk_id in ids]
+    present = {chunk_id for chunk_id in ids if chunk_id in added}
+    stored = [chunk_id for chunk_id in ids if chunk_id not in added and chunk_id not in removed]
+    if stored and vector_db.get('metadata_store') is not None:
+        present |= vector_db['metadata_store'].existing_ids(stored)
+    return present
+
+def _iter_live_records(vector_db: Dict) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """현재 청크 전체를 (청크 ID, 텍스트, 메타데이터)로 순회 (스냅샷 저장소 행 + 스냅샷 이후 추가된 청크)"""
+    added, removed = vector_db['pending_added'], vector_db['pending_removed']
+    if vector_db.get('metadata_store') is not None:
+        for chunk_id, text, metadata in vector_db['metadata_store'].iter_records():
+            if chunk_id not in removed and chunk_id not in added:
+                yield chunk_id, text, metadata
+    for chunk_id, (text, metadata) in added.items():
+        yield chunk_id, text, metadata
+
+def _link_or_copy(source: str, target: str) -> None:
+    """바뀌지 않은 파일은 이전 버전과 하드 링크로 공유 (지원하지 않으면 복사)"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def _write_snapshot(vector_db: Dict, exact_data: Optional[tuple] = None) -> None:
+    """
+    인덱스, 검색 파라미터, 메타데이터를 새 버전 디렉토리에 모두 쓰고 fsync한 뒤 CURRENT 포인터 교체
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+        exact_data: 새로 구축할 때의 (청크 ID, 원본 벡터) - 재정렬용 원본 벡터 파일로 기록
+    """
+    persist_directory = vector_db['persist_directory']
+    previous_directory = _snapshot_directory(vector_db) if vector_db.get('snapshot_directory') else None
+    version, version_dir = begin_snapshot(persist_directory)
+    
+    try:
+        faiss.write_index(vector_db['index'], os.path.join(version_dir, INDEX_FILE))
+        
+        # 키워드 검색용 BM25 색인 (이전 저장소 + 변경 사항 기준이므로 저장소를 바꾸기 전에 구함)
+        get_lexical_index(vector_db).save(version_dir)
+        
+        # 메타데이터 저장소는 이전 버전을 복사한 뒤 스냅샷 이후 삭제/추가된 행만 반영
+        added = vector_db['pending_added']
+        previous_store = vector_db.get('metadata_store')
+        store = previous_store.copy_to(version_dir) if previous_store is not None else MetadataStore(version_dir)
+        try:
+            store.delete(vector_db['pending_removed'])
+            store.upsert(list(added), [text for text, _ in added.values()], [meta for _, meta in added.values()])
+            
+            # 압축 인덱스 재정렬용 원본 벡터 - 추가/삭제가 없었으면 이전 버전 파일 공유
+            exact_vectors = vector_db.get('exact_vectors')
+            if exact_data is not None:
+                write_exact_vectors(version_dir, exact_data[0], exact_data[1])
+            elif exact_vectors is not None:
+                unchanged = not exact_vectors.pending and len(exact_vectors.ids) == len(store)
+                if unchanged and previous_directory and exact_vectors_exist(previous_directory):
+                    for name in (EXACT_IDS_FILE, EXACT_VECTORS_FILE):
+                        _link_or_copy(os.path.join(previous_directory, name), os.path.join(version_dir, name))
+                else:
+                    ids = np.asarray(store.all_ids(), dtype=np.int64)
+                    vectors, found = exact_vectors.get(ids)
+                    write_exact_vectors(version_dir, ids[found], vectors[found])
+        finally:
+            store.close()
+        
+        vector_db['index_params']['count'] = int(vector_db['index'].ntotal)
+        save_index_params(version_dir, vector_db['index_params'])
+    except Exception:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    
+    publish_snapshot(persist_directory, version)
+    
+    # 이후 읽기/쓰기는 새 버전 파일 사용 (이전 버전은 고정한 리더가 계속 읽을 수 있음)
+    vector_db['version'] = version
+    vector_db['snapshot_directory'] = version_dir
+    vector_db['index_path'] = os.path.join(version_dir, INDEX_FILE)
+    vector_db['metadata_path'] = os.path.join(version_dir, METADATA_FILE)
+    if vector_db.get('metadata_store') is not None:
+        vector_db['metadata_store'].close()
+    vector_db['metadata_store'] = MetadataStore(version_dir)
+    vector_db['pending_added'] = {}
+    vector_db['pending_removed'] = set()
+    if exact_data is not None or exact_vectors is not None:
+        vector_db['exact_vectors'] = ExactVectors(version_dir)
+
+def build_vector_db(chunks: List[Dict[str, Any]], persist_directory: str,
+                    index_config: Optional[Dict[str, Any]] = None) -> Dict:
     """
     임베딩된 청크를 사용하여 FAISS 벡터 DB 구축
     
     Args:
         chunks: 임베딩 벡터가 포함된 청크 리스트
         persist_directory: 벡터 DB 저장 경로
+        index_config: 인덱스 설정 (index_type: auto/flat/ivf/hnsw, nprobe, ef_search 등)
         
     Returns:
         검색에 필요한 정보를 포함한 사전
@@ -191,102 +525,1094 @@ def build_vector_db(chunks: List[Dict[str, Any]], persist_directory: str) -> Dic
     # 지정된 디렉토리가 없으면 생성
     os.makedirs(persist_directory, exist_ok=True)
     
-    # 벡터와 텍스트 준비
-    texts = [chunk['text'] for chunk in chunks]
-    embeddings = np.array([chunk['embedding'] for chunk in chunks], dtype=np.float32)
+    # 벡터 준비
+    embeddings = get_embedding_matrix(chunks)
+    ids = make_chunk_ids(chunks)
+    for chunk, chunk_id in zip(chunks, ids):
+        chunk['vector_id'] = int(chunk_id)
     
     # 벡터 차원 확인
     dimension = embeddings.shape[1]
     
-    # FAISS 인덱스 생성
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
-    
-    # 저장 경로
-    index_path = os.path.join(persist_directory, "faiss_index.bin")
-    faiss.write_index(index, index_path)
+    # 코퍼스 크기/설정에 맞는 ID 매핑 FAISS 인덱스 생성
+    index, index_params = create_index(embeddings, index_config, ids=ids)
+    print(f"FAISS 인덱스 구축 완료: {index_params['index_type']} (벡터 {index.ntotal}개)")
     
-    # 메타데이터와 텍스트 저장
-    metadata = {
-        'texts': texts,
-        'metadatas': [chunk.get('metadata', {}) for chunk in chunks],
+    # 텍스트와 메타데이터는 스냅샷의 SQLite 저장소에 기록할 추가 청크로 전달
+    vector_db = {
+        'index': index,
+        'dimension': dimension,
+        'index_params': index_params,
+        'persist_directory': persist_directory,
+        'deleted_ids': set(),
+        'pending_added': {int(chunk_id): (chunk['text'], chunk.get('metadata', {}))
+                          for chunk, chunk_id in zip(chunks, ids)},
+        'pending_removed': set(),
     }
     
-    metadata_path = os.path.join(persist_directory, "metadata.pkl")
-    with open(metadata_path, 'wb') as f:
-        pickle.dump(metadata, f)
+    # 압축 인덱스는 상위 후보 재정렬을 위해 원본 벡터를 별도 파일로 보관
+    exact_data = (ids, prepare_vectors(embeddings, index_params)) if index_params.get('rerank_factor') else None
+    
+    # 새 버전으로 전체 스냅샷 저장 후 이전 델타 로그 제거
+    _write_snapshot(vector_db, exact_data)
+    DeltaLog(persist_directory).truncate()
     
     # 검색에 필요한 정보 반환
-    return {
-        'index': index,
-        'index_path': index_path,
-        'metadata': metadata,
-        'metadata_path': metadata_path,
-        'dimension': dimension
-    }
+    return vector_db
 
-def load_vector_db(persist_directory: str) -> Dict:
+def load_vector_db(persist_directory: str, mmap: bool = False) -> Dict:
     """
     저장된 FAISS 벡터 DB 로드
     
+    스냅샷 이후 델타 로그에 기록된 추가/삭제도 함께 반영합니다. 텍스트/메타데이터는
+    메모리에 올리지 않고 검색 결과로 반환되는 행만 SQLite 저장소에서 읽습니다.
+    mmap=True이면 인덱스 파일도 메모리 맵으로 엽니다. 이 모드는 읽기 전용이며, 병합되지
+    않은 델타 로그가 있으면 일반 로드로 대체됩니다. 샤드 벡터 DB 디렉토리(shards.json)는
+    샤드별로 로드합니다.
+    
+    파일은 CURRENT 포인터가 가리키는 스냅샷 버전에서 읽으므로, 다른 프로세스가 새 버전을
+    쓰는 중이어도 인덱스와 메타데이터가 같은 시점의 것으로 로드됩니다.
+    
     Args:
         persist_directory: 벡터 DB가 저장된 경로
+        mmap: 메모리 맵 지연 로드 사용 여부
         
     Returns:
-        검색에 필요한 정보를 포함한 사전
+        검색에 필요한 정보를 포함한 사전 ('version'은 로드한 스냅샷 버전)
     """
-    index_path = os.path.join(persist_directory, "faiss_index.bin")
-    metadata_path = os.path.join(persist_directory, "metadata.pkl")
+    from embedding.sharded_db import is_sharded_directory, load_sharded_vector_db
+    if is_sharded_directory(persist_directory):
+        return load_sharded_vector_db(persist_directory, mmap=mmap)
+    
+    version = current_version(persist_directory)
+    snapshot_dir = snapshot_directory(persist_directory, version)
+    index_path = os.path.join(snapshot_dir, INDEX_FILE)
+    metadata_path = os.path.join(snapshot_dir, METADATA_FILE)
     
-    if not os.path.exists(index_path) or not os.path.exists(metadata_path):
+    if not os.path.exists(index_path):
         raise FileNotFoundError(f"벡터 DB 파일을 찾을 수 없습니다: {persist_directory}")
+    # 이전 형식(metadata.pkl) 디렉토리는 SQLite 저장소로 변환
+    if not metadata_store_exists(snapshot_dir) and migrate_pickle_metadata(snapshot_dir) is None:
+        raise FileNotFoundError(f"벡터 DB 메타데이터를 찾을 수 없습니다: {persist_directory}")
     
-    # FAISS 인덱스 로드
+    if mmap:
+        if DeltaLog(persist_directory).size_bytes > 0:
+            print("병합되지 않은 델타 로그가 있어 벡터 DB를 메모리로 로드합니다.")
+        else:
+            return _load_vector_db_mmap(persist_directory, version)
+    
+    # FAISS 인덱스 로드 및 저장된 검색 파라미터(nprobe/efSearch) 적용
     index = faiss.read_index(index_path)
+    index_params = load_index_params(snapshot_dir)
+    apply_search_params(index, index_params)
+    
+    # 메타데이터 저장소 (이전 형식에서 변환된 경우 ID는 위치이며, 증분 갱신 시 고정 ID로 변환)
+    vector_db = {
+        'index': index,
+        'index_path': index_path,
+        'metadata_path': metadata_path,
+        'dimension': index.d,
+        'index_params': index_params,
+        'persist_directory': persist_directory,
+        'snapshot_directory': snapshot_dir,
+        'version': version,
+        'deleted_ids': set(),
+        'pending_added': {},
+        'pending_removed': set(),
+        'exact_vectors': _load_exact_vectors(snapshot_dir, index_params),
+        'metadata_store': MetadataStore(snapshot_dir),
+    }
+    _replay_delta_log(vector_db)
     
-    # 메타데이터 로드
-    with open(metadata_path, 'rb') as f:
-        metadata = pickle.load(f)
+    return vector_db
+
+def _load_vector_db_mmap(persist_directory: str, version: Optional[str]) -> Dict:
+    """인덱스를 메모리 맵으로 여는 읽기 전용 로드 (텍스트/메타데이터는 SQLite 저장소에서 결과 행만 조회)"""
+    snapshot_dir = snapshot_directory(persist_directory, version)
+    index_path = os.path.join(snapshot_dir, INDEX_FILE)
+    index_params = load_index_params(snapshot_dir)
+    
+    # IVF 계열은 역색인 리스트를, 나머지(Flat/SQ/HNSW 저장소)는 코드 배열을 메모리 맵으로 연결
+    if index_params.get('index_type') in IVF_INDEX_TYPES:
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    else:
+        flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    try:
+        index = faiss.read_index(index_path, flags)
+    except RuntimeError as e:
+        print(f"인덱스 메모리 맵 로드 실패, 일반 로드로 대체합니다: {e}")
+        index = faiss.read_index(index_path)
+    apply_search_params(index, index_params)
     
     return {
         'index': index,
         'index_path': index_path,
-        'metadata': metadata,
-        'metadata_path': metadata_path,
-        'dimension': index.d
+        'metadata_path': os.path.join(snapshot_dir, METADATA_FILE),
+        'dimension': index.d,
+        'index_params': index_params,
+        'persist_directory': persist_directory,
+        'snapshot_directory': snapshot_dir,
+        'version': version,
+        'deleted_ids': set(),
+        'pending_added': {},
+        'pending_removed': set(),
+        'metadata_store': MetadataStore(snapshot_dir),
+        'exact_vectors': _load_exact_vectors(snapshot_dir, index_params),
+        'read_only': True,
     }
 
-def search_similar(vector_db: Dict, query_text: str, top_k: int = 5, model_name: str = DEFAULT_MODEL_NAME) -> List[Dict]:
+def _load_exact_vectors(snapshot_dir: str, index_params: Dict[str, Any]) -> Optional[ExactVectors]:
+    """재정렬이 설정된 압축 인덱스면 원본 벡터 저장소를 메모리 맵으로 열기"""
+    if not index_params.get('rerank_factor'):
+        return None
+    if not exact_vectors_exist(snapshot_dir):
+        print("원본 벡터 파일이 없어 압축 인덱스 결과를 재정렬 없이 사용합니다.")
+        return None
+    return ExactVectors(snapshot_dir)
+
+def _check_writable(vector_db: Dict) -> None:
+    if vector_db.get('read_only'):
+        raise ValueError("메모리 맵으로 로드된 벡터 DB는 읽기 전용입니다. mmap=False로 다시 로드하세요.")
+
+def _ensure_id_mapped(vector_db: Dict) -> None:
+    """ID 매핑이 없는 이전 형식 인덱스를 고정 청크 ID 기반 인덱스로 변환"""
+    if vector_db['index_params'].get('id_mapped'):
+        return
+    
+    index = vector_db['index']
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    vectors = index.reconstruct_n(0, index.ntotal)
+    
+    # 위치 ID 행을 모두 지우고 고정 ID 행으로 다시 기록 (인덱스 순서 = 저장소 삽입 순서)
+    records = list(_iter_live_records(vector_db))
+    ids = make_chunk_ids([{'text': text, 'metadata': meta} for _, text, meta in records])
+    config = dict(vector_db['index_params'])
+    vector_db['index'], vector_db['index_params'] = create_index(vectors, config, ids=ids)
+    vector_db['pending_removed'] = {old_id for old_id, _, _ in records}
+    vector_db['pending_added'] = {int(chunk_id): (text, meta) for chunk_id, (_, text, meta) in zip(ids, records)}
+    vector_db.pop('lexical_index', None)
+    _write_snapshot(vector_db)
+
+def _apply_add(vector_db: Dict, ids: np.ndarray, vectors: np.ndarray,
+               texts: List[str], metadatas: List[Dict[str, Any]]) -> int:
+    """인덱스와 메타데이터에 청크 추가 (이미 있는 ID는 건너뜀). 추가된 수 반환"""
+    deleted_ids = vector_db['deleted_ids']
+    present = _present_ids(vector_db, ids)
+    keep = [i for i, chunk_id in enumerate(ids) if int(chunk_id) not in present]
+    if not keep:
+        return 0
+    
+    # 삭제 표시만 된 ID(HNSW)는 같은 내용이므로 인덱스의 기존 벡터를 되살림
+    new_positions = [i for i in keep if int(ids[i]) not in deleted_ids]
+    deleted_ids.difference_update(int(ids[i]) for i in keep)
+    if new_positions:
+        new_vectors = prepare_vectors(vectors[new_positions], vector_db['index_params'])
+        vector_db['index'].add_with_ids(new_vectors, np.ascontiguousarray(ids[new_positions], dtype=np.int64))
+        if vector_db.get('exact_vectors') is not None:
+            vector_db['exact_vectors'].add(ids[new_positions], new_vectors)
+    
+    # 텍스트/메타데이터는 다음 스냅샷 때 SQLite 저장소에 반영
+    added, removed = vector_db['pending_added'], vector_db['pending_removed']
+    for i in keep:
+        removed.discard(int(ids[i]))
+        added[int(ids[i])] = (texts[i], metadatas[i])
+    # 이미 만든 BM25 색인에는 새 청크의 포스팅만 추가
+    if vector_db.get('lexical_index') is not None:
+        vector_db['lexical_index'].add([int(ids[i]) for i in keep], [texts[i] for i in keep])
+    return len(keep)
+
+def _apply_remove(vector_db: Dict, ids) -> int:
+    """인덱스와 메타데이터에서 청크 제거. 제거된 수 반환"""
+    present = list(_present_ids(vector_db, ids))
+    if not present:
+        return 0
+    
+    if supports_remove(vector_db['index']):
+        vector_db['index'].remove_ids(np.asarray(present, dtype=np.int64))
+    else:
+        # HNSW는 삭제를 지원하지 않으므로 병합 시까지 삭제 표시로 관리
+        vector_db['deleted_ids'].update(present)
+    
+    # 저장소 행은 다음 스냅샷 때 삭제
+    added, removed = vector_db['pending_added'], vector_db['pending_removed']
+    for chunk_id in present:
+        added.pop(chunk_id, None)
+        removed.add(chunk_id)
+    if vector_db.get('lexical_index') is not None:
+        vector_db['lexical_index'].remove(present)
+    return len(present)
+
+def _replay_delta_log(vector_db: Dict) -> None:
+    """스냅샷 이후 델타 로그에 기록된 변경 사항을 순서대로 반영"""
+    delta_log = DeltaLog(vector_db['persist_directory'])
+    pending = []
+    
+    def flush_pending():
+        if pending:
+            _apply_add(vector_db,
+                       np.array([p[0] for p in pending], dtype=np.int64),
+                       np.vstack([p[1] for p in pending]),
+                       [p[2]['text'] for p in pending],
+                       [p[2]['metadata'] for p in pending])
+            pending.clear()
+    
+    for op, chunk_id, vector, record in delta_log.replay():
+        if op == OP_ADD:
+            pending.append((chunk_id, vector, record))
+        else:
+            flush_pending()
+            _apply_remove(vector_db, [chunk_id])
+    flush_pending()
+
+def _document_ids(vector_db: Dict, file_name: str) -> List[int]:
+    """문서의 청크 ID (저장소의 file_name 인덱스 조회 + 스냅샷 이후 추가/삭제 반영)"""
+    removed = vector_db['pending_removed']
+    ids = [chunk_id for chunk_id in _metadata_store(vector_db).ids_for_file(file_name) if chunk_id not in removed]
+    ids += [chunk_id for chunk_id, (_, metadata) in vector_db['pending_added'].items()
+            if metadata.get('file_name') == file_name]
+    return list(dict.fromkeys(ids))
+
+def _maybe_merge(vector_db: Dict) -> None:
+    if DeltaLog(vector_db['persist_directory']).size_bytes > DELTA_MERGE_BYTES:
+        merge_delta_log(vector_db)
+
+def add_document(vector_db: Dict, chunks: List[Dict[str, Any]]) -> int:
+    """
+    임베딩된 문서 청크를 벡터 DB에 추가하고 델타 로그에 기록
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+        chunks: 임베딩 벡터가 포함된 청크 리스트
+        
+    Returns:
+        새로 추가된 청크 수
+    """
+    if not chunks:
+        return 0
+    
+    _check_writable(vector_db)
+    _ensure_id_mapped(vector_db)
+    ids = make_chunk_ids(chunks)
+    present = _present_ids(vector_db, ids)
+    new_positions = [i for i, chunk_id in enumerate(ids) if int(chunk_id) not in present]
+    for chunk, chunk_id in zip(chunks, ids):
+        chunk['vector_id'] = int(chunk_id)
+    if not new_positions:
+        return 0
+    
+    vectors = get_embedding_matrix([chunks[i] for i in new_positions])
+    new_ids = ids[new_positions]
+    texts = [chunks[i]['text'] for i in new_positions]
+    metadatas = [chunks[i].get('metadata', {}) for i in new_positions]
+    
+    DeltaLog(vector_db['persist_directory']).append_add(new_ids, vectors, texts, metadatas)
+    added = _apply_add(vector_db, new_ids, vectors, texts, metadatas)
+    _maybe_merge(vector_db)
+    return added
+
+def remove_document(vector_db: Dict, file_name: str) -> int:
+    """
+    파일명에 해당하는 문서의 청크를 벡터 DB에서 제거하고 델타 로그에 기록
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+        file_name: 제거할 문서 파일명
+        
+    Returns:
+        제거된 청크 수
+    """
+    _check_writable(vector_db)
+    _ensure_id_mapped(vector_db)
+    ids = _document_ids(vector_db, file_name)
+    if not ids:
+        return 0
+    
+    DeltaLog(vector_db['persist_directory']).append_remove(ids)
+    removed = _apply_remove(vector_db, ids)
+    _maybe_merge(vector_db)
+    return removed
+
+def replace_document(vector_db: Dict, file_name: str, chunks: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    문서의 새 개정판으로 교체 - 내용이 바뀐 청크만 삭제/추가
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+        file_name: 교체할 문서 파일명
+        chunks: 새 개정판의 임베딩된 청크 리스트
+        
+    Returns:
+        {'added': 추가된 청크 수, 'removed': 제거된 청크 수, 'unchanged': 유지된 청크 수}
+    """
+    _check_writable(vector_db)
+    _ensure_id_mapped(vector_db)
+    new_ids = {int(chunk_id) for chunk_id in make_chunk_ids(chunks)}
+    old_ids = _document_ids(vector_db, file_name)
+    stale_ids = [chunk_id for chunk_id in old_ids if chunk_id not in new_ids]
+    
+    removed = 0
+    if stale_ids:
+        DeltaLog(vector_db['persist_directory']).append_remove(stale_ids)
+        removed = _apply_remove(vector_db, stale_ids)
+    added = add_document(vector_db, chunks)
+    
+    return {'added': added, 'removed': removed, 'unchanged': len(old_ids) - removed}
+
+def merge_delta_log(vector_db: Dict) -> None:
+    """
+    델타 로그를 스냅샷에 병합하고 로그를 비움
+    
+    삭제 표시된 벡터(HNSW)가 있으면 남은 벡터로 인덱스를 다시 구축하고, BM25 색인은 항상 다시 구축합니다.
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+    """
+    _check_writable(vector_db)
+    if vector_db['deleted_ids']:
+        index = vector_db['index']
+        vectors = index.index.reconstruct_n(0, index.ntotal)
+        ids = faiss.vector_to_array(index.id_map)
+        live = np.array([int(chunk_id) not in vector_db['deleted_ids'] for chunk_id in ids], dtype=bool)
+        vector_db['index'], vector_db['index_params'] = create_index(
+            np.ascontiguousarray(vectors[live]), dict(vector_db['index_params']), ids=ids[live]
+        )
+        vector_db['deleted_ids'] = set()
+    
+    # BM25 색인은 병합 때만 전체 구축 (증분 반영 중 고정했던 idf/평균 길이와 삭제 표시 행 정리)
+    vector_db['lexical_index'] = _build_lexical_index(vector_db)
+    _write_snapshot(vector_db)
+    DeltaLog(vector_db['persist_directory']).truncate()
+    print(f"델타 로그 병합 완료: 벡터 {vector_db['index'].ntotal}개")
+
+def update_vector_db(chunks: List[Dict[str, Any]], persist_directory: str,
+                     index_config: Optional[Dict[str, Any]] = None) -> Dict:
+    """
+    벡터 DB가 있으면 청크의 문서만 교체하고, 없으면 새로 구축 (샤드 벡터 DB는 해당 샤드만 갱신)
+    
+    Args:
+        chunks: 임베딩 벡터가 포함된 청크 리스트
+        persist_directory: 벡터 DB 저장 경로
+        index_config: 새로 구축할 때 사용할 인덱스 설정
+        
+    Returns:
+        검색에 필요한 정보를 포함한 사전
+    """
+    from embedding.sharded_db import is_sharded_directory, update_sharded_vector_db
+    if is_sharded_directory(persist_directory):
+        return update_sharded_vector_db(chunks, persist_directory, index_config=index_config)
+    
+    try:
+        vector_db = load_vector_db(persist_directory)
+    except FileNotFoundError:
+        return build_vector_db(chunks, persist_directory, index_config)
+    
+    documents = {}
+    for chunk in chunks:
+        documents.setdefault(chunk.get('metadata', {}).get('file_name'), []).append(chunk)
+    for file_name, document_chunks in documents.items():
+        result = replace_document(vector_db, file_name, document_chunks)
+        print(f"문서 '{file_name}' 갱신: 추가 {result['added']}개, 삭제 {result['removed']}개, 유지 {result['unchanged']}개")
+    
+    return vector_db
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """항목 스트림을 batch_size개씩 목록으로 묶어 생성"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _release_embeddings(chunks: List[Dict[str, Any]]) -> None:
+    """색인에 기록한 청크의 임베딩 참조 제거 (호출자가 청크를 보관해도 배치 행렬이 해제되도록)"""
+    for chunk in chunks:
+        chunk.pop('embedding', None)
+        chunk.pop('embedding_matrix', None)
+        chunk.pop('embedding_row', None)
+
+class StreamingIndexWriter:
+    """
+    임베딩된 청크 배치를 차례로 벡터 DB에 추가하고, 끝나면 스트림에 없던 이전 청크를 제거
+    
+    결과는 전체 청크로 update_vector_db를 호출한 것과 같습니다 (문서 단위 교체).
+    벡터 DB가 없으면 첫 배치로 구축하므로, IVF 계열 인덱스는 첫 배치로 학습됩니다.
+    """
+    
+    def __init__(self, persist_directory: str, index_config: Optional[Dict[str, Any]] = None):
+        """
+        작성기 생성
+        
+        Args:
+            persist_directory: 벡터 DB 저장 경로
+            index_config: 새로 구축할 때 사용할 인덱스 설정
+        """
+        self.persist_directory = persist_directory
+        self.index_config = index_config
+        try:
+            self.vector_db = load_vector_db(persist_directory)
+        except FileNotFoundError:
+            self.vector_db = None
+        self.added = 0
+        # 문서별 스트림 청크 ID와 스트림 시작 전 청크 수
+        self._stream_ids: Dict[Any, set] = {}
+        self._previous_counts: Dict[Any, int] = {}
+    
+    def add(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        임베딩된 청크 배치 추가
+        
+        Args:
+            chunks: 임베딩 벡터가 포함된 청크 리스트
+            
+        Returns:
+            새로 추가된 청크 수
+        """
+        if not chunks:
+            return 0
+        for chunk, chunk_id in zip(chunks, make_chunk_ids(chunks)):
+            file_name = chunk.get('metadata', {}).get('file_name')
+            if file_name not in self._stream_ids:
+                self._stream_ids[file_name] = set()
+                self._previous_counts[file_name] = (len(_document_ids(self.vector_db, file_name))
+                                                    if self.vector_db is not None else 0)
+            self._stream_ids[file_name].add(int(chunk_id))
+        
+        if self.vector_db is None:
+            self.vector_db = build_vector_db(chunks, self.persist_directory, self.index_config)
+            added = int(self.vector_db['index'].ntotal)
+        else:
+            added = add_document(self.vector_db, chunks)
+        self.added += added
+        return added
+    
+    def finish(self) -> Dict[str, int]:
+        """
+        스트림에 포함된 문서의 이전 청크 중 스트림에 없던 청크 제거
+        
+        Returns:
+            {'added': 추가된 청크 수, 'removed': 제거된 청크 수, 'unchanged': 유지된 청크 수}
+        """
+        removed = 0
+        if self.vector_db is not None:
+            for file_name, stream_ids in self._stream_ids.items():
+                stale_ids = [chunk_id for chunk_id in _document_ids(self.vector_db, file_name)
+                             if chunk_id not in stream_ids]
+                if stale_ids:
+                    DeltaLog(self.persist_directory).append_remove(stale_ids)
+                    removed += _apply_remove(self.vector_db, stale_ids)
+            _maybe_merge(self.vector_db)
+        unchanged = sum(self._previous_counts.values()) - removed
+        return {'added': self.added, 'removed': removed, 'unchanged': unchanged}
+
+def index_chunk_stream(chunks: Iterable[Dict[str, Any]], persist_directory: str,
+                       model_name: str = DEFAULT_MODEL_NAME, index_config: Optional[Dict[str, Any]] = None,
+                       batch_size: int = DEFAULT_STREAM_BATCH_SIZE, use_cache: bool = True,
+                       cache_dir: str = DEFAULT_CACHE_DIR) -> Dict[str, int]:
+    """
+    청크 스트림을 일정 크기 배치로 임베딩하여 벡터 DB에 반영 (update_vector_db의 스트리밍 버전)
+    
+    배치마다 임베딩 -> 색인 추가 후 임베딩 참조를 버리므로, 메모리에는 한 배치의 임베딩만 유지됩니다.
+    샤드 벡터 DB는 청크가 속한 샤드에 반영합니다.
+    
+    Args:
+        chunks: 청크 레코드 스트림 (document_processor.iter_document_chunks 결과 등)
+        persist_directory: 벡터 DB 저장 경로
+        model_name: 임베딩 모델명
+        index_config: 새로 구축할 때 사용할 인덱스 설정
+        batch_size: 한 번에 임베딩/색인할 청크 수
+        use_cache: 디스크 임베딩 캐시 사용 여부
+        cache_dir: 임베딩 캐시 디렉토리
+        
+    Returns:
+        {'chunks': 처리한 청크 수, 'batches': 배치 수, 'added', 'removed', 'unchanged'}
+    """
+    from embedding.sharded_db import is_sharded_directory, ShardedStreamingIndexWriter
+    if is_sharded_directory(persist_directory):
+        writer = ShardedStreamingIndexWriter(persist_directory, index_config)
+    else:
+        writer = StreamingIndexWriter(persist_directory, index_config)
+    
+    total = batches = 0
+    for batch in iter_batches(chunks, batch_size):
+        create_embeddings(batch, model_name=model_name, use_cache=use_cache, cache_dir=cache_dir)
+        writer.add(batch)
+        _release_embeddings(batch)
+        total += len(batch)
+        batches += 1
+    
+    result = writer.finish()
+    print(f"스트리밍 색인 완료: 청크 {total}개 (배치 {batches}개), 추가 {result['added']}개, "
+          f"삭제 {result['removed']}개, 유지 {result['unchanged']}개")
+    return dict(result, chunks=total, batches=batches)
+
+def vector_db_metric(vector_db: Dict) -> str:
+    """벡터 DB 인덱스의 거리 기준 반환 ('l2' 또는 'cosine')"""
+    return vector_db.get('index_params', {}).get('metric', METRIC_L2)
+
+def _check_similarity_floor(vector_db: Dict, min_similarity: Optional[float]) -> None:
+    if min_similarity is not None and vector_db_metric(vector_db) != METRIC_COSINE:
+        raise ValueError("유사도 임계값은 코사인(metric='cosine') 인덱스에서만 사용할 수 있습니다.")
+
+def select_filtered_ids(vector_db: Dict, filters: Dict[str, Any]) -> np.ndarray:
+    """
+    메타데이터 조건을 만족하는 청크 ID 조회
+    
+    저장된 청크는 SQLite 저장소의 색인으로 조회하고, 스냅샷 이후 추가/삭제된 청크만 메모리에서 반영합니다.
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전 (단일 인덱스)
+        filters: 메타데이터 조건 (search_similar_batch 참고)
+        
+    Returns:
+        정렬된 청크 ID 배열 (int64)
+    """
+    added, removed = vector_db['pending_added'], vector_db['pending_removed']
+    selected = {chunk_id for chunk_id in _metadata_store(vector_db).select_ids(filters)
+                if chunk_id not in removed and chunk_id not in added}
+    selected.update(chunk_id for chunk_id, (_, metadata) in added.items() if matches_filters(metadata, filters))
+    return np.asarray(sorted(selected), dtype=np.int64)
+
+def get_lexical_index(vector_db: Dict) -> BM25Index:
+    """
+    벡터 DB의 BM25 색인 반환
+    
+    처음 사용할 때 스냅샷에 저장된 색인을 로드해 스냅샷 이후 추가/삭제만 반영하고, 저장된 색인이 없으면
+    구축합니다. 이후의 추가/삭제는 _apply_add/_apply_remove가 색인에 바로 반영합니다.
+    """
+    lexical_index = vector_db.get('lexical_index')
+    if lexical_index is None:
+        added, removed = vector_db['pending_added'], vector_db['pending_removed']
+        if vector_db.get('snapshot_directory'):
+            lexical_index = BM25Index.load(vector_db['snapshot_directory'])
+            if lexical_index is not None and len(lexical_index) != len(_metadata_store(vector_db)):
+                lexical_index = None
+        if lexical_index is not None:
+            lexical_index.remove(removed | set(added))
+            lexical_index.add(list(added), [text for text, _ in added.values()])
+        else:
+            lexical_index = _build_lexical_index(vector_db)
+        vector_db['lexical_index'] = lexical_index
+    return lexical_index
+
+def _build_lexical_index(vector_db: Dict) -> BM25Index:
+    """현재 청크 전체의 텍스트로 BM25 색인 구축"""
+    ids, texts = [], []
+    for chunk_id, text, _ in _iter_live_records(vector_db):
+        ids.append(chunk_id)
+        texts.append(text)
+    return BM25Index.build(ids, texts)
+
+def _search_index(vector_db: Dict, queries: np.ndarray, k: int, selected_ids: Optional[np.ndarray] = None):
+    """
+    인덱스 k-NN 검색 (selected_ids가 주어지면 해당 청크 ID만 대상으로 검색)
+    
+    Returns:
+        (FAISS 점수 행렬, 청크 ID 행렬)
+    """
+    index = vector_db['index']
+    if selected_ids is None:
+        return index.search(queries, min(k, index.ntotal))
+    
+    k = min(k, len(selected_ids))
+    if is_hnsw_index(index) and len(selected_ids) <= FILTER_BRUTE_FORCE_MAX:
+        # 대상 벡터만 복원해 직접 계산
+        metric = faiss.METRIC_INNER_PRODUCT if vector_db_metric(vector_db) == METRIC_COSINE else faiss.METRIC_L2
+        vectors = index.reconstruct_batch(selected_ids)
+        scores, positions = faiss.knn(queries, vectors, k, metric=metric)
+        return scores, np.where(positions >= 0, selected_ids[np.maximum(positions, 0)], -1)
+    return index.search(queries, k, params=make_filtered_search_params(index, selected_ids))
+
+def _fetch_records(vector_db: Dict, chunk_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """청크 ID 목록의 텍스트/메타데이터 조회 (스냅샷 이후 추가된 청크 외에는 SQLite 저장소에서 한 번에 조회)"""
+    added = vector_db['pending_added']
+    records = {chunk_id: {'text': added[chunk_id][0], 'metadata': added[chunk_id][1]}
+               for chunk_id in chunk_ids if chunk_id in added}
+    stored = [chunk_id for chunk_id in chunk_ids if chunk_id not in added]
+    if stored:
+        records.update(_metadata_store(vector_db).fetch(stored))
+    return records
+
+def _format_results(vector_db: Dict, distances: np.ndarray, indices: np.ndarray, top_k: int,
+                    min_similarity: Optional[float] = None) -> List[Dict]:
+    """FAISS 검색 결과 한 행을 청크 정보 목록으로 변환 (코사인 인덱스는 유사도 포함)"""
+    deleted_ids = vector_db['deleted_ids']
+    hits = []
+    for distance, idx in zip(distances, indices):
+        # IVF/HNSW는 결과가 부족하면 -1을 반환하고, HNSW는 삭제 표시된 ID도 반환
+        if idx < 0 or int(idx) in deleted_ids:
+            continue
+        if min_similarity is not None and 1.0 - distance < min_similarity:
+            continue
+        hits.append((float(distance), int(idx)))
+        if len(hits) >= top_k:
+            break
+    
+    records = _fetch_records(vector_db, [idx for _, idx in hits])
+    is_cosine = vector_db_metric(vector_db) == METRIC_COSINE
+    results = []
+    for distance, idx in hits:
+        record = records.get(idx)
+        if record is None:
+            continue
+        result = {
+            'text': record['text'],
+            'metadata': record['metadata'],
+            'distance': distance,
+            'vector_id': idx
+        }
+        if is_cosine:
+            result['similarity'] = 1.0 - distance
+        results.append(result)
+    return results
+
+def _rerank_candidates(vector_db: Dict, query: np.ndarray, indices: np.ndarray,
+                       distances: np.ndarray, top_k: int):
+    """압축 인덱스 후보를 원본 벡터의 정확한 거리로 재정렬 (원본이 없는 후보가 있으면 그대로 사용)"""
+    deleted_ids = vector_db['deleted_ids']
+    candidates = np.array([idx for idx in indices if idx >= 0 and int(idx) not in deleted_ids], dtype=np.int64)
+    vectors, found = vector_db['exact_vectors'].get(candidates)
+    if len(candidates) == 0 or not found.all():
+        return distances, indices
+    exact_distances, exact_ids = rerank_exact(query, candidates, vectors, top_k)
+    if vector_db_metric(vector_db) == METRIC_COSINE:
+        # 정규화 벡터의 L2 제곱 거리 = 2 * (1 - 코사인 유사도)
+        exact_distances = exact_distances / 2.0
+    return exact_distances, exact_ids
+
+def search_by_vectors(vector_db: Dict, query_embeddings: np.ndarray, top_k: int = 5,
+                      min_similarity: Optional[float] = None,
+                      filters: Optional[Dict[str, Any]] = None) -> List[List[Dict]]:
+    """
+    이미 임베딩된 쿼리 벡터로 검색 - FAISS 검색 1회
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전 (단일 인덱스)
+        query_embeddings: (쿼리 수, 차원) 쿼리 벡터 행렬 (정규화 전)
+        top_k: 쿼리별 반환할 결과 수 (상한)
+        min_similarity: 코사인 유사도 하한 (코사인 인덱스 전용, None이면 제한 없음)
+        filters: 메타데이터 조건 (search_similar_batch 참고)
+        
+    Returns:
+        쿼리 순서대로의 유사 청크 목록
+    """
+    _check_similarity_floor(vector_db, min_similarity)
+    results = [[] for _ in range(len(query_embeddings))]
+    if len(query_embeddings) == 0 or vector_db['index'].ntotal == 0:
+        return results
+    
+    # 메타데이터 조건은 저장소 색인으로 ID 집합을 구해 검색 안에서 적용 (삭제된 청크는 포함되지 않음)
+    selected_ids = select_filtered_ids(vector_db, filters) if filters else None
+    if selected_ids is not None and len(selected_ids) == 0:
+        return results
+    
+    # 코사인 인덱스는 쿼리도 정규화
+    index_params = vector_db.get('index_params', {})
+    query_embeddings = prepare_vectors(query_embeddings, index_params)
+    
+    # 유사 벡터 검색 (삭제 표시된 벡터만큼 더 가져오고, 압축 인덱스는 재정렬 후보를 배수로 가져옴)
+    deleted_ids = vector_db.get('deleted_ids', set())
+    exact_vectors = vector_db.get('exact_vectors')
+    rerank_factor = index_params.get('rerank_factor', 0) if exact_vectors is not None else 0
+    fetch_k = top_k * rerank_factor if rerank_factor else top_k
+    if selected_ids is None:
+        fetch_k += len(deleted_ids)
+    scores, indices = _search_index(vector_db, query_embeddings, fetch_k, selected_ids)
+    distances = scores_to_distances(scores, index_params)
+    
+    for row in range(len(query_embeddings)):
+        row_distances, row_indices = distances[row], indices[row]
+        if rerank_factor:
+            row_distances, row_indices = _rerank_candidates(vector_db, query_embeddings[row], row_indices,
+                                                            row_distances, top_k)
+        results[row] = _format_results(vector_db, row_distances, row_indices, top_k, min_similarity)
+    return results
+
+def search_lexical(vector_db: Dict, query_texts: List[str], top_k: int = 5,
+                   filters: Optional[Dict[str, Any]] = None) -> List[List[Dict]]:
+    """
+    BM25 키워드 검색 - 모델 인코딩 없이 역색인만 사용
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전 (단일 인덱스)
+        query_texts: 검색할 쿼리 텍스트 목록
+        top_k: 쿼리별 반환할 결과 수 (상한)
+        filters: 메타데이터 조건 (search_similar_batch 참고)
+        
+    Returns:
+        쿼리 순서대로의 청크 목록 ('score'는 BM25 점수, 'distance'는 그 음수)
+    """
+    results = [[] for _ in query_texts]
+    selected_ids = select_filtered_ids(vector_db, filters) if filters else None
+    if not query_texts or (selected_ids is not None and len(selected_ids) == 0):
+        return results
+    
+    scores, indices = get_lexical_index(vector_db).search(query_texts, top_k, selected_ids)
+    for row in range(len(query_texts)):
+        hits = [(float(score), int(idx)) for score, idx in zip(scores[row], indices[row]) if idx >= 0]
+        records = _fetch_records(vector_db, [idx for _, idx in hits])
+        for score, idx in hits:
+            record = records.get(idx)
+            if record is not None:
+                results[row].append({'text': record['text'], 'metadata': record['metadata'],
+                                     'distance': -score, 'score': score, 'vector_id': idx})
+    return results
+
+def _fuse_results(vector_results: List[Dict], lexical_results: List[Dict], top_k: int) -> List[Dict]:
+    """벡터/키워드 결과를 순위 역수 합(RRF)으로 융합 ('score'는 융합 점수, 'distance'는 그 음수)"""
+    fused: Dict[tuple, Dict] = {}
+    for results in (vector_results, lexical_results):
+        for rank, result in enumerate(results):
+            # 샤드 결과는 샤드마다 청크 ID가 따로 부여되므로 샤드 이름과 함께 구분
+            entry = fused.setdefault((result.get('shard'), result['vector_id']), dict(result, score=0.0))
+            entry['score'] += 1.0 / (RRF_K + rank + 1)
+    ranked = sorted(fused.values(), key=lambda result: -result['score'])[:top_k]
+    for result in ranked:
+        result['distance'] = -result['score']
+    return ranked
+
+def _search_single(vector_db: Dict, query_texts: List[str], query_embeddings: Optional[np.ndarray], top_k: int,
+                   mode: str, min_similarity: Optional[float],
+                   filters: Optional[Dict[str, Any]]) -> List[List[Dict]]:
+    """단일 인덱스에서 검색 방식에 따라 검색"""
+    if mode == SEARCH_MODE_LEXICAL:
+        return search_lexical(vector_db, query_texts, top_k=top_k, filters=filters)
+    if mode == SEARCH_MODE_VECTOR:
+        return search_by_vectors(vector_db, query_embeddings, top_k=top_k,
+                                 min_similarity=min_similarity, filters=filters)
+    
+    candidates = top_k * FUSION_CANDIDATE_FACTOR
+    vector_results = search_by_vectors(vector_db, query_embeddings, top_k=candidates,
+                                       min_similarity=min_similarity, filters=filters)
+    lexical_results = search_lexical(vector_db, query_texts, top_k=candidates, filters=filters)
+    return [_fuse_results(vector_row, lexical_row, top_k)
+            for vector_row, lexical_row in zip(vector_results, lexical_results)]
+
+def _search_sharded(sharded_db: Dict, query_texts: List[str], query_embeddings: Optional[np.ndarray], top_k: int,
+                    mode: str, min_similarity: Optional[float],
+                    filters: Optional[Dict[str, Any]]) -> List[List[Dict]]:
+    """
+    샤드 DB에서 검색 방식에 따라 검색
+    
+    벡터 거리는 샤드 간에 비교할 수 있어 거리순으로 병합하지만, BM25 점수는 샤드마다 idf/평균 길이가
+    달라 비교할 수 없으므로 샤드별 순위로 합칩니다. 융합 검색은 이렇게 합친 전체 벡터/키워드 순위를
+    다시 RRF로 융합합니다.
+    """
+    from embedding.sharded_db import search_shards, search_shards_by_rank
+    candidates = top_k if mode != SEARCH_MODE_FUSED else top_k * FUSION_CANDIDATE_FACTOR
+    vector_results = lexical_results = None
+    if mode != SEARCH_MODE_LEXICAL:
+        vector_results = search_shards(
+            sharded_db,
+            lambda db: search_by_vectors(db, query_embeddings, top_k=candidates,
+                                         min_similarity=min_similarity, filters=filters),
+            top_k=candidates, filters=filters
+        )
+    if mode != SEARCH_MODE_VECTOR:
+        lexical_results = search_shards_by_rank(
+            sharded_db, lambda db: search_lexical(db, query_texts, top_k=candidates, filters=filters),
+            top_k=candidates, filters=filters
+        )
+    if mode == SEARCH_MODE_VECTOR:
+        return vector_results
+    if mode == SEARCH_MODE_LEXICAL:
+        return lexical_results
+    return [_fuse_results(vector_row, lexical_row, top_k)
+            for vector_row, lexical_row in zip(vector_results, lexical_results)]
+
+def _stored_vectors(vector_db: Dict, chunk_ids: List[int]) -> Optional[np.ndarray]:
+    """단일 인덱스에서 청크 벡터 조회 (원본 벡터 파일 또는 인덱스 복원, 복원할 수 없으면 None)"""
+    ids = np.asarray(chunk_ids, dtype=np.int64)
+    exact_vectors = vector_db.get('exact_vectors')
+    if exact_vectors is not None:
+        vectors, found = exact_vectors.get(ids)
+        if found.all():
+            return vectors
+    try:
+        return vector_db['index'].reconstruct_batch(ids)
+    except RuntimeError:
+        # 직접 매핑이 없는 IVF 계열은 복원 불가
+        return None
+
+def _result_vectors(vector_db: Dict, results: List[Dict], model_name: str) -> np.ndarray:
+    """검색 결과 청크의 벡터 (샤드 결과는 해당 샤드에서, 복원할 수 없으면 텍스트를 다시 인코딩)"""
+    if vector_db.get('remote'):
+        # 원격 벡터 DB는 인덱스가 없으므로 서버에서 텍스트를 인코딩
+        return Embedder(model_name).embed_queries([result['text'] for result in results], use_cache=False)
+    if vector_db.get('sharded'):
+        from embedding.sharded_db import load_shard
+        groups: Dict[str, List[int]] = {}
+        for position, result in enumerate(results):
+            groups.setdefault(result['shard'], []).append(position)
+        vectors = None
+        for shard, positions in groups.items():
+            shard_vectors = _stored_vectors(load_shard(vector_db, shard),
+                                            [results[i]['vector_id'] for i in positions])
+            if shard_vectors is None:
+                return Embedder(model_name).embed_texts([result['text'] for result in results])
+            if vectors is None:
+                vectors = np.empty((len(results), shard_vectors.shape[1]), dtype=np.float32)
+            vectors[positions] = shard_vectors
+        return vectors
+    
+    vectors = _stored_vectors(vector_db, [result['vector_id'] for result in results])
+    if vectors is None:
+        vectors = Embedder(model_name).embed_texts([result['text'] for result in results])
+    return vectors
+
+def diversify_results(vector_db: Dict, results: List[Dict], top_k: int, diversity: float,
+                      model_name: str = DEFAULT_MODEL_NAME,
+                      query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+    """
+    관련도순 후보를 MMR로 재정렬하여 서로 겹치는 청크를 걸러냄
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+        results: 거리순 후보 청크 목록 (search_similar 결과)
+        top_k: 반환할 결과 수
+        diversity: 다양성 가중치 (0이면 관련도순 상위 top_k 그대로)
+        model_name: 벡터를 복원할 수 없을 때 텍스트 인코딩에 사용할 모델명
+        query_embedding: 쿼리 벡터 (있으면 쿼리와의 코사인 유사도를 관련도로 사용,
+            없으면 결과 순위 점수를 0~1로 변환해 사용)
+        
+    Returns:
+        MMR 선택 순서대로의 청크 목록
+    """
+    if diversity <= 0 or len(results) <= 1:
+        return results[:top_k]
+    vectors = _result_vectors(vector_db, results, model_name)
+    if query_embedding is not None:
+        relevance = relevance_from_query(query_embedding, vectors)
+    else:
+        relevance = relevance_from_distances([result['distance'] for result in results])
+    return [results[i] for i in mmr_select(relevance, vectors, top_k, diversity)]
+
+def _deduplicate_results(results: List[List[Dict]]) -> List[List[Dict]]:
+    """여러 쿼리에 걸친 같은 청크는 거리가 가장 가까운 쿼리에만 남김"""
+    best = {}
+    for position, query_results in enumerate(results):
+        for result in query_results:
+            current = best.get(result['vector_id'])
+            if current is None or result['distance'] < current[1]:
+                best[result['vector_id']] = (position, result['distance'])
+    return [[result for result in query_results if best[result['vector_id']][0] == position]
+            for position, query_results in enumerate(results)]
+
+def remote_vector_db(persist_directory: str) -> Optional[Dict]:
+    """
+    검색 서버가 보유한 벡터 DB를 가리키는 정보 사전 (TC_SEARCH_SERVER 환경 변수로 서버 지정)
+    
+    반환된 사전은 search_similar_batch/search_within_radius 등에서 일반 벡터 DB처럼 사용하며,
+    검색은 서버로 보내고 서버가 응답하지 않으면 현재 프로세스에서 벡터 DB를 로드해 처리합니다.
+    
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        
+    Returns:
+        원격 벡터 DB 정보 사전 (서버가 지정되지 않았거나 응답하지 않으면 None)
+    """
+    client = get_search_client()
+    if client is None:
+        return None
+    try:
+        info = client.open_db(persist_directory)
+    except (OSError, ConnectionError, ServerBusyError) as e:
+        print(f"검색 서버에 연결할 수 없습니다: {e}")
+        return None
+    return {
+        'remote': True,
+        'persist_directory': os.path.abspath(persist_directory),
+        'version': info.get('version'),
+        'index_params': {'metric': info['metric']},
+    }
+
+def _local_vector_db(vector_db: Dict) -> Dict:
+    """원격 벡터 DB 대신 사용할 현재 프로세스의 벡터 DB"""
+    from embedding.snapshots import get_vector_db_handle
+    return get_vector_db_handle(vector_db['persist_directory']).get()
+
+def _search_remote(vector_db: Dict, query_texts: List[str], **params) -> List[List[Dict]]:
+    """검색 서버에 검색 요청 (연결 실패/과부하 시 현재 프로세스에서 검색)"""
+    client = get_search_client()
+    if client is not None:
+        try:
+            return client.search(vector_db['persist_directory'], query_texts, **params)
+        except (OSError, ConnectionError, ServerBusyError) as e:
+            print(f"검색 서버 요청 실패, 현재 프로세스에서 검색합니다: {e}")
+    return search_similar_batch(_local_vector_db(vector_db), query_texts, **params)
+
+def search_similar_batch(vector_db: Dict, query_texts: List[str], top_k: int = 5,
+                         model_name: str = DEFAULT_MODEL_NAME, deduplicate: bool = False,
+                         min_similarity: Optional[float] = None,
+                         filters: Optional[Dict[str, Any]] = None,
+                         mode: str = SEARCH_MODE_VECTOR, diversity: float = 0.0) -> List[List[Dict]]:
+    """
+    여러 쿼리를 한 번에 검색 - 모델 인코딩 1회, FAISS 검색 1회 (샤드 DB는 샤드별 병렬 검색)
+    
+    mode='lexical'은 BM25 역색인만 사용하므로 모델 인코딩이 없고, 'fused'는 벡터/키워드
+    상위 후보를 순위 역수 합(RRF)으로 합칩니다. 두 방식의 결과에서 'score'는 높을수록 관련이 높으며
+    'distance'는 정렬 호환을 위한 그 음수입니다.
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전
+        query_texts: 검색할 쿼리 텍스트 목록
+        top_k: 쿼리별 반환할 결과 수 (상한)
+        model_name: 임베딩 모델명
+        deduplicate: True이면 여러 쿼리에 걸친 같은 청크는 거리가 가장 가까운 쿼리에만 남김
+        min_similarity: 코사인 유사도 하한 (코사인 인덱스 전용, None이면 제한 없음)
+        filters: 메타데이터 조건 (예: {'file_name': ['a.docx'], 'type': 'game_design_doc'}).
+            조건에 맞는 청크 ID만 FAISS 검색 대상으로 지정
+        mode: 검색 방식 ('vector', 'lexical', 'fused'). 키워드 검색에는 min_similarity가 적용되지 않음
+        diversity: MMR 다양성 가중치 (0이면 사용 안 함). 후보를 top_k의 배수만큼 가져와
+            서로 겹치는 청크를 걸러낸 top_k개를 반환
+        
+    Returns:
+        쿼리 순서대로의 유사 청크 목록
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"지원하지 않는 검색 방식입니다: {mode} (지원: {', '.join(SEARCH_MODES)})")
+    if mode != SEARCH_MODE_LEXICAL:
+        _check_similarity_floor(vector_db, min_similarity)
+    if vector_db.get('remote'):
+        results = _search_remote(vector_db, query_texts, top_k=top_k, model_name=model_name,
+                                 min_similarity=min_similarity, filters=filters, mode=mode, diversity=diversity)
+        return _deduplicate_results(results) if deduplicate else results
+    results = [[] for _ in query_texts]
+    positions = [i for i, query in enumerate(query_texts) if query.strip()]
+    if not positions:
+        return results
+    
+    # 쿼리 임베딩을 한 번에 생성 (키워드 검색은 생략)
+    texts = [query_texts[i] for i in positions]
+    query_embeddings = Embedder(model_name).embed_queries(texts) if mode != SEARCH_MODE_LEXICAL else None
+    fetch_k = top_k * MMR_CANDIDATE_FACTOR if diversity > 0 else top_k
+    if vector_db.get('sharded'):
+        found = _search_sharded(vector_db, texts, query_embeddings, fetch_k, mode, min_similarity, filters)
+    else:
+        found = _search_single(vector_db, texts, query_embeddings, fetch_k, mode, min_similarity, filters)
+    if diversity > 0:
+        found = [diversify_results(vector_db, candidates, top_k, diversity, model_name,
+                                   query_embeddings[row] if query_embeddings is not None else None)
+                 for row, candidates in enumerate(found)]
+    for position, query_results in zip(positions, found):
+        results[position] = query_results
+    
+    return _deduplicate_results(results) if deduplicate else results
+
+def search_similar(vector_db: Dict, query_text: str, top_k: int = 5, model_name: str = DEFAULT_MODEL_NAME,
+                   min_similarity: Optional[float] = None, filters: Optional[Dict[str, Any]] = None,
+                   mode: str = SEARCH_MODE_VECTOR, diversity: float = 0.0) -> List[Dict]:
     """
     쿼리 텍스트와 유사한 청크 검색
     
     Args:
         vector_db: 벡터 DB 정보 사전
         query_text: 검색할 쿼리 텍스트
-        top_k: 반환할 결과 수
+        top_k: 반환할 결과 수 (상한)
         model_name: 임베딩 모델명
+        min_similarity: 코사인 유사도 하한 (코사인 인덱스 전용, None이면 제한 없음)
+        filters: 메타데이터 조건 (search_similar_batch 참고)
+        mode: 검색 방식 ('vector', 'lexical', 'fused')
+        diversity: MMR 다양성 가중치 (0이면 사용 안 함)
         
     Returns:
         유사 청크 목록
     """
-    if not query_text.strip():
+    return search_similar_batch(vector_db, [query_text], top_k=top_k, model_name=model_name,
+                                min_similarity=min_similarity, filters=filters, mode=mode,
+                                diversity=diversity)[0]
+
+def search_vector_within_radius(vector_db: Dict, query_embedding: np.ndarray, min_similarity: float,
+                                max_results: Optional[int] = None,
+                                filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    """
+    이미 임베딩된 쿼리 벡터로 코사인 유사도가 임계값 이상인 청크를 모두 검색
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전 (단일 코사인 인덱스)
+        query_embedding: (차원,) 또는 (1, 차원) 쿼리 벡터
+        min_similarity: 코사인 유사도 하한
+        max_results: 반환할 최대 결과 수 (None이면 제한 없음)
+        filters: 메타데이터 조건 (search_similar_batch 참고)
+        
+    Returns:
+        유사도 내림차순 청크 목록
+    """
+    _check_similarity_floor(vector_db, min_similarity)
+    index = vector_db['index']
+    if index.ntotal == 0:
         return []
     
-    # 쿼리 임베딩 생성
-    embedder = Embedder(model_name)
-    query_embedding = np.array([embedder.embed_texts([query_text])[0]], dtype=np.float32)
+    selected_ids = select_filtered_ids(vector_db, filters) if filters else None
+    if selected_ids is not None and len(selected_ids) == 0:
+        return []
     
-    # 유사 벡터 검색
-    distances, indices = vector_db['index'].search(query_embedding, min(top_k, vector_db['index'].ntotal))
+    index_params = vector_db.get('index_params', {})
+    query = prepare_vectors(query_embedding, index_params)
+    if selected_ids is not None and is_hnsw_index(index) and len(selected_ids) <= FILTER_BRUTE_FORCE_MAX:
+        # HNSW 필터 검색은 대상 벡터를 직접 계산한 뒤 임계값으로 거름
+        scores, indices = _search_index(vector_db, query, len(selected_ids), selected_ids)
+        scores, indices = scores[0], indices[0]
+    else:
+        try:
+            # 내적 기준 range_search는 점수가 radius보다 큰 결과를 반환
+            search_params = make_filtered_search_params(index, selected_ids) if selected_ids is not None else None
+            limits, scores, indices = index.range_search(query, float(min_similarity), params=search_params)
+            scores, indices = scores[limits[0]:limits[1]], indices[limits[0]:limits[1]]
+        except RuntimeError as e:
+            # range_search를 지원하지 않는 인덱스는 k-NN 검색 후 임계값으로 거름
+            print(f"범위 검색 미지원, k-NN 검색으로 대체합니다: {e}")
+            scores, indices = _search_index(vector_db, query, index.ntotal, selected_ids)
+            scores, indices = scores[0], indices[0]
     
-    # 결과 포맷팅
-    results = []
-    for i, idx in enumerate(indices[0]):
-        if idx < len(vector_db['metadata']['texts']):
-            results.append({
-                'text': vector_db['metadata']['texts'][idx],
-                'metadata': vector_db['metadata']['metadatas'][idx],
-                'distance': float(distances[0][i])
-            })
-    
-    return results
\ No newline at end of file
+    distances = scores_to_distances(scores, index_params)
+    if vector_db.get('exact_vectors') is not None and len(indices):
+        # 압축 인덱스는 원본 벡터로 다시 계산한 유사도로 판정
+        distances, indices = _rerank_candidates(vector_db, query[0], indices, distances, len(indices))
+    
+    order = np.argsort(distances, kind='stable')
+    limit = len(order) if max_results is None else max_results
+    return _format_results(vector_db, distances[order], indices[order], limit, min_similarity)
+
+def search_within_radius(vector_db: Dict, query_text: str, min_similarity: float,
+                         max_results: Optional[int] = None, model_name: str = DEFAULT_MODEL_NAME,
+                         filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    """
+    코사인 유사도가 임계값 이상인 청크를 모두 검색 (FAISS range_search)
+    
+    Args:
+        vector_db: 벡터 DB 정보 사전 (코사인 인덱스)
+        query_text: 검색할 쿼리 텍스트
+        min_similarity: 코사인 유사도 하한
+        max_results: 반환할 최대 결과 수 (None이면 제한 없음)
+        model_name: 임베딩 모델명
+        filters: 메타데이터 조건 (search_similar_batch 참고)
+        
+    Returns:
+        유사도 내림차순 청크 목록
+    """
+    _check_similarity_floor(vector_db, min_similarity)
+    if not query_text.strip():
+        return []
+    
+    if vector_db.get('remote'):
+        client = get_search_client()
+        if client is not None:
+            try:
+                return client.search_within_radius(vector_db['persist_directory'], query_text,
+                                                   min_similarity=min_similarity, max_results=max_results,
+                                                   model_name=model_name, filters=filters)
+            except (OSError, ConnectionError, ServerBusyError) as e:
+                print(f"검색 서버 요청 실패, 현재 프로세스에서 검색합니다: {e}")
+        vector_db = _local_vector_db(vector_db)
+    
+    query = Embedder(model_name).embed_queries([query_text])
+    if vector_db.get('sharded'):
+        from embedding.sharded_db import search_shards_within_radius
+        return search_shards_within_radius(vector_db, query, min_similarity, max_results=max_results,
+                                           filters=filters)
+    return search_vector_within_radius(vector_db, query, min_similarity, max_results=max_results, filters=filters)
@@ -0,0 +1,391 @@
+"""
+임베딩 캐시 모듈: (모델명, 정규화된 청크 텍스트 해시) 기준으로 청크 벡터를 디스크에 보관
+
+저장 형식 (모델별 디렉토리)
+- vectors.f32: float32 벡터가 행 단위로 연속 저장된 파일
+- index.npy: (키 해시, 행 번호, 마지막 사용 시각) 구조 배열 (pickle 미사용)
+- meta.json: 모델명, 벡터 차원, 세대 번호(압축할 때 증가), 인덱스 개정 번호(인덱스를 기록할 때 증가)
+- lock: 여러 프로세스(Streamlit 세션, 작업자)가 같은 캐시를 공유할 때 사용하는 파일 잠금
+
+다른 프로세스가 압축하면 행 번호가 모두 바뀌므로, 조회/저장 전에 세대 번호를 확인하고
+바뀌었으면 메모리의 행 번호 대신 디스크 인덱스를 다시 읽습니다.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 세대 번호 확인만 사용
+    fcntl = None
+
+# 기본 캐시 경로 및 크기 한도
+DEFAULT_CACHE_DIR = os.path.join("data", "embeddings", "cache")
+DEFAULT_MAX_SIZE_MB = 512
+
+# 한도를 넘으면 한도의 이 비율까지 줄여서 압축(파일 전체 재작성)이 드물게 일어나도록 함
+EVICT_LOW_WATER = 0.9
+
+# 캐시 적중으로 바뀐 마지막 사용 시각만 있을 때 인덱스를 다시 기록하는 최소 간격 (초)
+TOUCH_FLUSH_INTERVAL = 60.0
+
+INDEX_DTYPE = np.dtype([('key', 'S16'), ('row', '<i8'), ('last_used', '<f8')])
+
+_KEY_SIZE = INDEX_DTYPE['key'].itemsize
+
+
+def normalize_text(text: str) -> str:
+    """공백 차이를 무시하도록 텍스트 정규화"""
+    return ' '.join(str(text).split())
+
+
+def text_key(text: str) -> bytes:
+    """정규화된 텍스트의 16바이트 해시 키 생성"""
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """모델 하나에 대한 디스크 기반 LRU 임베딩 캐시"""
+
+    def __init__(self, model_name: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        """
+        임베딩 캐시 초기화
+
+        Args:
+            model_name: 벡터를 생성한 모델명
+            cache_dir: 캐시 루트 디렉토리
+            max_size_mb: 벡터 파일 최대 크기 (MB)
+        """
+        self.model_name = model_name
+        self.directory = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', model_name))
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.npy")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock_path = os.path.join(self.directory, "lock")
+
+        self._lock = threading.RLock()
+        self._rows: Dict[bytes, int] = {}
+        self._last_used: Dict[bytes, float] = {}
+        self.dimension: Optional[int] = None
+        # 디스크 인덱스와 맞춘 세대/개정 번호 (None이면 아직 읽지 않음)
+        self._generation: Optional[int] = None
+        self._revision: Optional[int] = None
+        # 마지막 기록 이후 캐시 적중으로 마지막 사용 시각이 바뀌었는지
+        self._touched = False
+        self._persisted_at = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_run = {'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
+
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """프로세스 간 잠금 (조회는 공유, 저장/압축/인덱스 기록은 배타)"""
+        if fcntl is None or (not exclusive and not os.path.isdir(self.directory)):
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"임베딩 캐시 메타데이터 로드 오류: {e}")
+            return None
+
+    def _read_index(self) -> Tuple[List[bytes], List[int], List[float]]:
+        """디스크 인덱스 (벡터 파일에 없는 행 제외)"""
+        try:
+            index = np.load(self.index_path, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            print(f"임베딩 캐시 인덱스 로드 오류 (캐시를 비웁니다): {e}")
+            return [], [], []
+
+        row_count = os.path.getsize(self.vectors_path) // (self.dimension * 4) if os.path.exists(self.vectors_path) else 0
+        index = index[index['row'] < row_count]
+        # 'S' 배열 원소는 끝의 0 바이트가 잘리므로 원본 바이트에서 16바이트씩 분리
+        blob = np.ascontiguousarray(index['key']).tobytes()
+        keys = [blob[i:i + _KEY_SIZE] for i in range(0, len(blob), _KEY_SIZE)]
+        return keys, index['row'].tolist(), index['last_used'].tolist()
+
+    def _sync(self) -> None:
+        """
+        디스크 인덱스와 메모리 인덱스 맞추기 (파일 잠금 안에서 호출)
+
+        - 세대 번호가 바뀌었으면(다른 프로세스가 압축) 메모리 행 번호를 버리고 디스크 인덱스를 사용
+        - 개정 번호만 바뀌었으면(다른 프로세스가 벡터 추가) 메모리에 없는 항목만 병합
+        """
+        meta = self._read_meta()
+        if meta is None:
+            return
+        generation, revision = meta.get('generation', 0), meta.get('revision', 0)
+        if generation == self._generation and revision == self._revision:
+            return
+
+        self.dimension = int(meta['dimension'])
+        keys, rows, last_used = self._read_index()
+        if generation != self._generation:
+            self._rows = dict(zip(keys, rows))
+            self._last_used = dict(zip(keys, last_used))
+        else:
+            for key, row, used in zip(keys, rows, last_used):
+                if key not in self._rows:
+                    self._rows[key] = row
+                    self._last_used[key] = used
+                elif used > self._last_used[key]:
+                    self._last_used[key] = used
+        self._generation, self._revision = generation, revision
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def max_entries(self) -> Optional[int]:
+        """크기 한도로 환산한 최대 벡터 수"""
+        if not self.dimension:
+            return None
+        return max(1, self.max_size_bytes // (self.dimension * 4))
+
+    def _open_vectors(self) -> Optional[np.ndarray]:
+        if not self.dimension or not os.path.exists(self.vectors_path) or os.path.getsize(self.vectors_path) == 0:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode='r').reshape(-1, self.dimension)
+
+    def lookup(self, texts: List[str]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        텍스트 목록에 대한 캐시 조회
+
+        Args:
+            texts: 조회할 텍스트 목록
+
+        Returns:
+            (벡터 행렬 - 미적중 행은 0, 적중 여부 마스크). 캐시가 비어 있으면 행렬은 None
+        """
+        hit_mask = np.zeros(len(texts), dtype=bool)
+
+        with self._lock, self._file_lock(exclusive=False):
+            # 다른 프로세스가 압축했으면 행 번호를 다시 읽은 뒤 벡터를 읽음
+            self._sync()
+            stored = self._open_vectors()
+            vectors = None
+            if stored is not None:
+                positions = []
+                rows = []
+                now = time.time()
+                for i, text in enumerate(texts):
+                    key = text_key(text)
+                    row = self._rows.get(key)
+                    if row is not None:
+                        positions.append(i)
+                        rows.append(row)
+                        self._last_used[key] = now
+
+                vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+                if rows:
+                    vectors[positions] = stored[np.asarray(rows, dtype=np.int64)]
+                    hit_mask[positions] = True
+                    self._touched = True
+
+            hits = int(hit_mask.sum())
+            misses = len(texts) - hits
+            self.hits += hits
+            self.misses += misses
+            self.last_run = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / len(texts) if texts else 0.0,
+            }
+
+        return vectors, hit_mask
+
+    def store(self, texts: List[str], vectors: np.ndarray) -> None:
+        """
+        새로 계산한 벡터를 캐시에 추가 (인덱스도 바로 기록하여 다른 프로세스와 공유)
+
+        Args:
+            texts: 벡터에 대응하는 텍스트 목록
+            vectors: (텍스트 수, 차원) 형태의 벡터 행렬
+        """
+        if not texts:
+            return
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync()
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dimension:
+                print(f"임베딩 캐시 차원 불일치 ({vectors.shape[1]} != {self.dimension}), 저장을 건너뜁니다.")
+                return
+
+            # 이미 저장된 키와 배치 내 중복 제외
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for i, text in enumerate(texts):
+                key = text_key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(i)
+
+            if not new_keys:
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            start_row = os.path.getsize(self.vectors_path) // (self.dimension * 4) if os.path.exists(self.vectors_path) else 0
+            with open(self.vectors_path, 'ab') as f:
+                f.write(vectors[new_rows].tobytes())
+
+            now = time.time()
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start_row + offset
+                self._last_used[key] = now
+
+            self._evict_over_budget()
+            self._write_index()
+
+    def _evict_over_budget(self) -> None:
+        """
+        크기 한도를 넘으면 한도의 EVICT_LOW_WATER 비율까지 가장 오래 사용하지 않은 벡터를 제거하고
+        파일을 압축 (배타 파일 잠금 안에서 호출, 세대 번호 증가)
+        """
+        limit = self.max_entries
+        if limit is None or len(self._rows) <= limit:
+            return
+
+        keep = sorted(self._rows, key=lambda k: self._last_used[k], reverse=True)[:max(1, int(limit * EVICT_LOW_WATER))]
+        stored = self._open_vectors()
+        kept_vectors = np.asarray(stored[np.asarray([self._rows[k] for k in keep], dtype=np.int64)])
+        del stored
+
+        tmp_path = self.vectors_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(kept_vectors.tobytes())
+        os.replace(tmp_path, self.vectors_path)
+
+        self.evictions += len(self._rows) - len(keep)
+        self._rows = {key: row for row, key in enumerate(keep)}
+        self._last_used = {key: self._last_used[key] for key in keep}
+        self._generation = (self._generation or 0) + 1
+
+    def _write_index(self) -> None:
+        """인덱스와 메타데이터를 원자적으로 기록 (배타 파일 잠금 안에서 호출, 개정 번호 증가)"""
+        os.makedirs(self.directory, exist_ok=True)
+        index = np.empty(len(self._rows), dtype=INDEX_DTYPE)
+        index['key'] = np.frombuffer(b''.join(self._rows), dtype=INDEX_DTYPE['key'])
+        index['row'] = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        index['last_used'] = np.fromiter((self._last_used[key] for key in self._rows), dtype=np.float64,
+                                         count=len(self._rows))
+
+        tmp_index = self.index_path + ".tmp.npy"
+        np.save(tmp_index, index, allow_pickle=False)
+        os.replace(tmp_index, self.index_path)
+
+        self._generation = self._generation or 0
+        self._revision = (self._revision or 0) + 1
+        tmp_meta = self.meta_path + ".tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({'model_name': self.model_name, 'dimension': self.dimension,
+                       'generation': self._generation, 'revision': self._revision}, f)
+        os.replace(tmp_meta, self.meta_path)
+
+        self._touched = False
+        self._persisted_at = time.time()
+
+    def flush(self, force: bool = False) -> None:
+        """
+        캐시 적중으로 바뀐 마지막 사용 시각을 디스크 인덱스에 기록
+
+        새 벡터는 store()에서 바로 기록되므로, 여기서는 마지막 사용 시각만 TOUCH_FLUSH_INTERVAL
+        간격으로 모아서 기록합니다.
+
+        Args:
+            force: 간격과 관계없이 기록 (프로세스 종료 시)
+        """
+        with self._lock:
+            if not self._touched or self.dimension is None:
+                return
+            if not force and time.time() - self._persisted_at < TOUCH_FLUSH_INTERVAL:
+                return
+            with self._file_lock(exclusive=True):
+                self._sync()
+                self._write_index()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        캐시 사용 통계 반환
+
+        Returns:
+            누적 적중/미적중/제거 수, 마지막 실행 적중률, 저장된 벡터 수
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._rows),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'last_run_hit_ratio': self.last_run['hit_ratio'],
+            }
+
+
+_caches: Dict[Tuple[str, str], EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str, cache_dir: str = DEFAULT_CACHE_DIR) -> EmbeddingCache:
+    """
+    (캐시 경로, 모델명) 별로 공유되는 캐시 인스턴스 반환
+
+    Args:
+        model_name: 모델명
+        cache_dir: 캐시 루트 디렉토리
+
+    Returns:
+        임베딩 캐시
+    """
+    key = (os.path.abspath(cache_dir), model_name)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(model_name, cache_dir)
+        return _caches[key]
+
+
+@atexit.register
+def _flush_caches() -> None:
+    """프로세스 종료 시 아직 기록하지 않은 마지막 사용 시각 기록"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        try:
+            cache.flush(force=True)
+        except OSError:
+            pass
@@ -0,0 +1,118 @@
+"""
+원본 벡터 저장소 모듈: 압축(SQ/PQ) 인덱스의 상위 후보를 정확한 벡터로 재정렬하기 위해
+청크 ID별 float32 원본 벡터를 디스크에 보관
+
+저장 형식
+- exact_ids.npy: 정렬된 청크 ID (int64)
+- exact_vectors.npy: ID 순서와 같은 순서의 float32 벡터 행렬 (메모리 맵으로 로드)
+"""
+
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+EXACT_IDS_FILE = "exact_ids.npy"
+EXACT_VECTORS_FILE = "exact_vectors.npy"
+
+
+def exact_vectors_exist(directory: str) -> bool:
+    """원본 벡터 파일이 있는지 확인"""
+    return (os.path.exists(os.path.join(directory, EXACT_IDS_FILE))
+            and os.path.exists(os.path.join(directory, EXACT_VECTORS_FILE)))
+
+
+def write_exact_vectors(directory: str, ids: np.ndarray, vectors: np.ndarray) -> None:
+    """
+    청크 ID 순으로 정렬하여 원본 벡터 저장
+
+    Args:
+        directory: 저장 경로
+        ids: 청크 ID 배열
+        vectors: ids와 같은 순서의 벡터 행렬
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    order = np.argsort(ids, kind='stable')
+    np.save(os.path.join(directory, EXACT_IDS_FILE + ".tmp.npy"), ids[order], allow_pickle=False)
+    np.save(os.path.join(directory, EXACT_VECTORS_FILE + ".tmp.npy"),
+            np.ascontiguousarray(vectors[order], dtype=np.float32), allow_pickle=False)
+    os.replace(os.path.join(directory, EXACT_IDS_FILE + ".tmp.npy"), os.path.join(directory, EXACT_IDS_FILE))
+    os.replace(os.path.join(directory, EXACT_VECTORS_FILE + ".tmp.npy"), os.path.join(directory, EXACT_VECTORS_FILE))
+
+
+class ExactVectors:
+    """메모리 맵으로 연 원본 벡터와, 스냅샷 이후 추가된 벡터를 함께 조회"""
+
+    def __init__(self, directory: Optional[str] = None, dimension: int = 0):
+        """
+        원본 벡터 저장소 열기
+
+        Args:
+            directory: 저장 경로 (None이면 빈 저장소)
+            dimension: 벡터 차원 (빈 저장소일 때 사용)
+        """
+        if directory and exact_vectors_exist(directory):
+            self.ids = np.load(os.path.join(directory, EXACT_IDS_FILE), mmap_mode='r')
+            self.vectors = np.load(os.path.join(directory, EXACT_VECTORS_FILE), mmap_mode='r')
+            self.dimension = self.vectors.shape[1]
+        else:
+            self.ids = np.empty(0, dtype=np.int64)
+            self.vectors = np.empty((0, dimension), dtype=np.float32)
+            self.dimension = dimension
+        self.pending: Dict[int, np.ndarray] = {}
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray) -> None:
+        """스냅샷 이후 추가된 벡터 등록 (다음 스냅샷 저장 시 파일에 병합)"""
+        for chunk_id, vector in zip(ids, vectors):
+            self.pending[int(chunk_id)] = np.array(vector, dtype=np.float32)
+
+    def get(self, ids) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        청크 ID 목록의 원본 벡터 조회
+
+        Args:
+            ids: 청크 ID 목록
+
+        Returns:
+            (벡터 행렬 - 없는 행은 0, 존재 여부 마스크)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.zeros((len(ids), self.dimension), dtype=np.float32)
+        found = np.zeros(len(ids), dtype=bool)
+        if len(ids) == 0:
+            return vectors, found
+
+        if len(self.ids):
+            positions = np.searchsorted(self.ids, ids)
+            positions = np.minimum(positions, len(self.ids) - 1)
+            matched = self.ids[positions] == ids
+            if matched.any():
+                vectors[matched] = self.vectors[positions[matched]]
+                found |= matched
+
+        for i, chunk_id in enumerate(ids):
+            vector = self.pending.get(int(chunk_id))
+            if vector is not None:
+                vectors[i] = vector
+                found[i] = True
+        return vectors, found
+
+
+def rerank_exact(query: np.ndarray, candidate_ids: np.ndarray, candidate_vectors: np.ndarray,
+                 top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    후보를 정확한 L2 거리로 재정렬
+
+    Args:
+        query: (차원,) 쿼리 벡터
+        candidate_ids: 후보 청크 ID
+        candidate_vectors: 후보 원본 벡터
+        top_k: 반환할 결과 수
+
+    Returns:
+        (거리 배열, 청크 ID 배열)
+    """
+    diffs = candidate_vectors - query[None, :]
+    distances = np.einsum('ij,ij->i', diffs, diffs)
+    order = np.argsort(distances, kind='stable')[:top_k]
+    return distances[order], candidate_ids[order]
@@ -0,0 +1,127 @@
+"""
+해시 임베딩 모듈: 한국어/영어 문자 n-gram을 고정 차원으로 해싱하는 오프라인 임베딩 백엔드
+
+torch나 모델 파일 없이 NumPy 배치 연산만으로 동작하므로, sentence-transformers를 사용할 수 없는
+오프라인 환경에서도 어휘가 겹치는 청크끼리 가깝게 배치되는 의미 있는 유사도 검색을 제공합니다.
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+# 기본 설정 - 차원은 기본 모델(all-MiniLM-L6-v2)과 맞춰 인덱스 호환성 유지
+DEFAULT_DIMENSION = 384
+DEFAULT_NGRAM_RANGE = (1, 3)
+# n-gram 길이별 가중치 (단일 문자는 잡음이 많아 낮게)
+DEFAULT_NGRAM_WEIGHTS = {1: 0.5, 2: 1.0, 3: 1.0}
+
+# 위치별 곱셈 상수 (홀수 64비트 상수)
+_MULTIPLIERS = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+    0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+], dtype=np.uint64)
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """64비트 해시 값 섞기 (splitmix64 마무리 단계)"""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+class HashingEmbedder:
+    """문자 n-gram 해싱 기반 임베딩 (SentenceTransformer.encode 호환)"""
+
+    def __init__(self, dimension: int = DEFAULT_DIMENSION,
+                 ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE, lowercase: bool = True):
+        """
+        해시 임베딩 초기화
+
+        Args:
+            dimension: 출력 벡터 차원
+            ngram_range: 사용할 문자 n-gram 길이 범위 (최소, 최대)
+            lowercase: 영문 소문자화 여부
+        """
+        if ngram_range[1] > len(_MULTIPLIERS):
+            raise ValueError(f"n-gram 최대 길이는 {len(_MULTIPLIERS)} 이하여야 합니다.")
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.lowercase = lowercase
+        # 임베딩 캐시가 다른 백엔드의 벡터와 섞이지 않도록 구분하는 이름
+        self.cache_namespace = f"hashing-{dimension}-{ngram_range[0]}-{ngram_range[1]}"
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _codepoints(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """모든 텍스트를 공백으로 감싸 하나의 코드포인트 배열로 이어 붙이고, 문자별 텍스트 번호 반환"""
+        normalized = []
+        for text in texts:
+            text = ' '.join(str(text).split())
+            normalized.append(' ' + (text.lower() if self.lowercase else text) + ' ')
+
+        joined = ''.join(normalized)
+        codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        lengths = np.fromiter((len(t) for t in normalized), dtype=np.int64, count=len(normalized))
+        owners = np.repeat(np.arange(len(normalized), dtype=np.int64), lengths)
+        return codes, owners
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 4096,
+               normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """
+        텍스트를 해시 임베딩 벡터로 변환
+
+        Args:
+            sentences: 텍스트 또는 텍스트 목록
+            batch_size: 한 번에 처리할 텍스트 수
+            normalize_embeddings: L2 정규화 여부
+
+        Returns:
+            목록이면 (텍스트 수, 차원), 단일 텍스트면 (차원,) float32 배열
+        """
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size=batch_size, normalize_embeddings=normalize_embeddings)[0]
+
+        sentences = list(sentences)
+        output = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            output[start:start + len(batch)] = self._encode_batch(batch)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(output, axis=1, keepdims=True)
+            np.divide(output, norms, out=output, where=norms > 0)
+        return output
+
+    def _encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        codes, owners = self._codepoints(texts)
+        vectors = np.zeros(len(texts) * self.dimension, dtype=np.float64)
+        dimension = np.uint64(self.dimension)
+
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            count = len(codes) - n + 1
+            if count <= 0:
+                continue
+
+            # n-gram 해시: 위치별 상수를 곱해 더한 뒤 섞기 (n마다 다른 시드)
+            h = np.full(count, (n * int(_MULTIPLIERS[-1])) & 0xFFFFFFFFFFFFFFFF, dtype=np.uint64)
+            for offset in range(n):
+                h += codes[offset:offset + count] * _MULTIPLIERS[offset]
+            h = _mix(h)
+
+            # 텍스트 경계를 넘는 n-gram과 공백만으로 된 n-gram 제외
+            valid = owners[:count] == owners[n - 1:n - 1 + count]
+            if n == 1:
+                valid &= codes[:count] != 32
+
+            buckets = (h % dimension).astype(np.int64)
+            # 부호 해싱으로 충돌 편향 완화
+            signs = np.where((h >> np.uint64(63)) == 1, -1.0, 1.0)
+            weight = DEFAULT_NGRAM_WEIGHTS.get(n, 1.0)
+
+            positions = owners[:count][valid] * self.dimension + buckets[valid]
+            vectors += np.bincount(positions, weights=signs[valid] * weight, minlength=len(vectors))
+
+        return vectors.reshape(len(texts), self.dimension).astype(np.float32)
@@ -0,0 +1,374 @@
+"""
+FAISS 인덱스 팩토리: 코퍼스 크기나 설정에 따라 Flat / IVF / HNSW 인덱스를 생성하고 검색 파라미터 관리
+
+거리 기준은 L2(기본) 또는 코사인(정규화 벡터의 내적)을 선택할 수 있습니다.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+# 인덱스 종류
+INDEX_AUTO = "auto"
+INDEX_FLAT = "flat"
+INDEX_IVF = "ivf"
+INDEX_HNSW = "hnsw"
+# 압축 인덱스 (자동 선택 대상 아님 - 설정으로 지정)
+INDEX_SQ8 = "sq8"
+INDEX_SQ_FP16 = "sq_fp16"
+INDEX_IVF_PQ = "ivf_pq"
+INDEX_TYPES = [INDEX_FLAT, INDEX_IVF, INDEX_HNSW, INDEX_SQ8, INDEX_SQ_FP16, INDEX_IVF_PQ]
+COMPRESSED_INDEX_TYPES = [INDEX_SQ8, INDEX_SQ_FP16, INDEX_IVF_PQ]
+# IVF 계열 (자체적으로 ID 저장, nprobe 사용)
+IVF_INDEX_TYPES = [INDEX_IVF, INDEX_IVF_PQ]
+
+# 거리 기준
+METRIC_L2 = "l2"
+METRIC_COSINE = "cosine"
+METRICS = [METRIC_L2, METRIC_COSINE]
+
+# 자동 선택 기준 (벡터 수)
+FLAT_MAX_VECTORS = 50000
+HNSW_MAX_VECTORS = 1000000
+
+# 검색 파라미터 파일 (faiss_index.bin 옆에 저장)
+INDEX_PARAMS_FILE = "index_params.json"
+
+# 기본 인덱스 설정
+DEFAULT_INDEX_CONFIG = {
+    'index_type': INDEX_AUTO,
+    'metric': METRIC_L2,        # 거리 기준 (l2 또는 cosine)
+    'nlist': None,              # IVF 클러스터 수 (None이면 4*sqrt(N))
+    'nprobe': 16,               # IVF 검색 시 탐색할 클러스터 수
+    'train_sample_size': 100000,  # IVF 학습에 사용할 최대 샘플 수
+    'hnsw_m': 32,               # HNSW 노드당 연결 수
+    'ef_construction': 200,     # HNSW 구축 시 탐색 폭
+    'ef_search': 64,            # HNSW 검색 시 탐색 폭
+    'pq_m': None,               # IVF-PQ 서브 양자화기 수 (None이면 차원/8에 가까운 약수)
+    'pq_nbits': 8,              # IVF-PQ 서브 양자화기당 비트 수
+    'rerank_factor': 4,         # 압축 인덱스에서 원본 벡터로 재정렬할 후보 배수 (0이면 재정렬 안 함)
+}
+
+
+def resolve_index_config(index_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """기본 설정에 사용자 설정을 덮어쓴 인덱스 설정 반환"""
+    config = dict(DEFAULT_INDEX_CONFIG)
+    if index_config:
+        config.update({k: v for k, v in index_config.items() if v is not None})
+    return config
+
+
+def choose_index_type(num_vectors: int, index_type: str = INDEX_AUTO) -> str:
+    """
+    코퍼스 크기에 맞는 인덱스 종류 결정
+
+    Args:
+        num_vectors: 인덱싱할 벡터 수
+        index_type: 설정된 인덱스 종류 ('auto'이면 크기로 결정)
+
+    Returns:
+        인덱스 종류
+    """
+    if index_type != INDEX_AUTO:
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 인덱스 종류입니다: {index_type}")
+        return index_type
+
+    if num_vectors <= FLAT_MAX_VECTORS:
+        return INDEX_FLAT
+    if num_vectors <= HNSW_MAX_VECTORS:
+        return INDEX_HNSW
+    return INDEX_IVF
+
+
+def _default_nlist(num_vectors: int) -> int:
+    # 클러스터당 최소 39개 학습 샘플을 확보할 수 있는 범위로 제한
+    return int(max(1, min(4 * np.sqrt(num_vectors), num_vectors // 39)))
+
+
+def _default_pq_m(dimension: int) -> int:
+    # 서브 벡터당 약 8차원이 되도록 차원의 약수 중 가장 가까운 값 선택
+    target = max(1, dimension // 8)
+    divisors = [m for m in range(1, dimension + 1) if dimension % m == 0]
+    return min(divisors, key=lambda m: abs(m - target))
+
+
+def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
+    """행 단위로 L2 정규화한 float32 행렬 사본 반환 (0 벡터는 그대로)"""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def prepare_vectors(vectors: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """
+    인덱스 거리 기준에 맞게 벡터 준비 (코사인이면 정규화)
+
+    Args:
+        vectors: (벡터 수, 차원) 행렬
+        params: 검색 파라미터 사전 (metric 포함)
+
+    Returns:
+        인덱스에 추가하거나 검색할 연속 float32 행렬
+    """
+    if params.get('metric') == METRIC_COSINE:
+        return normalize_vectors(vectors)
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def scores_to_distances(scores: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """
+    FAISS 검색 점수를 '작을수록 가까운' 거리로 변환 (코사인이면 1 - 유사도)
+
+    Args:
+        scores: FAISS search 결과 점수
+        params: 검색 파라미터 사전
+
+    Returns:
+        거리 배열
+    """
+    if params.get('metric') == METRIC_COSINE:
+        return 1.0 - scores
+    return scores
+
+
+def _training_sample(embeddings: np.ndarray, sample_size: int) -> np.ndarray:
+    if len(embeddings) <= sample_size:
+        return embeddings
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(len(embeddings), size=sample_size, replace=False))
+    return np.ascontiguousarray(embeddings[rows])
+
+
+def create_index(embeddings: np.ndarray, index_config: Optional[Dict[str, Any]] = None,
+                 ids: Optional[np.ndarray] = None):
+    """
+    설정에 맞는 FAISS 인덱스를 생성하고 벡터 추가
+
+    Args:
+        embeddings: (벡터 수, 차원) float32 행렬
+        index_config: 인덱스 설정 (DEFAULT_INDEX_CONFIG 참고)
+        ids: 벡터별 고정 ID (int64). 주어지면 ID 매핑 인덱스를 생성
+
+    Returns:
+        (FAISS 인덱스, 저장할 검색 파라미터 사전)
+    """
+    config = resolve_index_config(index_config)
+    num_vectors, dimension = embeddings.shape
+    index_type = choose_index_type(num_vectors, config['index_type'])
+    if config['metric'] not in METRICS:
+        raise ValueError(f"지원하지 않는 거리 기준입니다: {config['metric']}")
+
+    params = {'index_type': index_type, 'dimension': int(dimension), 'count': int(num_vectors),
+              'metric': config['metric']}
+    # 코사인은 정규화 벡터의 내적으로 계산
+    metric = faiss.METRIC_INNER_PRODUCT if config['metric'] == METRIC_COSINE else faiss.METRIC_L2
+    embeddings = prepare_vectors(embeddings, params)
+
+    if index_type == INDEX_FLAT:
+        index = faiss.IndexFlat(dimension, metric)
+    elif index_type == INDEX_HNSW:
+        index = faiss.IndexHNSWFlat(dimension, int(config['hnsw_m']), metric)
+        index.hnsw.efConstruction = int(config['ef_construction'])
+        params.update({'hnsw_m': int(config['hnsw_m']), 'ef_search': int(config['ef_search'])})
+    elif index_type in (INDEX_SQ8, INDEX_SQ_FP16):
+        qtype = faiss.ScalarQuantizer.QT_8bit if index_type == INDEX_SQ8 else faiss.ScalarQuantizer.QT_fp16
+        index = faiss.IndexScalarQuantizer(dimension, qtype, metric)
+        index.train(_training_sample(embeddings, int(config['train_sample_size'])))
+    else:
+        nlist = int(config['nlist'] or _default_nlist(num_vectors))
+        quantizer = faiss.IndexFlat(dimension, metric)
+        if index_type == INDEX_IVF_PQ:
+            pq_m = int(config['pq_m'] or _default_pq_m(dimension))
+            # 학습 샘플이 코드북 크기(2^nbits)보다 적으면 비트 수를 줄임
+            pq_nbits = int(min(config['pq_nbits'], max(1, np.floor(np.log2(max(2, num_vectors))))))
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, pq_nbits, metric)
+            params.update({'pq_m': pq_m, 'pq_nbits': pq_nbits})
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+        index.train(_training_sample(embeddings, int(config['train_sample_size'])))
+        params.update({'nlist': nlist, 'nprobe': int(config['nprobe'])})
+
+    if index_type in COMPRESSED_INDEX_TYPES and config['rerank_factor']:
+        params['rerank_factor'] = int(config['rerank_factor'])
+
+    if ids is None:
+        index.add(embeddings)
+    else:
+        # IVF 계열은 자체적으로 ID를 저장하고, 나머지는 IDMap2로 감싸 ID 조회/삭제를 지원
+        if index_type not in IVF_INDEX_TYPES:
+            index = faiss.IndexIDMap2(index)
+        index.add_with_ids(embeddings, np.ascontiguousarray(ids, dtype=np.int64))
+        params['id_mapped'] = True
+
+    apply_search_params(index, params)
+    return index, params
+
+
+def _base_index(index):
+    """IDMap 등 래퍼 인덱스를 벗겨낸 실제 인덱스 반환"""
+    base = index
+    while hasattr(base, 'index') and not hasattr(base, 'hnsw'):
+        base = faiss.downcast_index(base.index)
+    return base
+
+
+def supports_remove(index) -> bool:
+    """인덱스가 remove_ids로 벡터 삭제를 지원하는지 여부 (HNSW는 미지원)"""
+    return not hasattr(_base_index(index), 'hnsw')
+
+
+def apply_search_params(index, params: Dict[str, Any]) -> None:
+    """
+    저장된 검색 파라미터(nprobe, efSearch)를 인덱스에 적용
+
+    Args:
+        index: FAISS 인덱스
+        params: 검색 파라미터 사전
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and params.get('nprobe'):
+        ivf.nprobe = int(params['nprobe'])
+
+    base = _base_index(index)
+    if hasattr(base, 'hnsw') and params.get('ef_search'):
+        base.hnsw.efSearch = int(params['ef_search'])
+
+
+def is_hnsw_index(index) -> bool:
+    """HNSW 그래프 인덱스 여부"""
+    return hasattr(_base_index(index), 'hnsw')
+
+
+def make_filtered_search_params(index, ids: np.ndarray):
+    """
+    청크 ID 집합만 검색하도록 FAISS 검색 파라미터(IDSelector) 생성
+
+    인덱스에 적용된 nprobe/efSearch 값을 그대로 유지합니다.
+
+    Args:
+        index: FAISS 인덱스
+        ids: 검색 대상 청크 ID 배열
+
+    Returns:
+        FAISS SearchParameters
+    """
+    selector = faiss.IDSelectorBatch(np.ascontiguousarray(ids, dtype=np.int64))
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=int(ivf.nprobe))
+    elif is_hnsw_index(index):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=int(_base_index(index).hnsw.efSearch))
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    # 파라미터가 선택자보다 먼저 해제되지 않도록 참조 유지
+    params.selector_ref = selector
+    return params
+
+
+def save_index_params(persist_directory: str, params: Dict[str, Any]) -> str:
+    """
+    검색 파라미터를 faiss_index.bin 옆에 JSON으로 저장
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        params: 검색 파라미터 사전
+
+    Returns:
+        저장된 파일 경로
+    """
+    params_path = os.path.join(persist_directory, INDEX_PARAMS_FILE)
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f, ensure_ascii=False, indent=2)
+    return params_path
+
+
+def load_index_params(persist_directory: str) -> Dict[str, Any]:
+    """
+    저장된 검색 파라미터 로드 (파일이 없으면 Flat 인덱스로 간주)
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+
+    Returns:
+        검색 파라미터 사전
+    """
+    params_path = os.path.join(persist_directory, INDEX_PARAMS_FILE)
+    if not os.path.exists(params_path):
+        return {'index_type': INDEX_FLAT}
+    with open(params_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def index_bytes(index) -> int:
+    """직렬화한 인덱스 크기(바이트) - 벡터당 메모리 비교용"""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def compare_index_strategies(embeddings: np.ndarray, queries: np.ndarray, top_k: int = 10,
+                             index_types: Optional[List[str]] = None,
+                             index_config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    인덱스 종류별 구축 시간, 검색 지연, 벡터당 크기, Flat 기준 recall@k 비교
+
+    압축 인덱스는 rerank_factor가 설정되어 있으면 원본 벡터로 재정렬한 결과를 측정합니다.
+
+    Args:
+        embeddings: 인덱싱할 벡터 행렬
+        queries: 쿼리 벡터 행렬
+        top_k: 비교할 결과 수
+        index_types: 비교할 인덱스 종류 목록 (기본값: Flat/IVF/HNSW)
+        index_config: 공통 인덱스 설정
+
+    Returns:
+        인덱스 종류별 측정 결과 목록 (첫 항목이 Flat 기준)
+    """
+    index_types = index_types or [INDEX_FLAT, INDEX_IVF, INDEX_HNSW]
+    config = resolve_index_config(index_config)
+    top_k = min(top_k, len(embeddings))
+    # 코사인 기준이면 정규화 벡터끼리의 L2 순서가 내적 순서와 같으므로 재정렬도 그대로 사용
+    embeddings = prepare_vectors(embeddings, config)
+    queries = prepare_vectors(queries, config)
+
+    report = []
+    baseline = None
+    for index_type in [INDEX_FLAT] + [t for t in index_types if t != INDEX_FLAT]:
+        start = time.perf_counter()
+        index, params = create_index(embeddings, dict(config, index_type=index_type))
+        build_seconds = time.perf_counter() - start
+
+        rerank_factor = params.get('rerank_factor', 0)
+        start = time.perf_counter()
+        _, ids = index.search(queries, top_k * rerank_factor if rerank_factor else top_k)
+        if rerank_factor:
+            # 원본 벡터로 후보 재정렬 (행 번호가 곧 ID)
+            reranked = np.full((len(queries), top_k), -1, dtype=np.int64)
+            for row, candidates in enumerate(ids):
+                candidates = candidates[candidates >= 0]
+                diffs = embeddings[candidates] - queries[row][None, :]
+                order = np.argsort(np.einsum('ij,ij->i', diffs, diffs), kind='stable')[:top_k]
+                reranked[row, :len(order)] = candidates[order]
+            ids = reranked
+        search_seconds = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = ids
+        recall = float(np.mean([
+            len(set(found) & set(expected)) / top_k for found, expected in zip(ids, baseline)
+        ]))
+
+        report.append({
+            'index_type': index_type,
+            'params': params,
+            'build_seconds': build_seconds,
+            'query_ms': search_seconds * 1000 / max(1, len(queries)),
+            'bytes_per_vector': index_bytes(index) / max(1, index.ntotal),
+            'recall_at_k': recall,
+        })
+
+    return report
@@ -0,0 +1,328 @@
+"""
+키워드 검색 모듈: 청크 텍스트 BM25 역색인 (벡터 검색보다 가벼운 1차 검색기)
+
+한글은 어절을 문자 bigram으로 나누어 조사/어미가 붙어도 어간이 일치하도록 하고
+(예: '장착하면' -> 장착, 착하, 하면), 영문/숫자는 소문자 단어로 색인합니다 (COOLDOWN -> cooldown).
+
+저장 형식 (FAISS 인덱스와 같은 디렉토리)
+- lexical_index.npz: CSR 형태의 포스팅 배열
+  - offsets: 용어별 포스팅 시작 위치 (int64, 용어 수 + 1)
+  - rows: 포스팅별 문서 행 번호 (int32)
+  - weights: 포스팅별 BM25 점수 기여도 (float32, idf/길이 정규화 미리 계산)
+  - doc_ids: 행별 청크 ID (int64)
+  - live: 행별 유효 여부 (bool, 삭제 표시된 행이 있을 때만)
+- lexical_vocab.json: 용어 목록(순서 = 용어 번호)과 BM25 파라미터/평균 문서 길이
+
+청크 추가/삭제는 add/remove로 포스팅 배열에 바로 반영하고(삭제는 행 제외 표시),
+idf와 평균 길이를 포함한 전체 구축은 델타 로그 병합 때만 다시 수행합니다.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+LEXICAL_INDEX_FILE = "lexical_index.npz"
+LEXICAL_VOCAB_FILE = "lexical_vocab.json"
+
+# 토크나이저가 바뀌면 올려서 저장된 색인을 다시 구축
+TOKENIZER_VERSION = 1
+
+# BM25 기본 파라미터
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r'[가-힣]+|[A-Za-z0-9_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한글 문자 bigram + 영문/숫자 단어 토큰화
+
+    Args:
+        text: 토큰화할 텍스트
+
+    Returns:
+        토큰 목록 (중복 포함)
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text):
+        if '가' <= word[0] <= '힣':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            word = word.lower()
+            tokens.append(word)
+            # SET_EFFECT 같은 필드명은 구성 단어로도 검색되도록 추가
+            if '_' in word:
+                tokens.extend(part for part in word.split('_') if part)
+    return tokens
+
+
+def lexical_index_exists(directory: str) -> bool:
+    """키워드 색인 파일이 있는지 확인"""
+    return (os.path.exists(os.path.join(directory, LEXICAL_INDEX_FILE))
+            and os.path.exists(os.path.join(directory, LEXICAL_VOCAB_FILE)))
+
+
+class BM25Index:
+    """배열 기반 BM25 역색인"""
+
+    def __init__(self, terms: List[str], offsets: np.ndarray, rows: np.ndarray, weights: np.ndarray,
+                 doc_ids: np.ndarray, avg_length: float, k1: float = DEFAULT_K1, b: float = DEFAULT_B,
+                 live: Optional[np.ndarray] = None):
+        """
+        구축된 포스팅 배열로 색인 생성 (build 또는 load 사용)
+
+        Args:
+            terms: 용어 목록 (순서 = 용어 번호)
+            offsets: 용어별 포스팅 시작 위치
+            rows: 포스팅별 문서 행 번호
+            weights: 포스팅별 BM25 점수 기여도
+            doc_ids: 행별 청크 ID
+            avg_length: 구축 시점의 평균 문서 길이 (토큰 수)
+            k1: BM25 단어 빈도 포화 파라미터
+            b: BM25 문서 길이 정규화 파라미터
+            live: 행별 유효 여부 (None이면 모두 유효)
+        """
+        self.terms = terms
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+        self.doc_ids = doc_ids
+        self.avg_length = avg_length
+        self.k1 = k1
+        self.b = b
+        self.live = live
+
+    def __len__(self) -> int:
+        """삭제 표시되지 않은 문서 수"""
+        return len(self.doc_ids) if self.live is None else int(self.live.sum())
+
+    @classmethod
+    def build(cls, ids: Iterable[int], texts: Iterable[str], k1: float = DEFAULT_K1,
+              b: float = DEFAULT_B) -> "BM25Index":
+        """
+        청크 텍스트로 색인 구축
+
+        Args:
+            ids: 청크 ID 목록
+            texts: ids와 같은 순서의 청크 텍스트
+            k1: BM25 단어 빈도 포화 파라미터
+            b: BM25 문서 길이 정규화 파라미터
+
+        Returns:
+            BM25Index
+        """
+        term_ids: Dict[str, int] = {}
+        posting_terms: List[int] = []
+        posting_rows: List[int] = []
+        posting_tfs: List[int] = []
+        doc_lengths: List[int] = []
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                posting_terms.append(term_ids.setdefault(term, len(term_ids)))
+                posting_rows.append(row)
+                posting_tfs.append(tf)
+
+        doc_ids = np.asarray(list(ids), dtype=np.int64)
+        terms = np.asarray(posting_terms, dtype=np.int64)
+        rows = np.asarray(posting_rows, dtype=np.int32)
+        tfs = np.asarray(posting_tfs, dtype=np.float32)
+        lengths = np.asarray(doc_lengths, dtype=np.float32)
+
+        # 용어 번호 순으로 정렬해 CSR 구성 (같은 용어 안에서는 행 순서 유지)
+        order = np.argsort(terms, kind='stable')
+        terms, rows, tfs = terms[order], rows[order], tfs[order]
+        doc_freqs = np.bincount(terms, minlength=len(term_ids))
+        offsets = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(doc_freqs, out=offsets[1:])
+
+        # 점수 기여도 = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * 문서 길이 / 평균 길이))
+        n_docs = len(lengths)
+        avg_length = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+        idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        norms = (1.0 - b + b * lengths / avg_length).astype(np.float32)
+        weights = idf[terms] * tfs * (k1 + 1.0) / (tfs + k1 * norms[rows])
+
+        return cls(list(term_ids), offsets, rows, weights.astype(np.float32), doc_ids, avg_length, k1=k1, b=b)
+
+    def add(self, ids: Iterable[int], texts: Iterable[str]) -> None:
+        """
+        청크 추가 반영 - 새 청크만 토큰화해 포스팅을 CSR 배열에 합침
+
+        기존 포스팅의 점수 기여도와 평균 길이는 그대로 두고(병합 때 전체 구축으로 갱신),
+        새 포스팅은 추가 후 문서 빈도로 계산한 idf와 구축 시점의 평균 길이를 사용합니다.
+
+        Args:
+            ids: 추가할 청크 ID 목록
+            texts: ids와 같은 순서의 청크 텍스트
+        """
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(ids):
+            return
+
+        base_rows = len(self.doc_ids)
+        posting_terms: List[int] = []
+        posting_rows: List[int] = []
+        posting_tfs: List[int] = []
+        doc_lengths: List[int] = []
+        for offset, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                posting_terms.append(term_id)
+                posting_rows.append(base_rows + offset)
+                posting_tfs.append(tf)
+
+        lengths = np.asarray(doc_lengths, dtype=np.float32)
+        if len(self) == 0 and lengths.mean() > 0:
+            # 유효 문서가 없던 색인은 기존 통계와 맞출 필요가 없으므로 새 문서로 평균 길이 설정
+            self.avg_length = float(lengths.mean())
+
+        n_terms = len(self.terms)
+        old_terms = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int64), np.diff(self.offsets))
+        new_terms = np.asarray(posting_terms, dtype=np.int64)
+        new_rows = np.asarray(posting_rows, dtype=np.int32)
+        tfs = np.asarray(posting_tfs, dtype=np.float32)
+
+        # 문서 빈도는 삭제 표시된 행도 포함하므로 문서 수도 전체 행 기준
+        doc_freqs = np.bincount(old_terms, minlength=n_terms) + np.bincount(new_terms, minlength=n_terms)
+        n_docs = len(self.doc_ids) + len(ids)
+        idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        norms = (1.0 - self.b + self.b * lengths / self.avg_length).astype(np.float32)
+        new_weights = idf[new_terms] * tfs * (self.k1 + 1.0) / (tfs + self.k1 * norms[new_rows - base_rows])
+
+        terms = np.concatenate([old_terms, new_terms])
+        order = np.argsort(terms, kind='stable')
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=n_terms), out=offsets[1:])
+        self.offsets = offsets
+        self.rows = np.concatenate([self.rows, new_rows])[order]
+        self.weights = np.concatenate([self.weights, new_weights.astype(np.float32)])[order]
+        self.doc_ids = np.concatenate([self.doc_ids, ids])
+        if self.live is not None:
+            self.live = np.concatenate([self.live, np.ones(len(ids), dtype=bool)])
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """
+        청크 삭제 반영 - 행은 다음 전체 구축까지 남기고 검색에서만 제외
+
+        Args:
+            ids: 삭제할 청크 ID 목록
+        """
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(ids):
+            return
+        dead = np.isin(self.doc_ids, ids)
+        if dead.any():
+            if self.live is None:
+                self.live = np.ones(len(self.doc_ids), dtype=bool)
+            self.live[dead] = False
+
+    def save(self, directory: str) -> None:
+        """색인을 임시 파일에 쓴 뒤 교체하여 저장"""
+        index_path = os.path.join(directory, LEXICAL_INDEX_FILE)
+        vocab_path = os.path.join(directory, LEXICAL_VOCAB_FILE)
+
+        arrays = {'offsets': self.offsets, 'rows': self.rows, 'weights': self.weights, 'doc_ids': self.doc_ids}
+        if self.live is not None:
+            arrays['live'] = self.live
+        with open(index_path + ".tmp", 'wb') as f:
+            np.savez(f, **arrays)
+        with open(vocab_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'version': TOKENIZER_VERSION, 'k1': self.k1, 'b': self.b, 'avg_length': self.avg_length,
+                       'terms': self.terms}, f, ensure_ascii=False)
+
+        os.replace(index_path + ".tmp", index_path)
+        os.replace(vocab_path + ".tmp", vocab_path)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BM25Index"]:
+        """
+        저장된 색인 로드
+
+        Args:
+            directory: 저장 경로
+
+        Returns:
+            BM25Index (파일이 없거나 토크나이저 버전이 다르거나 평균 길이가 없는 이전 형식이면 None)
+        """
+        if not lexical_index_exists(directory):
+            return None
+        with open(os.path.join(directory, LEXICAL_VOCAB_FILE), 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+        if vocab.get('version') != TOKENIZER_VERSION or 'avg_length' not in vocab:
+            return None
+
+        with np.load(os.path.join(directory, LEXICAL_INDEX_FILE), allow_pickle=False) as arrays:
+            live = arrays['live'] if 'live' in arrays.files else None
+            return cls(vocab['terms'], arrays['offsets'], arrays['rows'], arrays['weights'], arrays['doc_ids'],
+                       vocab['avg_length'], k1=vocab['k1'], b=vocab['b'], live=live)
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        쿼리에 대한 전체 문서 BM25 점수
+
+        Args:
+            query: 쿼리 텍스트
+
+        Returns:
+            행별 점수 배열 (float32)
+        """
+        slices = []
+        for term, count in Counter(tokenize(query)).items():
+            term_id = self.term_ids.get(term)
+            if term_id is not None:
+                slices.append((self.offsets[term_id], self.offsets[term_id + 1], count))
+        if not slices:
+            return np.zeros(len(self.doc_ids), dtype=np.float32)
+
+        rows = np.concatenate([self.rows[start:end] for start, end, _ in slices])
+        weights = np.concatenate([self.weights[start:end] * count for start, end, count in slices])
+        scores = np.bincount(rows, weights=weights, minlength=len(self.doc_ids)).astype(np.float32)
+        if self.live is not None:
+            scores[~self.live] = 0.0
+        return scores
+
+    def search(self, queries: List[str], top_k: int,
+               selected_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        쿼리별 BM25 상위 청크 검색
+
+        Args:
+            queries: 쿼리 텍스트 목록
+            top_k: 쿼리별 반환할 결과 수
+            selected_ids: 검색 대상 청크 ID (None이면 전체)
+
+        Returns:
+            (점수 행렬, 청크 ID 행렬) - 부족한 자리는 점수 0, ID -1
+        """
+        scores_out = np.zeros((len(queries), top_k), dtype=np.float32)
+        ids_out = np.full((len(queries), top_k), -1, dtype=np.int64)
+        allowed = np.isin(self.doc_ids, selected_ids) if selected_ids is not None else None
+
+        for row, query in enumerate(queries):
+            scores = self.score(query)
+            if allowed is not None:
+                scores[~allowed] = 0.0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+            scores_out[row, :len(candidates)] = scores[candidates]
+            ids_out[row, :len(candidates)] = self.doc_ids[candidates]
+        return scores_out, ids_out
@@ -0,0 +1,49 @@
+"""
+메타데이터 필터 모듈: 필터 조건 형식과 메타데이터 한 건에 대한 조건 판정
+
+필터 형식 (필드 간에는 AND)
+- {'file_name': 'spec.docx'}: 값이 같은 청크
+- {'file_name': ['a.docx', 'b.docx']}: 값이 목록 중 하나인 청크 (IN)
+
+저장된 청크는 SQLite 메타데이터 저장소의 색인 열/JSON 식 색인으로 조회하고(MetadataStore.select_ids),
+이 모듈의 판정은 아직 저장소에 반영되지 않은 청크(스냅샷 이후 추가분)에만 사용합니다.
+"""
+
+from typing import Any, Dict, List
+
+# 저장소에서 색인으로 조회하는 자주 쓰는 필터 필드 (그 외 필드는 JSON 식을 행마다 계산)
+DEFAULT_FILTER_FIELDS = ['file_name', 'chunk_id', 'section_id', 'source', 'type']
+
+
+def _hashable(value: Any) -> Any:
+    """목록/사전 같은 값도 서로 비교할 수 있도록 변환"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def filter_values(expected: Any) -> List[Any]:
+    """필터 조건 값을 허용 값 목록으로 변환 (목록/집합이면 IN 조건)"""
+    return list(expected) if isinstance(expected, (list, tuple, set, frozenset)) else [expected]
+
+
+def matches_filters(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    메타데이터가 필터 조건을 모두 만족하는지 판정
+
+    Args:
+        metadata: 청크 메타데이터
+        filters: {필드: 값 또는 값 목록} 형식의 조건
+
+    Returns:
+        만족 여부
+    """
+    for field, expected in filters.items():
+        if field not in metadata:
+            return False
+        value = _hashable(metadata[field])
+        if not any(value == _hashable(allowed) for allowed in filter_values(expected)):
+            return False
+    return True
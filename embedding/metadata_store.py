@@ -0,0 +1,304 @@
+"""
+메타데이터 저장소 모듈: 청크 텍스트/메타데이터를 청크 단위 행으로 SQLite에 저장
+
+metadata.pkl처럼 전체를 한 번에 역직렬화하거나 다시 쓰지 않고, 변경된 행만 트랜잭션으로 반영합니다.
+WAL 모드를 사용하므로 쓰기 중에도 다른 프로세스/스레드의 읽기가 막히지 않습니다.
+벡터 DB는 텍스트/메타데이터를 메모리에 모두 올리지 않고, 검색 결과 행 조회와 문서별 청크 조회를
+이 저장소에서 수행합니다 (메모리 맵 로드도 같은 저장소 사용).
+
+테이블 chunks
+- seq: 삽입 순서 (메타데이터 목록 순서)
+- vector_id: 고정 청크 ID (FAISS 인덱스 ID)
+- file_name, chunk_id: 메타데이터에서 꺼낸 조회용 열 (인덱스 있음)
+- text: 청크 텍스트
+- metadata: 메타데이터 JSON (자주 쓰는 필터 필드는 json_extract 식 인덱스 있음)
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from embedding.metadata_filter import DEFAULT_FILTER_FIELDS, filter_values
+
+METADATA_DB_FILE = "metadata.sqlite"
+LEGACY_METADATA_FILE = "metadata.pkl"
+
+# SQLite 바인딩 변수 한도를 넘지 않도록 IN 조회를 나누는 크기
+FETCH_BATCH_SIZE = 500
+
+# 전체 행을 순회할 때 한 번에 읽는 행 수
+SCAN_BATCH_SIZE = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    vector_id INTEGER NOT NULL UNIQUE,
+    file_name TEXT,
+    chunk_id INTEGER,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_file_name ON chunks(file_name);
+CREATE INDEX IF NOT EXISTS idx_chunks_chunk_id ON chunks(chunk_id);
+"""
+
+# 조회용 열이 있는 필터 필드와 열에 저장되는 값 형식
+_COLUMN_FIELDS = {'file_name': str, 'chunk_id': int}
+
+# 열이 없는 자주 쓰는 필터 필드는 JSON 식 인덱스로 조회 (조회 식이 인덱스 식과 같아야 인덱스 사용)
+_JSON_INDEX_FIELDS = [field for field in DEFAULT_FILTER_FIELDS if field not in _COLUMN_FIELDS]
+_SCHEMA += "".join(f"CREATE INDEX IF NOT EXISTS idx_chunks_{field} ON chunks(json_extract(metadata, '$.{field}'));\n"
+                   for field in _JSON_INDEX_FIELDS)
+
+
+def metadata_store_exists(directory: str) -> bool:
+    """SQLite 메타데이터 저장소 파일이 있는지 확인"""
+    return os.path.exists(os.path.join(directory, METADATA_DB_FILE))
+
+
+def _row_values(vector_id: int, text: str, metadata: Dict[str, Any]) -> Tuple:
+    chunk_id = metadata.get('chunk_id')
+    return (
+        int(vector_id),
+        metadata.get('file_name'),
+        chunk_id if isinstance(chunk_id, int) else None,
+        text,
+        json.dumps(metadata, ensure_ascii=False),
+    )
+
+
+def _json_path(field: str) -> Tuple[str, List[Any]]:
+    """필드의 JSON 경로 SQL과 바인딩 값 (색인 필드는 인덱스와 같은 리터럴 경로 사용)"""
+    if field in _JSON_INDEX_FIELDS:
+        return f"'$.{field}'", []
+    if '"' in field:
+        raise ValueError(f"필터 필드 이름에 큰따옴표를 사용할 수 없습니다: {field}")
+    return "?", [f'$."{field}"']
+
+
+def _field_clause(field: str, values: List[Any]) -> Tuple[str, List[Any]]:
+    """필드 하나의 필터 조건 SQL (값 중 하나와 같으면 참)과 바인딩 값"""
+    path, path_params = _json_path(field)
+    column_type = _COLUMN_FIELDS.get(field)
+    terms, params = [], []
+    column_values, scalar_values = [], []
+    for value in values:
+        if column_type is not None and isinstance(value, column_type) and not isinstance(value, bool):
+            column_values.append(value)
+        elif value is None:
+            terms.append(f"json_type(metadata, {path}) = 'null'")
+            params.extend(path_params)
+        elif isinstance(value, (list, tuple, dict)):
+            terms.append(f"json_extract(metadata, {path}) = json(?)")
+            params.extend(path_params + [json.dumps(value, ensure_ascii=False)])
+        else:
+            scalar_values.append(value)
+    if column_values:
+        terms.append(f"{field} IN ({','.join('?' * len(column_values))})")
+        params.extend(column_values)
+    if scalar_values:
+        terms.append(f"json_extract(metadata, {path}) IN ({','.join('?' * len(scalar_values))})")
+        params.extend(path_params + scalar_values)
+    if not terms:
+        return "0", []
+    return "(" + " OR ".join(terms) + ")", params
+
+
+class MetadataStore:
+    """청크 단위 SQLite 메타데이터/텍스트 저장소"""
+
+    def __init__(self, directory: str):
+        """
+        저장소 열기 (없으면 생성)
+
+        Args:
+            directory: 벡터 DB 저장 경로
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, METADATA_DB_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """연결 닫기"""
+        with self._lock:
+            self._conn.close()
+
+    def copy_to(self, directory: str) -> "MetadataStore":
+        """
+        현재 내용을 다른 디렉토리의 새 저장소로 복사 (SQLite 백업 API)
+
+        Args:
+            directory: 복사할 디렉토리 (새 스냅샷 버전)
+
+        Returns:
+            복사된 저장소
+        """
+        target = MetadataStore(directory)
+        with self._lock, target._lock:
+            self._conn.backup(target._conn)
+        return target
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def fetch(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        청크 ID 목록의 텍스트/메타데이터를 묶어서 조회
+
+        Args:
+            ids: 청크 ID 목록
+
+        Returns:
+            {청크 ID: {'text', 'metadata'}} (없는 ID는 제외)
+        """
+        ids = [int(chunk_id) for chunk_id in ids]
+        records = {}
+        with self._lock:
+            for start in range(0, len(ids), FETCH_BATCH_SIZE):
+                batch = ids[start:start + FETCH_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT vector_id, text, metadata FROM chunks WHERE vector_id IN ({placeholders})", batch
+                ).fetchall()
+                for vector_id, text, metadata in rows:
+                    records[vector_id] = {'text': text, 'metadata': json.loads(metadata)}
+        return records
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        청크 ID 목록 중 저장소에 있는 ID 조회 (vector_id 인덱스 사용)
+
+        Args:
+            ids: 청크 ID 목록
+
+        Returns:
+            저장소에 있는 청크 ID 집합
+        """
+        ids = [int(chunk_id) for chunk_id in ids]
+        found = set()
+        with self._lock:
+            for start in range(0, len(ids), FETCH_BATCH_SIZE):
+                batch = ids[start:start + FETCH_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT vector_id FROM chunks WHERE vector_id IN ({placeholders})", batch
+                ))
+        return found
+
+    def all_ids(self) -> List[int]:
+        """삽입 순서대로의 전체 청크 ID 목록"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT vector_id FROM chunks ORDER BY seq")]
+
+    def iter_records(self) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """
+        전체 청크를 삽입 순서대로 SCAN_BATCH_SIZE행씩 나누어 읽기 (행 묶음마다만 잠금)
+
+        Yields:
+            (청크 ID, 텍스트, 메타데이터)
+        """
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, vector_id, text, metadata FROM chunks WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last_seq, SCAN_BATCH_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            for _, vector_id, text, metadata in rows:
+                yield vector_id, text, json.loads(metadata)
+            last_seq = rows[-1][0]
+
+    def ids_for_file(self, file_name: Optional[str]) -> List[int]:
+        """
+        파일명에 해당하는 청크 ID 조회 (file_name 인덱스 사용)
+
+        Args:
+            file_name: 문서 파일명 (None이면 파일명이 없는 청크)
+
+        Returns:
+            삽입 순서대로의 청크 ID 목록
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vector_id FROM chunks WHERE file_name IS ? ORDER BY seq", (file_name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def select_ids(self, filters: Dict[str, Any]) -> Set[int]:
+        """
+        메타데이터 필터 조건을 만족하는 청크 ID 조회
+
+        file_name/chunk_id는 조회용 열 인덱스로, 그 밖의 자주 쓰는 필드는 JSON 식 인덱스로
+        찾으므로 행마다 메타데이터 JSON을 파이썬에서 디코딩하지 않습니다.
+
+        Args:
+            filters: {필드: 값 또는 값 목록} 형식의 조건 (필드 간에는 AND)
+
+        Returns:
+            청크 ID 집합
+        """
+        clauses, params = [], []
+        for field, expected in filters.items():
+            clause, clause_params = _field_clause(field, filter_values(expected))
+            clauses.append(clause)
+            params.extend(clause_params)
+        query = "SELECT vector_id FROM chunks"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return {row[0] for row in self._conn.execute(query, params)}
+
+    def upsert(self, ids: Iterable[int], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """청크를 하나의 트랜잭션으로 추가 (같은 ID가 있으면 교체)"""
+        values = [_row_values(chunk_id, text, metadata) for chunk_id, text, metadata in zip(ids, texts, metadatas)]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (vector_id, file_name, chunk_id, text, metadata) VALUES (?, ?, ?, ?, ?)",
+                values
+            )
+
+    def delete(self, ids: Iterable[int]) -> None:
+        """청크를 하나의 트랜잭션으로 삭제"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM chunks WHERE vector_id = ?", [(int(chunk_id),) for chunk_id in ids])
+
+
+def migrate_pickle_metadata(directory: str) -> Optional[int]:
+    """
+    이전 형식 metadata.pkl을 SQLite 저장소로 옮기고 원본은 metadata.pkl.migrated로 보관
+
+    Args:
+        directory: 벡터 DB 저장 경로
+
+    Returns:
+        옮긴 청크 수 (metadata.pkl이 없으면 None)
+    """
+    legacy_path = os.path.join(directory, LEGACY_METADATA_FILE)
+    if not os.path.exists(legacy_path):
+        return None
+
+    with open(legacy_path, 'rb') as f:
+        metadata = pickle.load(f)
+    # 청크 ID가 없는 이전 형식은 위치를 ID로 사용 (인덱스 ID와 일치)
+    ids = metadata.get('ids', list(range(len(metadata['texts']))))
+
+    store = MetadataStore(directory)
+    try:
+        store.upsert(ids, metadata['texts'], metadata['metadatas'])
+    finally:
+        store.close()
+    os.replace(legacy_path, legacy_path + ".migrated")
+    print(f"metadata.pkl을 SQLite 저장소로 변환했습니다: 청크 {len(ids)}개")
+    return len(ids)
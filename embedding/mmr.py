@@ -0,0 +1,91 @@
+"""
+MMR 재정렬 모듈: 관련도와 이미 고른 청크와의 중복도를 함께 고려하여 검색 결과를 고름 (Maximal Marginal Relevance)
+
+오버랩 청크처럼 거의 같은 내용의 이웃이 상위 결과를 채우는 것을 막아,
+테스트케이스 생성 단계에서 같은 문장이 반복 처리되지 않도록 합니다.
+"""
+
+from typing import List
+
+import numpy as np
+
+# 기본 다양성 가중치 (0이면 관련도 순서 그대로, 1에 가까울수록 중복 회피 우선)
+DEFAULT_DIVERSITY = 0.3
+
+# 재정렬 전에 가져올 후보 배수
+MMR_CANDIDATE_FACTOR = 4
+
+
+def unit_vectors(vectors: np.ndarray) -> np.ndarray:
+    """행별 L2 정규화"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def relevance_from_query(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """
+    쿼리와 후보의 코사인 유사도를 관련도로 사용 (중복도와 같은 척도)
+
+    Args:
+        query: (차원,) 쿼리 벡터
+        vectors: (후보 수, 차원) 후보 벡터
+
+    Returns:
+        관련도 배열
+    """
+    return unit_vectors(vectors) @ unit_vectors(np.ravel(query))
+
+
+def relevance_from_distances(distances) -> np.ndarray:
+    """
+    거리(낮을수록 관련)를 0~1 관련도 점수로 변환 (쿼리 벡터가 없는 키워드 검색 결과용)
+
+    Args:
+        distances: 후보 거리 목록
+
+    Returns:
+        관련도 배열 (가장 가까운 후보가 1)
+    """
+    relevance = -np.asarray(distances, dtype=np.float32)
+    spread = float(relevance.max() - relevance.min()) if len(relevance) else 0.0
+    if spread <= 0:
+        return np.ones(len(relevance), dtype=np.float32)
+    return (relevance - relevance.min()) / spread
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, top_k: int,
+               diversity: float = DEFAULT_DIVERSITY) -> List[int]:
+    """
+    MMR로 후보 위치 선택
+
+    매 단계 (1 - diversity) * 관련도 - diversity * (이미 고른 후보와의 최대 코사인 유사도)가
+    가장 큰 후보를 고릅니다. 유사도 행렬은 한 번에 계산하고 최대 유사도는 단계마다 벡터 연산으로 갱신합니다.
+
+    Args:
+        relevance: 후보별 관련도 (코사인 유사도 또는 0~1 점수)
+        vectors: (후보 수, 차원) 후보 벡터
+        top_k: 고를 후보 수
+        diversity: 다양성 가중치 (0~1)
+
+    Returns:
+        선택 순서대로의 후보 위치 목록
+    """
+    count = len(relevance)
+    if count == 0 or top_k <= 0:
+        return []
+
+    unit = unit_vectors(vectors)
+    similarities = unit @ unit.T
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    max_similarity = np.zeros(count, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    selected = []
+    for _ in range(min(top_k, count)):
+        scores = (1.0 - diversity) * relevance - diversity * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarities[best], out=max_similarity)
+    return selected
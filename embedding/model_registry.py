@@ -0,0 +1,175 @@
+"""
+임베딩 모델 레지스트리: 프로세스 전역에서 임베딩 모델 인스턴스를 공유하고 LRU 방식으로 관리
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# 기본 레지스트리 한도
+DEFAULT_MAX_MODELS = 2
+DEFAULT_MEMORY_BUDGET_MB = 2048
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """
+    모델이 차지하는 메모리(바이트)를 추정
+
+    Args:
+        model: 임베딩 모델 인스턴스
+
+    Returns:
+        추정 메모리 크기 (추정할 수 없으면 0)
+    """
+    parameters = getattr(model, 'parameters', None)
+    if not callable(parameters):
+        return 0
+
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return 0
+
+
+class ModelRegistry:
+    """모델명 단위로 모델을 캐싱하는 스레드 안전 LRU 레지스트리"""
+
+    def __init__(self, loader: Callable[[str], Any], max_models: int = DEFAULT_MAX_MODELS,
+                 memory_budget_mb: Optional[float] = DEFAULT_MEMORY_BUDGET_MB):
+        """
+        레지스트리 초기화
+
+        Args:
+            loader: 모델명을 받아 모델 인스턴스를 생성하는 함수
+            max_models: 동시에 유지할 최대 모델 수
+            memory_budget_mb: 유지할 모델들의 메모리 한도 (None이면 제한 없음)
+        """
+        self.loader = loader
+        self.max_models = max_models
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+
+        self._models = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._generations: Dict[str, int] = {}
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, model_name: str, loader: Optional[Callable[[str], Any]] = None) -> Any:
+        """
+        모델을 반환하고, 없으면 로드하여 등록
+
+        Args:
+            model_name: 모델명 (레지스트리 키)
+            loader: 이번 호출에만 사용할 로더 (선택사항)
+
+        Returns:
+            모델 인스턴스
+        """
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                self.hits += 1
+                return self._models[model_name]
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # 같은 모델을 여러 스레드가 동시에 로드하지 않도록 모델별 잠금 사용
+        with load_lock:
+            with self._lock:
+                if model_name in self._models:
+                    self._models.move_to_end(model_name)
+                    self.hits += 1
+                    return self._models[model_name]
+
+            model = (loader or self.loader)(model_name)
+            size = estimate_model_bytes(model)
+
+            with self._lock:
+                self._models[model_name] = model
+                self._sizes[model_name] = size
+                self.loads += 1
+                self._generations[model_name] = self.loads
+                self._evict_over_budget(keep=model_name)
+
+        return model
+
+    def _evict_over_budget(self, keep: str) -> None:
+        """모델 수 또는 메모리 한도를 넘으면 가장 오래 사용하지 않은 모델부터 제거"""
+        while len(self._models) > 1:
+            over_count = len(self._models) > self.max_models
+            over_memory = (self.memory_budget_bytes is not None
+                           and sum(self._sizes.values()) > self.memory_budget_bytes)
+            if not over_count and not over_memory:
+                break
+
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, model_name: str) -> None:
+        # 모델별 로드 잠금은 제거하지 않음: 다른 스레드가 기다리는 중에 잠금을 새로 만들면
+        # 같은 모델을 두 번 로드할 수 있음 (잠금 수는 사용한 모델명 수로 제한됨)
+        self._models.pop(model_name, None)
+        self._sizes.pop(model_name, None)
+
+    def evict(self, model_name: str) -> bool:
+        """
+        특정 모델을 레지스트리에서 제거
+
+        Args:
+            model_name: 제거할 모델명
+
+        Returns:
+            제거 여부
+        """
+        with self._lock:
+            if model_name not in self._models:
+                return False
+            self._remove(model_name)
+            self.evictions += 1
+            return True
+
+    def clear(self) -> None:
+        """등록된 모든 모델 제거"""
+        with self._lock:
+            self.evictions += len(self._models)
+            self._models.clear()
+            self._sizes.clear()
+
+    def generation(self, model_name: str) -> int:
+        """
+        모델이 마지막으로 로드된 세대 번호 반환 (다시 로드되면 바뀜)
+
+        Args:
+            model_name: 모델명
+
+        Returns:
+            세대 번호 (로드된 적이 없으면 0)
+        """
+        with self._lock:
+            return self._generations.get(model_name, 0)
+
+    def __contains__(self, model_name: str) -> bool:
+        with self._lock:
+            return model_name in self._models
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        레지스트리 사용 통계 반환
+
+        Returns:
+            적중/로드/제거 횟수와 현재 적재된 모델 정보
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'models': list(self._models.keys()),
+                'memory_bytes': sum(self._sizes.values()),
+            }
@@ -0,0 +1,155 @@
+"""
+양자화 추론 모듈: CPU 배포용 임베딩 모델의 선형 계층을 동적 int8로 양자화하고 디스크에 캐싱
+
+- 가중치는 int8로 저장하고 활성값은 배치마다 동적으로 양자화 (nn.Linear만 대상, 정확도 손실이 작음)
+- 양자화한 가중치(state_dict)는 data/models/quantized 아래에 저장하고, 다음 실행부터는 원본 구조를
+  양자화한 모듈에 weights_only 로드로 복원 (캐시 파일을 언피클하지 않으므로 임의 코드가 실행되지 않음)
+- 모델명 뒤에 '@int8'을 붙인 이름을 양자화 모델 이름으로 사용하므로
+  임베딩 캐시/쿼리 캐시/모델 레지스트리가 fp32 모델과 자동으로 구분됨
+
+torch 모듈이 아닌 모델(오프라인 해시 임베딩 등)은 양자화하지 않고 그대로 사용합니다.
+"""
+
+import hashlib
+import os
+import re
+from typing import Any, Callable, Optional, Tuple
+
+QUANTIZED_MODEL_SUFFIX = "@int8"
+DEFAULT_QUANTIZED_MODEL_DIR = os.path.join("data", "models", "quantized")
+
+# 양자화 방식이 바뀌면 올려서 캐시된 모델을 다시 생성
+QUANTIZATION_VERSION = 2
+
+
+def quantized_model_name(model_name: str) -> str:
+    """양자화 모델 이름 (이미 양자화 모델 이름이면 그대로)"""
+    return model_name if model_name.endswith(QUANTIZED_MODEL_SUFFIX) else model_name + QUANTIZED_MODEL_SUFFIX
+
+
+def split_quantized_name(model_name: str) -> Tuple[str, bool]:
+    """
+    모델 이름에서 양자화 표시 분리
+
+    Args:
+        model_name: 모델 이름 ('all-MiniLM-L6-v2' 또는 'all-MiniLM-L6-v2@int8')
+
+    Returns:
+        (원본 모델 이름, 양자화 여부)
+    """
+    if model_name.endswith(QUANTIZED_MODEL_SUFFIX):
+        return model_name[:-len(QUANTIZED_MODEL_SUFFIX)], True
+    return model_name, False
+
+
+def set_torch_threads(num_threads: Optional[int]) -> None:
+    """
+    torch 연산 내부 스레드 수 설정 (프로세스 전역)
+
+    Args:
+        num_threads: 스레드 수 (None 또는 0 이하이면 변경하지 않음)
+    """
+    if not num_threads or num_threads <= 0:
+        return
+    import torch
+    if torch.get_num_threads() != num_threads:
+        torch.set_num_threads(num_threads)
+        print(f"torch 연산 스레드 수: {num_threads}")
+
+
+def _is_torch_module(model: Any) -> bool:
+    try:
+        import torch
+    except ImportError:
+        return False
+    return isinstance(model, torch.nn.Module)
+
+
+def quantize_model(model: Any) -> Any:
+    """
+    선형 계층을 동적 int8로 양자화
+
+    Args:
+        model: 임베딩 모델 (torch 모듈)
+
+    Returns:
+        양자화된 모델 (torch 모듈이 아니면 입력 그대로)
+    """
+    if not _is_torch_module(model):
+        return model
+
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    # x86은 fbgemm, ARM은 qnnpack 엔진 사용
+    engines = torch.backends.quantized.supported_engines
+    if torch.backends.quantized.engine not in engines or torch.backends.quantized.engine == 'none':
+        torch.backends.quantized.engine = 'fbgemm' if 'fbgemm' in engines else 'qnnpack'
+
+    model.eval()
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_model_path(model_name: str, cache_dir: str = DEFAULT_QUANTIZED_MODEL_DIR) -> str:
+    """
+    양자화 모델 캐시 파일 경로 (torch 버전/양자화 방식이 바뀌면 다른 파일)
+
+    Args:
+        model_name: 원본 모델 이름
+        cache_dir: 캐시 디렉토리
+
+    Returns:
+        캐시 파일 경로
+    """
+    import torch
+    key = f"{model_name}|{torch.__version__}|{torch.backends.quantized.engine}|{QUANTIZATION_VERSION}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+    safe_name = re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)[:64]
+    return os.path.join(cache_dir, f"{safe_name}.{digest}.pt")
+
+
+def load_quantized_model(model_name: str, loader: Callable[[str], Any],
+                         cache_dir: str = DEFAULT_QUANTIZED_MODEL_DIR) -> Any:
+    """
+    원본 모델을 양자화하고, 캐시된 양자화 가중치가 있으면 불러오며 없으면 저장
+
+    Args:
+        model_name: 원본 모델 이름
+        loader: 원본 모델을 생성하는 함수
+        cache_dir: 캐시 디렉토리
+
+    Returns:
+        양자화된 모델 (torch 모듈이 아닌 모델은 원본 그대로)
+    """
+    try:
+        import torch
+    except ImportError:
+        return loader(model_name)
+
+    model = loader(model_name)
+    if not _is_torch_module(model):
+        return model
+
+    # 양자화 모듈 구조는 원본 모델에서 다시 만들고, 캐시에서는 텐서만 읽음
+    quantized = quantize_model(model)
+    path = quantized_model_path(model_name, cache_dir)
+    if os.path.exists(path):
+        try:
+            state_dict = torch.load(path, map_location='cpu', weights_only=True)
+            quantized.load_state_dict(state_dict)
+            print(f"양자화 모델 캐시 로드: {path}")
+            return quantized
+        except Exception as e:
+            print(f"양자화 모델 캐시 로드 실패, 다시 생성합니다: {e}")
+            # 일부만 덮어쓴 가중치를 쓰지 않도록 원본에서 다시 양자화
+            quantized = quantize_model(loader(model_name))
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save(quantized.state_dict(), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        print(f"양자화 모델 저장: {path}")
+    except Exception as e:
+        # 저장에 실패해도 이번 실행에서는 양자화 모델 사용
+        print(f"양자화 모델 저장 실패: {e}")
+    return quantized
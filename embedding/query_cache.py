@@ -0,0 +1,159 @@
+"""
+쿼리 임베딩 캐시 모듈: (모델명, 정규화된 쿼리) 기준으로 쿼리 벡터를 메모리에 보관하는 LRU 캐시
+
+같은 쿼리(공백만 다른 쿼리 포함)가 반복될 때 모델 인코딩을 건너뜁니다.
+모델이 다시 로드되어 세대 번호가 바뀌면 해당 모델의 항목은 모두 무효화됩니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding.embedding_cache import normalize_text
+
+# 기본 캐시 한도
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+class QueryEmbeddingCache:
+    """스레드 안전 LRU + TTL 쿼리 벡터 캐시"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        """
+        쿼리 캐시 초기화
+
+        Args:
+            max_entries: 최대 보관 쿼리 수
+            ttl_seconds: 항목 유효 시간 (None이면 만료 없음)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_generation(self, model_name: str, generation: int) -> None:
+        """모델 세대가 바뀌었으면 해당 모델 항목 무효화 (잠금 안에서 호출)"""
+        if self._generations.get(model_name) == generation:
+            return
+        if model_name in self._generations:
+            stale = [key for key in self._entries if key[0] == model_name]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        self._generations[model_name] = generation
+
+    def lookup(self, model_name: str, generation: int, queries: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        쿼리 목록의 캐시된 벡터 조회
+
+        Args:
+            model_name: 모델명
+            generation: 모델 세대 번호 (ModelRegistry.generation)
+            queries: 쿼리 텍스트 목록
+
+        Returns:
+            쿼리 순서대로의 벡터 (미적중이면 None)
+        """
+        now = time.time()
+        found: List[Optional[np.ndarray]] = []
+        with self._lock:
+            self._check_generation(model_name, generation)
+            for query in queries:
+                key = (model_name, normalize_text(query))
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl_seconds is not None and now - entry[1] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+
+                if entry is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found.append(entry[0])
+        return found
+
+    def store(self, model_name: str, generation: int, queries: List[str], vectors: np.ndarray) -> None:
+        """
+        새로 인코딩한 쿼리 벡터 저장
+
+        Args:
+            model_name: 모델명
+            generation: 모델 세대 번호
+            queries: 쿼리 텍스트 목록
+            vectors: (쿼리 수, 차원) 벡터 행렬
+        """
+        now = time.time()
+        with self._lock:
+            self._check_generation(model_name, generation)
+            for query, vector in zip(queries, vectors):
+                key = (model_name, normalize_text(query))
+                vector = np.array(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                self._entries[key] = (vector, now)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_name: Optional[str] = None) -> int:
+        """
+        캐시 항목 무효화
+
+        Args:
+            model_name: 무효화할 모델명 (None이면 전체)
+
+        Returns:
+            제거된 항목 수
+        """
+        with self._lock:
+            if model_name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._generations.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == model_name]
+                for key in stale:
+                    del self._entries[key]
+                self._generations.pop(model_name, None)
+                removed = len(stale)
+            self.invalidations += removed
+            return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 사용 통계 반환
+
+        Returns:
+            적중/미적중/만료/제거/무효화 수와 적중률
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
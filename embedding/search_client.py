@@ -0,0 +1,272 @@
+"""
+검색 서버 클라이언트 모듈: 로컬 임베딩/검색 서버(search_server)와 주고받는 바이너리 프로토콜과 클라이언트
+
+메시지 형식 (리틀 엔디안)
+- 헤더: 매직(4바이트 b'TCSV'), 프로토콜 버전(uint8), 연산 또는 상태(uint8), JSON 길이(uint32), 바이너리 길이(uint32)
+- 본문: UTF-8 JSON + 바이너리(float32 벡터 행렬 등)
+
+서버 주소는 TC_SEARCH_SERVER 환경 변수로 지정합니다.
+- unix:/경로/search.sock: 유닉스 도메인 소켓
+- 127.0.0.1:8765: localhost TCP
+지정하지 않으면 클라이언트를 사용하지 않고 모든 처리를 현재 프로세스에서 수행합니다.
+"""
+
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SERVER_ADDRESS_ENV = "TC_SEARCH_SERVER"
+
+MAGIC = b'TCSV'
+PROTOCOL_VERSION = 1
+
+# 요청 연산
+OP_PING = 1
+OP_ENCODE = 2
+OP_SEARCH = 3
+OP_RADIUS = 4
+OP_STATS = 5
+
+# 응답 상태
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_BUSY = 2
+
+# 한 메시지의 최대 크기 (바이트)
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# 기본 타임아웃과 서버 과부하 시 재시도 설정
+DEFAULT_TIMEOUT = 30.0
+BUSY_RETRIES = 3
+BUSY_BACKOFF_SECONDS = 0.05
+
+_HEADER = struct.Struct('<4sBBII')
+
+
+class ServerBusyError(RuntimeError):
+    """서버 대기열이 가득 차 요청이 거절됨"""
+
+
+class ServerError(RuntimeError):
+    """서버에서 요청 처리 중 오류 발생"""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("연결이 종료되었습니다.")
+        received += count
+    return bytes(buffer)
+
+
+def _json_default(value: Any) -> Any:
+    # 메타데이터에 남아 있는 numpy 스칼라/배열
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"JSON으로 변환할 수 없는 값입니다: {type(value).__name__}")
+
+
+def send_message(sock: socket.socket, code: int, payload: Dict[str, Any], blob: bytes = b'') -> None:
+    """
+    메시지 전송
+
+    Args:
+        sock: 연결된 소켓
+        code: 요청 연산 또는 응답 상태
+        payload: JSON으로 보낼 사전
+        blob: 추가 바이너리 데이터
+    """
+    body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+    sock.sendall(_HEADER.pack(MAGIC, PROTOCOL_VERSION, code, len(body), len(blob)) + body + blob)
+
+
+def recv_message(sock: socket.socket) -> Tuple[int, Dict[str, Any], bytes]:
+    """
+    메시지 수신
+
+    Args:
+        sock: 연결된 소켓
+
+    Returns:
+        (연산 또는 상태, JSON 사전, 바이너리 데이터)
+    """
+    magic, version, code, json_length, blob_length = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        raise ConnectionError("검색 서버 프로토콜이 일치하지 않습니다.")
+    if json_length + blob_length > MAX_MESSAGE_BYTES:
+        raise ConnectionError(f"메시지가 너무 큽니다: {json_length + blob_length} 바이트")
+    payload = json.loads(_recv_exact(sock, json_length).decode('utf-8')) if json_length else {}
+    blob = _recv_exact(sock, blob_length) if blob_length else b''
+    return code, payload, blob
+
+
+def parse_address(address: str):
+    """
+    서버 주소 문자열 해석
+
+    Args:
+        address: 'unix:/경로' 또는 '호스트:포트'
+
+    Returns:
+        (소켓 패밀리, 주소)
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+class SearchClient:
+    """검색 서버 클라이언트 - 스레드마다 연결 하나를 유지"""
+
+    def __init__(self, address: str, timeout: float = DEFAULT_TIMEOUT):
+        """
+        클라이언트 생성 (연결은 처음 요청할 때 수행)
+
+        Args:
+            address: 서버 주소 ('unix:/경로' 또는 '호스트:포트')
+            timeout: 요청 타임아웃 (초)
+        """
+        self.address = address
+        self.timeout = timeout
+        self._family, self._target = parse_address(address)
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(self._family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self._target)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def close(self) -> None:
+        """현재 스레드의 연결 닫기"""
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def request(self, op: int, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """
+        요청 전송 후 응답 수신 (서버 과부하 응답은 잠시 후 재시도)
+
+        Args:
+            op: 요청 연산
+            payload: 요청 JSON 사전
+
+        Returns:
+            (응답 JSON 사전, 바이너리 데이터)
+        """
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                sock = self._connection()
+                send_message(sock, op, payload)
+                status, response, blob = recv_message(sock)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+
+            if status == STATUS_OK:
+                return response, blob
+            if status == STATUS_ERROR:
+                raise ServerError(response.get('error', '알 수 없는 서버 오류'))
+            time.sleep(BUSY_BACKOFF_SECONDS * (2 ** attempt))
+        raise ServerBusyError("검색 서버 대기열이 가득 찼습니다.")
+
+    def ping(self) -> bool:
+        """서버 응답 여부 확인"""
+        try:
+            self.request(OP_PING, {})
+            return True
+        except (OSError, ConnectionError, ServerError, ServerBusyError):
+            return False
+
+    def open_db(self, persist_directory: str) -> Dict[str, Any]:
+        """
+        서버에 벡터 DB를 로드시키고 거리 기준 조회
+
+        Args:
+            persist_directory: 벡터 DB 경로
+
+        Returns:
+            {'metric': 거리 기준, 'version': 스냅샷 버전}
+        """
+        return self.request(OP_PING, {'db': os.path.abspath(persist_directory)})[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """서버 처리 통계 조회"""
+        return self.request(OP_STATS, {})[0]
+
+    def encode(self, model_name: str, texts: List[str]) -> np.ndarray:
+        """
+        쿼리 텍스트 임베딩
+
+        Args:
+            model_name: 임베딩 모델명
+            texts: 텍스트 목록
+
+        Returns:
+            (텍스트 수, 차원) float32 행렬
+        """
+        response, blob = self.request(OP_ENCODE, {'model': model_name, 'texts': texts})
+        return np.frombuffer(blob, dtype=np.float32).reshape(response['shape']).copy()
+
+    def search(self, persist_directory: str, queries: List[str], **params) -> List[List[Dict]]:
+        """
+        벡터 DB 검색 (params는 search_similar_batch의 키워드 인자)
+
+        Args:
+            persist_directory: 서버가 로드할 벡터 DB 경로
+            queries: 쿼리 목록
+
+        Returns:
+            쿼리 순서대로의 청크 목록
+        """
+        payload = dict(params, db=os.path.abspath(persist_directory), queries=queries)
+        return self.request(OP_SEARCH, payload)[0]['results']
+
+    def search_within_radius(self, persist_directory: str, query: str, **params) -> List[Dict]:
+        """
+        코사인 유사도 임계값 이상 청크 검색 (params는 search_within_radius의 키워드 인자)
+
+        Args:
+            persist_directory: 서버가 로드할 벡터 DB 경로
+            query: 쿼리 텍스트
+
+        Returns:
+            유사도 내림차순 청크 목록
+        """
+        payload = dict(params, db=os.path.abspath(persist_directory), query=query)
+        return self.request(OP_RADIUS, payload)[0]['results']
+
+
+_client: Optional[SearchClient] = None
+_client_lock = threading.Lock()
+
+
+def get_search_client() -> Optional[SearchClient]:
+    """TC_SEARCH_SERVER 환경 변수로 지정된 서버의 클라이언트 (지정되지 않았으면 None)"""
+    global _client
+    address = os.environ.get(SERVER_ADDRESS_ENV)
+    if not address:
+        return None
+    with _client_lock:
+        if _client is None or _client.address != address:
+            _client = SearchClient(address)
+        return _client
@@ -0,0 +1,336 @@
+"""
+로컬 임베딩/검색 서버 모듈: 모델과 벡터 DB를 한 번만 로드하고 여러 UI 세션/스크립트의 요청을 처리
+
+- 짧은 시간 창(기본 5ms) 안에 들어온 인코딩/검색 요청을 모아 한 번의 모델 인코딩/FAISS 검색으로 처리
+- 대기열이 가득 차면 즉시 BUSY로 응답 (클라이언트는 잠시 후 재시도하고, 계속 실패하면 현재 프로세스에서 처리)
+- 벡터 DB는 VectorDBHandle로 열어 새 스냅샷 버전이 공개되면 다시 로드
+
+사용 예:
+    python -m embedding.search_server --socket data/run/search.sock
+    TC_SEARCH_SERVER=unix:data/run/search.sock streamlit run ui/app.py
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedding.search_client import (recv_message, send_message, parse_address, ServerBusyError,
+                                     SERVER_ADDRESS_ENV, OP_PING, OP_ENCODE, OP_SEARCH, OP_RADIUS, OP_STATS,
+                                     STATUS_OK, STATUS_ERROR, STATUS_BUSY)
+
+DEFAULT_SOCKET_PATH = os.path.join("data", "run", "search.sock")
+
+# 요청을 모으는 시간 창, 한 번에 처리할 최대 텍스트/쿼리 수, 대기열 한도
+DEFAULT_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_PENDING = 1024
+
+# 동시에 연결을 시도하는 세션/작업자 수 한도
+LISTEN_BACKLOG = 128
+
+# 요청 결과 대기 한도 (초)
+REQUEST_TIMEOUT = 60.0
+
+
+class MicroBatcher:
+    """같은 키의 요청을 시간 창 안에서 모아 한 번에 처리하는 대기열"""
+
+    def __init__(self, name: str, process: Callable[[Any, List[Any]], List[Any]],
+                 window_seconds: float, max_batch: int, max_pending: int):
+        """
+        배처 생성 및 처리 스레드 시작
+
+        Args:
+            name: 통계/스레드 이름
+            process: (키, 항목 목록) -> 항목별 결과 목록
+            window_seconds: 요청을 모으는 시간 창
+            max_batch: 한 번에 처리할 최대 항목 수
+            max_pending: 대기 가능한 최대 요청 수 (초과 시 ServerBusyError)
+        """
+        self.name = name
+        self.process = process
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+
+        self.requests = 0
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+
+        threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True).start()
+
+    def submit(self, key: Any, items: List[Any]) -> Future:
+        """
+        요청 등록
+
+        Args:
+            key: 함께 처리할 수 있는 요청을 구분하는 키
+            items: 요청 항목 목록 (텍스트 또는 쿼리)
+
+        Returns:
+            항목별 결과 목록을 받을 Future
+        """
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((key, items, future))
+        except queue.Full:
+            self.rejected += 1
+            raise ServerBusyError(f"{self.name} 대기열이 가득 찼습니다.")
+        return future
+
+    def _collect(self) -> List[tuple]:
+        """첫 요청 이후 시간 창이 끝나거나 최대 항목 수에 도달할 때까지 요청 수집"""
+        batch = [self._queue.get()]
+        count = len(batch[0][1])
+        deadline = time.monotonic() + self.window_seconds
+        while count < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            count += len(request[1])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            groups: Dict[Any, List[tuple]] = {}
+            for request in batch:
+                groups.setdefault(request[0], []).append(request)
+
+            for key, requests in groups.items():
+                items = [item for _, request_items, _ in requests for item in request_items]
+                self.requests += len(requests)
+                self.batches += 1
+                self.items += len(items)
+                try:
+                    results = self.process(key, items)
+                except Exception as e:
+                    for _, _, future in requests:
+                        future.set_exception(e)
+                    continue
+
+                # 항목별 결과를 요청 단위로 다시 나눔
+                start = 0
+                for _, request_items, future in requests:
+                    future.set_result(results[start:start + len(request_items)])
+                    start += len(request_items)
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 처리 통계"""
+        return {
+            'pending': self._queue.qsize(),
+            'requests': self.requests,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_items': self.items / self.batches if self.batches else 0.0,
+            'rejected': self.rejected,
+        }
+
+
+class SearchService:
+    """모델/벡터 DB를 보유하고 인코딩/검색 요청을 배치로 처리"""
+
+    def __init__(self, window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_pending: int = DEFAULT_MAX_PENDING, mmap: bool = False):
+        """
+        서비스 생성
+
+        Args:
+            window_ms: 요청을 모으는 시간 창 (밀리초)
+            max_batch: 한 번에 처리할 최대 텍스트/쿼리 수
+            max_pending: 배처별 대기 가능한 최대 요청 수
+            mmap: 벡터 DB를 메모리 맵(읽기 전용)으로 로드할지 여부
+        """
+        self.mmap = mmap
+        self.started_at = time.time()
+        window_seconds = window_ms / 1000.0
+        self.encoder = MicroBatcher('encode', self._encode_batch, window_seconds, max_batch, max_pending)
+        self.searcher = MicroBatcher('search', self._search_batch, window_seconds, max_batch, max_pending)
+        # 범위 검색은 쿼리별로 처리하므로 동시 실행 수만 제한
+        self._radius_slots = threading.BoundedSemaphore(max(1, max_pending // 16))
+
+    def _vector_db_handle(self, persist_directory: str):
+        from embedding.snapshots import get_vector_db_handle
+        return get_vector_db_handle(persist_directory, mmap=self.mmap)
+
+    def _encode_batch(self, model_name: str, texts: List[str]) -> List[np.ndarray]:
+        from embedding.embedder import Embedder
+        return list(Embedder(model_name).embed_queries(texts))
+
+    def _search_batch(self, key: str, queries: List[str]) -> List[List[Dict]]:
+        from embedding.embedder import search_similar_batch
+        params = json.loads(key)
+        persist_directory = params.pop('db')
+        with self._vector_db_handle(persist_directory).pinned() as vector_db:
+            return search_similar_batch(vector_db, queries, **params)
+
+    def encode(self, payload: Dict[str, Any]):
+        texts = payload['texts']
+        vectors = self.encoder.submit(payload['model'], texts).result(REQUEST_TIMEOUT)
+        matrix = np.ascontiguousarray(np.stack(vectors) if vectors else np.empty((0, 0)), dtype=np.float32)
+        return {'shape': list(matrix.shape)}, matrix.tobytes()
+
+    def search(self, payload: Dict[str, Any]):
+        queries = payload.pop('queries')
+        # 중복 제거는 요청 단위로 클라이언트에서 수행하므로 배치 검색에서는 끔
+        payload.pop('deduplicate', None)
+        key = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return {'results': self.searcher.submit(key, queries).result(REQUEST_TIMEOUT)}, b''
+
+    def search_within_radius(self, payload: Dict[str, Any]):
+        from embedding.embedder import search_within_radius
+        if not self._radius_slots.acquire(blocking=False):
+            raise ServerBusyError("범위 검색 동시 실행 수를 초과했습니다.")
+        try:
+            persist_directory = payload.pop('db')
+            query = payload.pop('query')
+            with self._vector_db_handle(persist_directory).pinned() as vector_db:
+                return {'results': search_within_radius(vector_db, query, **payload)}, b''
+        finally:
+            self._radius_slots.release()
+
+    def ping(self, payload: Dict[str, Any]):
+        response = {'pid': os.getpid()}
+        if payload.get('db'):
+            from embedding.embedder import vector_db_metric
+            vector_db = self._vector_db_handle(payload['db']).get()
+            response.update(metric=vector_db_metric(vector_db), version=vector_db.get('version'))
+        return response, b''
+
+    def stats(self) -> Dict[str, Any]:
+        from embedding.embedder import get_model_registry_stats, get_query_cache_stats
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'encode': self.encoder.stats(),
+            'search': self.searcher.stats(),
+            'models': get_model_registry_stats(),
+            'query_cache': get_query_cache_stats(),
+        }
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """연결 하나에서 여러 요청을 순서대로 처리"""
+
+    def handle(self) -> None:
+        service: SearchService = self.server.service
+        handlers = {
+            OP_PING: service.ping,
+            OP_ENCODE: service.encode,
+            OP_SEARCH: service.search,
+            OP_RADIUS: service.search_within_radius,
+            OP_STATS: lambda payload: (service.stats(), b''),
+        }
+        while True:
+            try:
+                op, payload, _ = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                handler = handlers.get(op)
+                if handler is None:
+                    raise ValueError(f"알 수 없는 요청입니다: {op}")
+                response, blob = handler(payload)
+                send_message(self.request, STATUS_OK, response, blob)
+            except ServerBusyError as e:
+                send_message(self.request, STATUS_BUSY, {'error': str(e)})
+            except FutureTimeoutError:
+                # 대기열에서 처리 차례가 오지 않은 요청도 과부하로 응답 (클라이언트가 재시도/로컬 처리)
+                send_message(self.request, STATUS_BUSY,
+                             {'error': f"요청이 {REQUEST_TIMEOUT:.0f}초 안에 처리되지 않았습니다."})
+            except Exception as e:
+                send_message(self.request, STATUS_ERROR, {'error': f"{type(e).__name__}: {e}"})
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+    allow_reuse_address = True
+
+
+def create_server(address: str, service: SearchService) -> socketserver.BaseServer:
+    """
+    주소에 맞는 서버 생성
+
+    Args:
+        address: 'unix:/경로' 또는 '호스트:포트'
+        service: 요청을 처리할 서비스
+
+    Returns:
+        시작 전의 소켓 서버 (serve_forever로 실행)
+    """
+    family, target = parse_address(address)
+    if family == socket.AF_UNIX:
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        if os.path.exists(target):
+            # 이전 실행에서 남은 소켓 파일 제거
+            os.remove(target)
+        server = _UnixServer(target, _RequestHandler)
+    else:
+        server = _TCPServer(target, _RequestHandler)
+    server.service = service
+    return server
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="로컬 임베딩/검색 서버")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help=f"유닉스 소켓 경로 (기본값: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--host", default=None, help="TCP로 실행할 때의 호스트 (예: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP 포트 (기본값: 8765)")
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS, help="요청 모음 시간 창 (밀리초)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="배치당 최대 텍스트/쿼리 수")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING, help="대기 가능한 최대 요청 수")
+    parser.add_argument("--mmap", action="store_true", help="벡터 DB를 메모리 맵(읽기 전용)으로 로드")
+    parser.add_argument("--preload-model", action="append", default=[], help="시작할 때 로드할 모델명")
+    parser.add_argument("--preload-db", action="append", default=[], help="시작할 때 로드할 벡터 DB 경로")
+    args = parser.parse_args()
+
+    # 서버 안의 검색은 항상 현재 프로세스에서 처리 (자기 자신에게 요청하지 않도록)
+    os.environ.pop(SERVER_ADDRESS_ENV, None)
+
+    address = f"{args.host}:{args.port}" if args.host else f"unix:{args.socket}"
+    service = SearchService(window_ms=args.window_ms, max_batch=args.max_batch,
+                            max_pending=args.max_pending, mmap=args.mmap)
+
+    from embedding.embedder import Embedder
+    for model_name in args.preload_model:
+        Embedder(model_name)
+    for persist_directory in args.preload_db:
+        service._vector_db_handle(os.path.abspath(persist_directory)).get()
+
+    server = create_server(address, service)
+    print(f"검색 서버 시작: {address} (PID {os.getpid()}, 시간 창 {args.window_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("검색 서버를 종료합니다.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
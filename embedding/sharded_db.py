@@ -0,0 +1,417 @@
+"""
+샤드 벡터 DB 모듈: 게임 프로젝트/기획서 계열마다 별도 인덱스(샤드)를 두고, 검색은 모든 샤드에 걸쳐 수행
+
+저장 형식
+- shards.json: 샤드 기준 메타데이터 필드와 샤드별 하위 디렉토리/필드 값 목록
+- shards/<샤드>/: 일반 벡터 DB 디렉토리 (faiss_index.bin, metadata.sqlite 등)
+
+검색은 스레드 풀로 샤드별로 병렬 수행하고(FAISS 검색은 GIL을 해제), 벡터 결과는 거리 기준 힙 병합으로,
+샤드마다 점수 척도가 다른 BM25 결과는 샤드 내 순위 기준으로 합쳐 상위 결과를 고릅니다.
+샤드는 개별적으로 로드/언로드할 수 있으며, 언로드된 샤드는 검색에 필요할 때 다시 로드됩니다.
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from embedding.embedder import (build_vector_db, load_vector_db, update_vector_db, search_by_vectors,
+                                search_vector_within_radius, StreamingIndexWriter, METRIC_L2)
+from embedding.index_factory import load_index_params
+from embedding.snapshots import snapshot_directory
+
+SHARDS_DIR = "shards"
+SHARD_MANIFEST_FILE = "shards.json"
+DEFAULT_SHARD_FIELD = "file_name"
+
+# 샤드 검색 스레드 풀 (프로세스 전역에서 재사용)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def is_sharded_directory(persist_directory: str) -> bool:
+    """샤드 벡터 DB 디렉토리인지 확인"""
+    return os.path.exists(os.path.join(persist_directory, SHARD_MANIFEST_FILE))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 1),
+                                           thread_name_prefix="shard-search")
+        return _executor
+
+
+def shard_name_for(value: Any) -> str:
+    """메타데이터 값으로 샤드 하위 디렉토리 이름 생성 (읽을 수 있는 접두어 + 짧은 해시)"""
+    text = str(value)
+    prefix = re.sub(r'[^0-9A-Za-z가-힣_.-]', '_', text)[:48] or "shard"
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=4).hexdigest()
+    return f"{prefix}-{digest}"
+
+
+def _read_manifest(persist_directory: str) -> Dict[str, Any]:
+    with open(os.path.join(persist_directory, SHARD_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(persist_directory: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(persist_directory, SHARD_MANIFEST_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def group_chunks_by_shard(chunks: List[Dict[str, Any]], shard_field: str = DEFAULT_SHARD_FIELD) -> Dict[str, Dict]:
+    """
+    청크를 샤드 기준 필드 값으로 묶기
+
+    Args:
+        chunks: 임베딩된 청크 리스트
+        shard_field: 샤드를 나눌 메타데이터 필드
+
+    Returns:
+        {샤드 이름: {'value': 필드 값, 'chunks': 청크 목록}}
+    """
+    groups: Dict[str, Dict] = OrderedDict()
+    for chunk in chunks:
+        value = chunk.get('metadata', {}).get(shard_field)
+        name = shard_name_for(value)
+        groups.setdefault(name, {'value': value, 'chunks': []})['chunks'].append(chunk)
+    return groups
+
+
+def _shard_directory(persist_directory: str, name: str) -> str:
+    return os.path.join(persist_directory, SHARDS_DIR, name)
+
+
+def _sharded_metric(persist_directory: str, names: List[str]) -> str:
+    """모든 샤드의 거리 기준이 같은지 확인하고 반환"""
+    metrics = {load_index_params(snapshot_directory(_shard_directory(persist_directory, name))).get('metric', METRIC_L2)
+               for name in names}
+    if len(metrics) > 1:
+        raise ValueError(f"샤드마다 거리 기준이 다릅니다: {sorted(metrics)}")
+    return metrics.pop() if metrics else METRIC_L2
+
+
+def build_sharded_vector_db(chunks: List[Dict[str, Any]], persist_directory: str,
+                            shard_field: str = DEFAULT_SHARD_FIELD,
+                            index_config: Optional[Dict[str, Any]] = None) -> Dict:
+    """
+    청크를 샤드 기준 필드로 나누어 샤드별 벡터 DB 구축
+
+    Args:
+        chunks: 임베딩된 청크 리스트
+        persist_directory: 샤드 벡터 DB 저장 경로
+        shard_field: 샤드를 나눌 메타데이터 필드 (예: file_name, project)
+        index_config: 샤드 인덱스 설정
+
+    Returns:
+        샤드 벡터 DB 정보 사전
+    """
+    if not chunks:
+        raise ValueError("임베딩된 청크가 제공되지 않았습니다.")
+
+    manifest = {'shard_field': shard_field, 'index_config': index_config or {}, 'shards': {}}
+    for name, group in group_chunks_by_shard(chunks, shard_field).items():
+        build_vector_db(group['chunks'], _shard_directory(persist_directory, name), index_config)
+        manifest['shards'][name] = {'value': group['value']}
+    _write_manifest(persist_directory, manifest)
+    print(f"샤드 벡터 DB 구축 완료: 샤드 {len(manifest['shards'])}개")
+    return load_sharded_vector_db(persist_directory)
+
+
+def update_sharded_vector_db(chunks: List[Dict[str, Any]], persist_directory: str,
+                             shard_field: str = DEFAULT_SHARD_FIELD,
+                             index_config: Optional[Dict[str, Any]] = None) -> Dict:
+    """
+    청크가 속한 샤드만 갱신 (없는 샤드는 새로 구축)
+
+    Args:
+        chunks: 임베딩된 청크 리스트
+        persist_directory: 샤드 벡터 DB 저장 경로
+        shard_field: 새로 만들 때 사용할 샤드 기준 필드 (기존 DB는 저장된 값 사용)
+        index_config: 새 샤드 인덱스 설정 (None이면 구축 때 저장된 설정 사용)
+
+    Returns:
+        샤드 벡터 DB 정보 사전
+    """
+    if is_sharded_directory(persist_directory):
+        manifest = _read_manifest(persist_directory)
+    else:
+        manifest = {'shard_field': shard_field, 'index_config': index_config or {}, 'shards': {}}
+    # 새 샤드도 기존 샤드와 같은 거리 기준/인덱스 유형으로 구축
+    if index_config is None:
+        index_config = manifest.get('index_config') or None
+
+    for name, group in group_chunks_by_shard(chunks, manifest['shard_field']).items():
+        update_vector_db(group['chunks'], _shard_directory(persist_directory, name), index_config)
+        manifest['shards'][name] = {'value': group['value']}
+    _write_manifest(persist_directory, manifest)
+    return load_sharded_vector_db(persist_directory)
+
+
+class ShardedStreamingIndexWriter:
+    """청크 배치를 샤드별 StreamingIndexWriter로 나누어 반영하고, 끝나면 샤드 목록 갱신"""
+
+    def __init__(self, persist_directory: str, index_config: Optional[Dict[str, Any]] = None):
+        """
+        작성기 생성
+
+        Args:
+            persist_directory: 샤드 벡터 DB 저장 경로
+            index_config: 새 샤드 인덱스 설정 (None이면 구축 때 저장된 설정 사용)
+        """
+        self.persist_directory = persist_directory
+        self.manifest = _read_manifest(persist_directory)
+        self.index_config = index_config if index_config is not None else (self.manifest.get('index_config') or None)
+        self._writers: Dict[str, StreamingIndexWriter] = OrderedDict()
+
+    def add(self, chunks: List[Dict[str, Any]]) -> int:
+        """임베딩된 청크 배치를 샤드별로 추가하고 새로 추가된 청크 수 반환"""
+        added = 0
+        for name, group in group_chunks_by_shard(chunks, self.manifest['shard_field']).items():
+            if name not in self._writers:
+                self._writers[name] = StreamingIndexWriter(_shard_directory(self.persist_directory, name),
+                                                           self.index_config)
+                self.manifest['shards'][name] = {'value': group['value']}
+            added += self._writers[name].add(group['chunks'])
+        return added
+
+    def finish(self) -> Dict[str, int]:
+        """샤드별 정리 후 샤드 목록 저장 (결과 형식은 StreamingIndexWriter.finish 참고)"""
+        totals = {'added': 0, 'removed': 0, 'unchanged': 0}
+        for writer in self._writers.values():
+            for key, value in writer.finish().items():
+                totals[key] += value
+        _write_manifest(self.persist_directory, self.manifest)
+        return totals
+
+
+def load_sharded_vector_db(persist_directory: str, mmap: bool = False, lazy: bool = False) -> Dict:
+    """
+    샤드 벡터 DB 로드
+
+    Args:
+        persist_directory: 샤드 벡터 DB 저장 경로
+        mmap: 샤드를 메모리 맵(읽기 전용)으로 로드할지 여부
+        lazy: True이면 샤드를 검색에 필요할 때 로드
+
+    Returns:
+        샤드 벡터 DB 정보 사전
+    """
+    if not is_sharded_directory(persist_directory):
+        raise FileNotFoundError(f"샤드 벡터 DB를 찾을 수 없습니다: {persist_directory}")
+
+    manifest = _read_manifest(persist_directory)
+    names = list(manifest['shards'])
+    sharded_db = {
+        'sharded': True,
+        'persist_directory': persist_directory,
+        'shard_field': manifest['shard_field'],
+        'shard_values': {name: info.get('value') for name, info in manifest['shards'].items()},
+        'shards': OrderedDict((name, None) for name in names),
+        'index_params': {'metric': _sharded_metric(persist_directory, names)},
+        'mmap': mmap,
+        'lock': threading.Lock(),
+    }
+    if not lazy:
+        for name in names:
+            load_shard(sharded_db, name)
+    return sharded_db
+
+
+def load_shard(sharded_db: Dict, name: str) -> Dict:
+    """
+    샤드 하나를 로드 (이미 로드되어 있으면 그대로 반환)
+
+    Args:
+        sharded_db: 샤드 벡터 DB 정보 사전
+        name: 샤드 이름
+
+    Returns:
+        샤드의 벡터 DB 정보 사전
+    """
+    if name not in sharded_db['shards']:
+        raise KeyError(f"존재하지 않는 샤드입니다: {name}")
+    with sharded_db['lock']:
+        if sharded_db['shards'][name] is None:
+            sharded_db['shards'][name] = load_vector_db(
+                _shard_directory(sharded_db['persist_directory'], name), mmap=sharded_db['mmap'])
+        return sharded_db['shards'][name]
+
+
+def unload_shard(sharded_db: Dict, name: str) -> bool:
+    """
+    샤드 하나를 메모리에서 내림 (다음 검색 때 다시 로드)
+
+    Args:
+        sharded_db: 샤드 벡터 DB 정보 사전
+        name: 샤드 이름
+
+    Returns:
+        언로드 여부 (로드되어 있지 않았으면 False)
+    """
+    with sharded_db['lock']:
+        vector_db = sharded_db['shards'].get(name)
+        if vector_db is None:
+            return False
+        sharded_db['shards'][name] = None
+
+    if vector_db.get('metadata_store') is not None:
+        vector_db['metadata_store'].close()
+    return True
+
+
+def loaded_shards(sharded_db: Dict) -> List[str]:
+    """현재 메모리에 로드된 샤드 이름 목록"""
+    return [name for name, vector_db in sharded_db['shards'].items() if vector_db is not None]
+
+
+def _target_shards(sharded_db: Dict, filters: Optional[Dict[str, Any]]) -> List[str]:
+    """필터에 샤드 기준 필드가 있으면 해당 값의 샤드만 검색 대상으로 선택"""
+    names = list(sharded_db['shards'])
+    shard_field = sharded_db['shard_field']
+    if not filters or shard_field not in filters:
+        return names
+
+    expected = filters[shard_field]
+    values = expected if isinstance(expected, (list, tuple, set, frozenset)) else [expected]
+    return [name for name in names if sharded_db['shard_values'].get(name) in values]
+
+
+def _fan_out(sharded_db: Dict, filters: Optional[Dict[str, Any]], search) -> List[tuple]:
+    """대상 샤드마다 search(샤드 DB)를 병렬 실행하고 (샤드 이름, 결과) 목록 반환"""
+    names = _target_shards(sharded_db, filters)
+    if not names:
+        return []
+
+    def run(name):
+        return name, search(load_shard(sharded_db, name))
+
+    if len(names) == 1:
+        return [run(names[0])]
+    return list(_get_executor().map(run, names))
+
+
+def _tag_shard(name: str, results: List[Dict]) -> List[Dict]:
+    for result in results:
+        result['shard'] = name
+    return results
+
+
+def search_shards(sharded_db: Dict, search: Callable[[Dict], List[List[Dict]]], top_k: int = 5,
+                  filters: Optional[Dict[str, Any]] = None) -> List[List[Dict]]:
+    """
+    샤드마다 search를 병렬 실행하고 쿼리별로 거리순 상위 top_k개를 힙 병합
+
+    Args:
+        sharded_db: 샤드 벡터 DB 정보 사전
+        search: 샤드 벡터 DB를 받아 쿼리별 거리순 결과 목록을 반환하는 함수
+        top_k: 쿼리별 반환할 결과 수
+        filters: 메타데이터 조건 (샤드 기준 필드가 있으면 해당 샤드만 검색)
+
+    Returns:
+        쿼리 순서대로의 청크 목록 (각 결과에 'shard' 포함)
+    """
+    shard_results = _fan_out(sharded_db, filters, search)
+    if not shard_results:
+        return []
+
+    merged = []
+    for row in range(len(shard_results[0][1])):
+        # 샤드별 결과는 이미 거리순이므로 힙 병합 후 앞에서부터 top_k개만 취함
+        streams = [_tag_shard(name, results[row]) for name, results in shard_results]
+        merged.append(list(itertools.islice(heapq.merge(*streams, key=lambda r: r['distance']), top_k)))
+    return merged
+
+
+def search_shards_by_rank(sharded_db: Dict, search: Callable[[Dict], List[List[Dict]]], top_k: int = 5,
+                          filters: Optional[Dict[str, Any]] = None) -> List[List[Dict]]:
+    """
+    샤드마다 search를 병렬 실행하고 쿼리별로 샤드 내 순위순으로 상위 top_k개를 합침
+
+    BM25 점수는 샤드마다 idf/평균 길이가 달라 샤드 간에 비교할 수 없으므로, 각 샤드의 1위들, 2위들 순으로
+    합칩니다 (샤드별 순위의 순위 역수 합(RRF)과 같은 순서). 같은 순위 안에서는 샤드 목록 순서를 따릅니다.
+
+    Args:
+        sharded_db: 샤드 벡터 DB 정보 사전
+        search: 샤드 벡터 DB를 받아 쿼리별 순위순 결과 목록을 반환하는 함수
+        top_k: 쿼리별 반환할 결과 수
+        filters: 메타데이터 조건 (샤드 기준 필드가 있으면 해당 샤드만 검색)
+
+    Returns:
+        쿼리 순서대로의 청크 목록 (각 결과에 'shard' 포함, 점수는 샤드 내 점수 그대로)
+    """
+    shard_results = _fan_out(sharded_db, filters, search)
+    if not shard_results:
+        return []
+
+    merged = []
+    for row in range(len(shard_results[0][1])):
+        streams = [_tag_shard(name, results[row]) for name, results in shard_results]
+        same_ranks = itertools.zip_longest(*streams)
+        merged.append(list(itertools.islice(
+            (result for results in same_ranks for result in results if result is not None), top_k
+        )))
+    return merged
+
+
+def search_shards_by_vectors(sharded_db: Dict, query_embeddings: np.ndarray, top_k: int = 5,
+                             min_similarity: Optional[float] = None,
+                             filters: Optional[Dict[str, Any]] = None) -> List[List[Dict]]:
+    """
+    모든 샤드를 쿼리 벡터로 병렬 검색
+
+    Args:
+        sharded_db: 샤드 벡터 DB 정보 사전
+        query_embeddings: (쿼리 수, 차원) 쿼리 벡터 행렬
+        top_k: 쿼리별 반환할 결과 수
+        min_similarity: 코사인 유사도 하한
+        filters: 메타데이터 조건 (샤드 기준 필드가 있으면 해당 샤드만 검색)
+
+    Returns:
+        쿼리 순서대로의 유사 청크 목록 (각 결과에 'shard' 포함)
+    """
+    found = search_shards(
+        sharded_db,
+        lambda vector_db: search_by_vectors(vector_db, query_embeddings, top_k=top_k,
+                                            min_similarity=min_similarity, filters=filters),
+        top_k=top_k, filters=filters
+    )
+    return found or [[] for _ in range(len(query_embeddings))]
+
+
+def search_shards_within_radius(sharded_db: Dict, query_embedding: np.ndarray, min_similarity: float,
+                                max_results: Optional[int] = None,
+                                filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    """
+    모든 샤드에서 코사인 유사도가 임계값 이상인 청크를 병렬 검색하여 병합
+
+    Args:
+        sharded_db: 샤드 벡터 DB 정보 사전
+        query_embedding: 쿼리 벡터
+        min_similarity: 코사인 유사도 하한
+        max_results: 반환할 최대 결과 수 (None이면 제한 없음)
+        filters: 메타데이터 조건
+
+    Returns:
+        유사도 내림차순 청크 목록 (각 결과에 'shard' 포함)
+    """
+    shard_results = _fan_out(
+        sharded_db, filters,
+        lambda vector_db: search_vector_within_radius(vector_db, query_embedding, min_similarity,
+                                                      max_results=max_results, filters=filters)
+    )
+    merged = heapq.merge(*[_tag_shard(name, results) for name, results in shard_results],
+                         key=lambda r: r['distance'])
+    return list(merged if max_results is None else itertools.islice(merged, max_results))
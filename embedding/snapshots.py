@@ -0,0 +1,347 @@
+"""
+스냅샷 버전 모듈: 벡터 DB 스냅샷을 버전별 디렉토리에 쓰고 CURRENT 포인터를 원자적으로 교체
+
+저장 형식 (벡터 DB 저장 경로 아래)
+- versions/v000001/, versions/v000002/, ...: 스냅샷 파일 전체 (faiss_index.bin, metadata.sqlite 등)
+- CURRENT: 현재 버전 이름 (임시 파일에 쓰고 fsync 후 os.replace로 교체)
+- pins/<버전>.<pid>.<토큰>: 요청 처리 중인 리더가 고정한 버전 (정리 대상에서 제외)
+- delta.log: 현재 버전 이후의 변경 사항 (버전 디렉토리 밖에서 유지)
+
+새 스냅샷은 새 디렉토리에 모두 쓰고 fsync한 뒤에 CURRENT를 바꾸므로, 다른 세션이 로드 중이어도
+인덱스와 메타데이터가 서로 다른 시점의 파일로 섞이지 않습니다. 이전 버전은 롤백용으로 N개 보관합니다.
+CURRENT가 없는 이전 형식 디렉토리는 저장 경로 자체를 스냅샷 디렉토리로 사용합니다.
+
+쓰기는 벡터 DB당 한 프로세스에서만 수행한다고 가정합니다.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+PINS_DIR = "pins"
+
+# 현재 버전을 포함해 보관할 버전 수
+DEFAULT_KEEP_VERSIONS = 3
+
+# 핫 리로드 시 CURRENT 포인터 확인 간격 (초)
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+
+def _version_number(version: str) -> int:
+    return int(version[1:])
+
+
+def _fsync_path(path: str) -> None:
+    """파일 또는 디렉토리 내용을 디스크에 반영"""
+    flags = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) if os.path.isdir(path) else os.O_RDONLY
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        # 디렉토리 fsync를 지원하지 않는 플랫폼(Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def current_version(persist_directory: str) -> Optional[str]:
+    """CURRENT 포인터가 가리키는 버전 이름 (버전 관리 전 형식이면 None)"""
+    try:
+        with open(os.path.join(persist_directory, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_directory(persist_directory: str, version: str) -> str:
+    """버전 이름의 스냅샷 디렉토리 경로"""
+    return os.path.join(persist_directory, VERSIONS_DIR, version)
+
+
+def snapshot_directory(persist_directory: str, version: Optional[str] = None) -> str:
+    """
+    읽을 스냅샷 디렉토리 경로
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        version: 버전 이름 (None이면 현재 버전)
+
+    Returns:
+        버전 디렉토리 (버전 관리 전 형식이면 저장 경로 자체)
+    """
+    version = version or current_version(persist_directory)
+    return version_directory(persist_directory, version) if version else persist_directory
+
+
+def list_versions(persist_directory: str) -> List[str]:
+    """보관 중인 버전 이름 목록 (오래된 순)"""
+    versions_path = os.path.join(persist_directory, VERSIONS_DIR)
+    if not os.path.isdir(versions_path):
+        return []
+    names = [name for name in os.listdir(versions_path) if name.startswith('v') and name[1:].isdigit()]
+    return sorted(names, key=_version_number)
+
+
+def begin_snapshot(persist_directory: str) -> Tuple[str, str]:
+    """
+    새 버전 디렉토리 생성 (CURRENT를 바꾸기 전까지 리더에게 보이지 않음)
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+
+    Returns:
+        (버전 이름, 버전 디렉토리 경로)
+    """
+    versions = list_versions(persist_directory)
+    version = f"v{(_version_number(versions[-1]) + 1 if versions else 1):06d}"
+    path = version_directory(persist_directory, version)
+    os.makedirs(path)
+    return version, path
+
+
+def publish_snapshot(persist_directory: str, version: str, keep: int = DEFAULT_KEEP_VERSIONS) -> None:
+    """
+    버전 디렉토리의 파일을 fsync한 뒤 CURRENT 포인터를 교체하고 오래된 버전 정리
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        version: 공개할 버전 이름
+        keep: 현재 버전을 포함해 보관할 버전 수
+    """
+    path = version_directory(persist_directory, version)
+    for name in os.listdir(path):
+        _fsync_path(os.path.join(path, name))
+    _fsync_path(path)
+    _fsync_path(os.path.join(persist_directory, VERSIONS_DIR))
+
+    set_current_version(persist_directory, version)
+    prune_versions(persist_directory, keep)
+
+
+def set_current_version(persist_directory: str, version: str) -> None:
+    """
+    CURRENT 포인터를 원자적으로 교체 (롤백에도 사용)
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        version: 가리킬 버전 이름
+    """
+    if not os.path.isdir(version_directory(persist_directory, version)):
+        raise FileNotFoundError(f"스냅샷 버전을 찾을 수 없습니다: {version}")
+
+    pointer_path = os.path.join(persist_directory, CURRENT_FILE)
+    with open(pointer_path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_path + ".tmp", pointer_path)
+    _fsync_path(persist_directory)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def pinned_versions(persist_directory: str) -> set:
+    """살아 있는 프로세스가 고정한 버전 집합 (종료된 프로세스의 고정 파일은 삭제)"""
+    pins_path = os.path.join(persist_directory, PINS_DIR)
+    if not os.path.isdir(pins_path):
+        return set()
+
+    pinned = set()
+    for name in os.listdir(pins_path):
+        parts = name.split('.')
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        if _pid_alive(int(parts[1])):
+            pinned.add(parts[0])
+        else:
+            try:
+                os.remove(os.path.join(pins_path, name))
+            except FileNotFoundError:
+                pass
+    return pinned
+
+
+def prune_versions(persist_directory: str, keep: int = DEFAULT_KEEP_VERSIONS) -> List[str]:
+    """
+    현재 버전보다 오래된 버전 중 최근 keep - 1개와 고정된 버전을 제외하고 삭제
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        keep: 현재 버전을 포함해 보관할 버전 수
+
+    Returns:
+        삭제한 버전 이름 목록
+    """
+    current = current_version(persist_directory)
+    if current is None:
+        return []
+
+    older = [version for version in list_versions(persist_directory)
+             if _version_number(version) < _version_number(current)]
+    candidates = older[:max(0, len(older) - max(keep - 1, 0))]
+    pinned = pinned_versions(persist_directory)
+
+    removed = []
+    for version in candidates:
+        if version in pinned:
+            continue
+        shutil.rmtree(version_directory(persist_directory, version), ignore_errors=True)
+        removed.append(version)
+    return removed
+
+
+@contextmanager
+def pin_version(persist_directory: str, version: Optional[str] = None) -> Iterator[Optional[str]]:
+    """
+    요청을 처리하는 동안 버전이 정리되지 않도록 고정
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        version: 고정할 버전 (None이면 현재 버전)
+
+    Yields:
+        고정한 버전 이름 (버전 관리 전 형식이면 None)
+    """
+    version = version or current_version(persist_directory)
+    if version is None:
+        yield None
+        return
+
+    pins_path = os.path.join(persist_directory, PINS_DIR)
+    os.makedirs(pins_path, exist_ok=True)
+    pin_path = os.path.join(pins_path, f"{version}.{os.getpid()}.{uuid.uuid4().hex[:8]}")
+    open(pin_path, 'w').close()
+    try:
+        yield version
+    finally:
+        try:
+            os.remove(pin_path)
+        except FileNotFoundError:
+            pass
+
+
+class VectorDBHandle:
+    """
+    장시간 실행되는 프로세스용 벡터 DB 핸들 - 새 버전이 공개되면 백그라운드 없이 다음 조회 때 다시 로드
+
+    다시 로드하는 동안에도 다른 스레드는 이전 벡터 DB로 계속 검색합니다.
+    """
+
+    def __init__(self, persist_directory: str, mmap: bool = False,
+                 check_interval: float = DEFAULT_RELOAD_INTERVAL):
+        """
+        핸들 생성 (첫 get 호출 때 로드)
+
+        Args:
+            persist_directory: 벡터 DB 저장 경로
+            mmap: 메모리 맵 지연 로드 사용 여부
+            check_interval: 새 버전 확인 간격 (초)
+        """
+        self.persist_directory = persist_directory
+        self.mmap = mmap
+        self.check_interval = check_interval
+        self.reloads = 0
+
+        self._vector_db: Optional[Dict] = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+
+    def _current_signature(self) -> Tuple:
+        """버전 포인터, 델타 로그 크기, 샤드 목록 파일 수정 시각"""
+        from embedding.delta_log import DeltaLog
+        from embedding.sharded_db import SHARD_MANIFEST_FILE
+
+        manifest_path = os.path.join(self.persist_directory, SHARD_MANIFEST_FILE)
+        manifest_mtime = os.stat(manifest_path).st_mtime_ns if os.path.exists(manifest_path) else None
+        return (current_version(self.persist_directory), DeltaLog(self.persist_directory).size_bytes,
+                manifest_mtime)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        새 버전이 있으면 다시 로드
+
+        Args:
+            force: True이면 확인 간격과 관계없이 즉시 확인
+
+        Returns:
+            다시 로드했는지 여부
+        """
+        now = time.monotonic()
+        if not force and self._vector_db is not None and now - self._checked_at < self.check_interval:
+            return False
+
+        # 다른 스레드가 이미 로드 중이면 기다리지 않고 이전 벡터 DB 사용
+        if not self._reload_lock.acquire(blocking=self._vector_db is None):
+            return False
+        try:
+            self._checked_at = now
+            signature = self._current_signature()
+            if self._vector_db is not None and signature == self._signature:
+                return False
+
+            from embedding.embedder import load_vector_db
+            vector_db = load_vector_db(self.persist_directory, mmap=self.mmap)
+            if self._vector_db is not None:
+                self.reloads += 1
+                print(f"벡터 DB 새 버전 로드: {vector_db.get('version') or '이전 형식'}")
+            self._vector_db, self._signature = vector_db, signature
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def get(self) -> Dict:
+        """현재 벡터 DB 반환 (확인 간격이 지났으면 새 버전 확인)"""
+        self.refresh()
+        return self._vector_db
+
+    @contextmanager
+    def pinned(self) -> Iterator[Dict]:
+        """
+        요청 처리 동안 같은 버전의 벡터 DB를 사용하도록 고정
+
+        Yields:
+            벡터 DB 정보 사전
+        """
+        vector_db = self.get()
+        with pin_version(self.persist_directory, vector_db.get('version')):
+            yield vector_db
+
+
+_handles: Dict[Tuple[str, bool], VectorDBHandle] = {}
+_handles_lock = threading.Lock()
+
+
+def get_vector_db_handle(persist_directory: str, mmap: bool = False) -> VectorDBHandle:
+    """
+    프로세스 전역 벡터 DB 핸들 반환 (같은 경로는 같은 핸들 공유)
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로
+        mmap: 메모리 맵 지연 로드 사용 여부
+
+    Returns:
+        VectorDBHandle
+    """
+    key = (os.path.abspath(persist_directory), mmap)
+    with _handles_lock:
+        if key not in _handles:
+            _handles[key] = VectorDBHandle(persist_directory, mmap=mmap)
+        return _handles[key]
@@ -2,11 +2,13 @@
 RAG 엔진 모듈: 벡터 DB에서 관련 정보를 검색하고 테스트케이스 생성
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional, Union
 import numpy as np
 import re
 
-from embedding.embedder import search_similar
+from embedding.embedder import (search_similar, search_similar_batch, vector_db_metric, diversify_results, Embedder,
+                                DEFAULT_MODEL_NAME, METRIC_COSINE, SEARCH_MODE_VECTOR, SEARCH_MODE_LEXICAL)
+from embedding.mmr import MMR_CANDIDATE_FACTOR
 
 # QA 관점 테스트케이스 변환 규칙
 TC_TRANSFORMATION_RULES = {
@@ -560,30 +562,70 @@ def generate_multiple_testcases_from_sentence(sentence: str, context: str) -> Li
 class RAGEngine:
     """RAG 기반 테스트케이스 생성 엔진"""
     
-    def __init__(self, vector_db):
+    def __init__(self, vector_db, model_name: str = DEFAULT_MODEL_NAME):
         """
         RAG 엔진 초기화
         
         Args:
             vector_db: FAISS 벡터 DB 정보
+            model_name: 쿼리 임베딩에 사용할 모델명
         """
         self.vector_db = vector_db
+        self.model_name = model_name
+        # 전역 모델 레지스트리에서 모델을 미리 확보 (검색 시 재사용)
+        self.embedder = Embedder(model_name)
     
-    def retrieve_relevant_chunks(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def retrieve_relevant_chunks(self, query: Union[str, List[str]], n_results: int = 5,
+                                 min_similarity: Optional[float] = None,
+                                 filters: Optional[Dict[str, Any]] = None,
+                                 mode: str = SEARCH_MODE_VECTOR) -> List[Dict[str, Any]]:
         """
         쿼리와 관련된 청크를 검색
         
         Args:
-            query: 검색 쿼리
-            n_results: 반환할 결과 수
+            query: 검색 쿼리 또는 쿼리 목록 (목록이면 일괄 검색 후 중복 청크 제거)
+            n_results: 쿼리별 반환할 결과 수 (상한)
+            min_similarity: 코사인 유사도 하한 (코사인 인덱스 전용)
+            filters: 메타데이터 조건 (예: {'file_name': '기획서.docx'})
+            mode: 검색 방식 ('vector', 'lexical', 'fused')
             
         Returns:
             관련 청크 목록
         """
-        # FAISS로 유사 검색 수행
-        results = search_similar(self.vector_db, query, top_k=n_results)
+        if not isinstance(query, str):
+            results = self.retrieve_relevant_chunks_batch(query, n_results=n_results, deduplicate=True,
+                                                          min_similarity=min_similarity, filters=filters,
+                                                          mode=mode)
+            return [chunk for query_results in results for chunk in query_results]
+        
+        # FAISS/BM25로 유사 검색 수행
+        results = search_similar(self.vector_db, query, top_k=n_results, model_name=self.model_name,
+                                 min_similarity=min_similarity, filters=filters, mode=mode)
         return results
     
+    def retrieve_relevant_chunks_batch(self, queries: List[str], n_results: int = 5,
+                                       deduplicate: bool = False,
+                                       min_similarity: Optional[float] = None,
+                                       filters: Optional[Dict[str, Any]] = None,
+                                       mode: str = SEARCH_MODE_VECTOR) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리의 관련 청크를 한 번의 인코딩/검색으로 조회
+        
+        Args:
+            queries: 검색 쿼리 목록
+            n_results: 쿼리별 반환할 결과 수 (상한)
+            deduplicate: 쿼리 간 중복 청크 제거 여부
+            min_similarity: 코사인 유사도 하한 (코사인 인덱스 전용)
+            filters: 메타데이터 조건 (예: {'file_name': '기획서.docx'})
+            mode: 검색 방식 ('vector', 'lexical', 'fused')
+            
+        Returns:
+            쿼리별 관련 청크 목록
+        """
+        return search_similar_batch(self.vector_db, queries, top_k=n_results, model_name=self.model_name,
+                                    deduplicate=deduplicate, min_similarity=min_similarity, filters=filters,
+                                    mode=mode)
+    
     def generate_testcase(self, query: str, context: str) -> Dict[str, str]:
         """
         컨텍스트를 기반으로 테스트케이스 생성
@@ -614,38 +656,139 @@ class RAGEngine:
         
         return testcase
 
-def process_rag(vector_db, user_query: str, n_results: int = 5) -> List[Dict[str, str]]:
+def _unique_chunks(chunk_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """쿼리별 청크 목록을 이어 붙이면서 같은 청크는 처음 것만 남김"""
+    seen = set()
+    chunks = []
+    for chunk_list in chunk_lists:
+        for chunk in chunk_list:
+            if chunk['vector_id'] not in seen:
+                seen.add(chunk['vector_id'])
+                chunks.append(chunk)
+    return chunks
+
+def _usable_sentences(context: str) -> List[str]:
+    """컨텍스트에서 테스트케이스 생성 대상 문장만 추출"""
+    return [sentence for sentence in split_into_sentences(context) if not should_skip_sentence(sentence)]
+
+def _duplicate_counts(sentences: List[str], sentence_counts: Dict[str, int]) -> tuple:
+    """같은 문장이 반복 처리된 횟수와 그로 인해 중복 생성된 테스트케이스 수"""
+    seen = set()
+    duplicate_sentences = duplicate_testcases = 0
+    for sentence in sentences:
+        if sentence in seen:
+            duplicate_sentences += 1
+            duplicate_testcases += sentence_counts[sentence]
+        seen.add(sentence)
+    return duplicate_sentences, duplicate_testcases
+
+def process_rag(vector_db, user_query: Union[str, List[str]], n_results: int = 5,
+                model_name: str = DEFAULT_MODEL_NAME, min_similarity: Optional[float] = None,
+                filters: Optional[Dict[str, Any]] = None,
+                search_mode: str = SEARCH_MODE_VECTOR, diversity: float = 0.0,
+                return_report: bool = False):
     """
     RAG 프로세스 실행 함수
     
+    코사인 인덱스에서 min_similarity를 지정하면 유사도가 임계값 이상인 청크만 최대 n_results개
+    사용하므로, 범위가 좁은 쿼리일수록 이후 문장 처리량이 줄어듭니다.
+    diversity를 지정하면 후보를 MMR로 재정렬해 오버랩 청크가 같은 문장을 반복 제공하지 않도록 하고,
+    return_report=True이면 관련도순 상위 n_results개를 그대로 썼을 때와 비교해 줄어든 중복 문장/테스트케이스
+    수를 보고합니다 (MMR 선택에 없던 문장의 테스트케이스 수는 생성하지 않고 문장당 평균으로 추정).
+    
     Args:
         vector_db: FAISS 벡터 DB 정보
-        user_query: 사용자 쿼리
-        n_results: 검색 결과 수
+        user_query: 사용자 쿼리 또는 쿼리 목록 (목록이면 일괄 검색)
+        n_results: 검색 결과 수 (상한)
+        model_name: 쿼리 임베딩에 사용할 모델명
+        min_similarity: 코사인 유사도 하한 (L2 인덱스에서는 무시)
+        filters: 검색 대상을 제한할 메타데이터 조건 (예: {'file_name': '기획서.docx'})
+        search_mode: 검색 방식 - 'vector'(임베딩), 'lexical'(BM25 키워드), 'fused'(두 순위 융합)
+        diversity: MMR 다양성 가중치 (0이면 관련도순 그대로)
+        return_report: True이면 (테스트케이스 목록, MMR 절감 보고) 반환
         
     Returns:
-        생성된 테스트케이스 목록
+        생성된 테스트케이스 목록 (return_report=True이면 보고 사전과 함께 반환)
     """
-    rag_engine = RAGEngine(vector_db)
+    rag_engine = RAGEngine(vector_db, model_name=model_name)
+    
+    if search_mode == SEARCH_MODE_LEXICAL:
+        # 키워드 검색은 유사도 점수가 없으므로 임계값 미적용
+        min_similarity = None
+    elif min_similarity is not None and vector_db_metric(vector_db) != METRIC_COSINE:
+        print("L2 인덱스는 유사도 임계값을 지원하지 않아 상위 결과를 그대로 사용합니다.")
+        min_similarity = None
     
     # 관련 청크 검색
-    relevant_chunks = rag_engine.retrieve_relevant_chunks(user_query, n_results=n_results)
+    baseline_chunks = None
+    if diversity > 0:
+        # 후보를 한 번에 넉넉히 가져와 관련도순 상위(비교 기준)와 MMR 선택을 모두 구함
+        queries = [user_query] if isinstance(user_query, str) else list(user_query)
+        candidate_lists = rag_engine.retrieve_relevant_chunks_batch(
+            queries, n_results=n_results * MMR_CANDIDATE_FACTOR, min_similarity=min_similarity,
+            filters=filters, mode=search_mode)
+        if return_report:
+            baseline_chunks = _unique_chunks([candidates[:n_results] for candidates in candidate_lists])
+        # 쿼리 벡터는 검색 때 쿼리 캐시에 저장되었으므로 다시 인코딩하지 않음
+        query_embeddings = (rag_engine.embedder.embed_queries(queries)
+                            if search_mode != SEARCH_MODE_LEXICAL else [None] * len(queries))
+        relevant_chunks = _unique_chunks([
+            diversify_results(vector_db, candidates, n_results, diversity, model_name, query_embedding)
+            for candidates, query_embedding in zip(candidate_lists, query_embeddings)
+        ])
+    else:
+        relevant_chunks = rag_engine.retrieve_relevant_chunks(user_query, n_results=n_results,
+                                                              min_similarity=min_similarity, filters=filters,
+                                                              mode=search_mode)
+    if min_similarity is not None:
+        print(f"유사도 {min_similarity:.2f} 이상 청크: {len(relevant_chunks)}개 사용")
     
     # 컨텍스트 통합
     context = "\n\n".join([chunk['text'] for chunk in relevant_chunks])
     
     # 문장 분리 및 테스트케이스 생성
     testcases = []
-    sentences = split_into_sentences(context)
+    sentences = _usable_sentences(context)
+    sentence_counts = {}
     
     for sentence in sentences:
-        if should_skip_sentence(sentence):
-            continue
-        
         # 문장별 테스트케이스 생성
         sentence_testcases = generate_multiple_testcases_from_sentence(sentence, context)
+        sentence_counts[sentence] = len(sentence_testcases)
         testcases.extend(sentence_testcases)
     
+    report = None
+    if baseline_chunks is not None:
+        # MMR 없이 관련도순 상위 청크를 썼다면 처리했을 문장/테스트케이스 수
+        # (처리한 문장은 실제 생성 수를, 처리하지 않은 문장은 문장당 평균 생성 수를 사용)
+        baseline_context = "\n\n".join([chunk['text'] for chunk in baseline_chunks])
+        baseline_sentences = _usable_sentences(baseline_context)
+        average_count = len(testcases) / len(sentence_counts) if sentence_counts else 0.0
+        baseline_counts = {sentence: sentence_counts.get(sentence, average_count) for sentence in baseline_sentences}
+        baseline_testcases = round(sum(baseline_counts[sentence] for sentence in baseline_sentences))
+        
+        selected_ids = {chunk['vector_id'] for chunk in relevant_chunks}
+        duplicates_before = _duplicate_counts(baseline_sentences, baseline_counts)
+        duplicates_after = _duplicate_counts(sentences, sentence_counts)
+        report = {
+            'chunks_before': len(baseline_chunks),
+            'chunks_after': len(relevant_chunks),
+            'chunks_replaced': sum(1 for chunk in baseline_chunks if chunk['vector_id'] not in selected_ids),
+            'sentences_before': len(baseline_sentences),
+            'sentences_after': len(sentences),
+            'duplicate_sentences_before': duplicates_before[0],
+            'duplicate_sentences_after': duplicates_after[0],
+            'sentences_saved': duplicates_before[0] - duplicates_after[0],
+            'testcases_before': baseline_testcases,
+            'testcases_after': len(testcases),
+            'duplicate_testcases_before': round(duplicates_before[1]),
+            'duplicate_testcases_after': duplicates_after[1],
+            'testcases_saved': round(duplicates_before[1]) - duplicates_after[1],
+            'estimated_sentences': sum(1 for sentence in baseline_counts if sentence not in sentence_counts),
+        }
+        print(f"MMR 재정렬: 청크 {report['chunks_replaced']}개 교체, 중복 문장 {report['sentences_saved']}개, "
+              f"중복 테스트케이스 {report['testcases_saved']}개 절감")
+    
     # 결과가 없으면 기본 테스트케이스 추가
     if not testcases:
         # 기본 테스트케이스 목록 생성 - 스킬 시스템과 아이템 장착 관련 테스트케이스
@@ -693,15 +836,17 @@ def process_rag(vector_db, user_query: str, n_results: int = 5) -> List[Dict[str
         ]
         testcases.extend(default_testcases)
     
+    if return_report:
+        return testcases, report
     return testcases
 
-def generate_testcases(vector_db, document_chunks: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def generate_testcases(vector_db, document_chunks: List[Mapping[str, Any]]) -> List[Dict[str, str]]:
     """
     전체 문서를 기반으로 테스트케이스 생성
     
     Args:
         vector_db: FAISS 벡터 DB 정보
-        document_chunks: 문서 청크 목록
+        document_chunks: 문서 청크 목록 (청크 dict 또는 process_document_spans의 ChunkSpan)
         
     Returns:
         생성된 테스트케이스 목록
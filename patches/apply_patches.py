@@ -129,7 +129,6 @@ def apply_sentence_transformers_patch():
         # 먼저 sentence_transformers 패치를 적용
         import sys
         import types
-        import numpy as np
         
         # sentence_transformers 모듈이 있는지 확인
         if 'sentence_transformers' in sys.modules:
@@ -139,35 +138,22 @@ def apply_sentence_transformers_patch():
         sentence_transformers = types.ModuleType('sentence_transformers')
         sys.modules['sentence_transformers'] = sentence_transformers
         
-        # SentenceTransformer 클래스 정의 - 완전 오프라인 스텁
-        class SentenceTransformer:
+        # SentenceTransformer 클래스 정의 - 해시 n-gram 임베딩 기반 오프라인 구현
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        if project_root not in sys.path:
+            sys.path.append(project_root)
+        from embedding.hashing_embedder import HashingEmbedder
+
+        class SentenceTransformer(HashingEmbedder):
             def __init__(self, model_name_or_path=None, **kwargs):
+                super().__init__()
                 self.model_name = model_name_or_path
-                print(f"[오프라인 모드] SentenceTransformer 모델 '{model_name_or_path}' 로드 (스텁)")
-                
-            def encode(self, sentences, **kwargs):
-                print(f"[오프라인 모드] 텍스트 {len(sentences) if isinstance(sentences, list) else 1}개 인코딩")
-                # 간단한 임의 임베딩 벡터 반환 - 재현 가능한 결과를 위해 고정 시드 사용
-                np.random.seed(42)  # 일관된 결과를 위한 고정 시드
-                
-                # 입력 텍스트를 기반으로 한 간단한 해시 값을 시드로 사용하여 약간의 의미 유지
-                if isinstance(sentences, list):
-                    vectors = []
-                    for text in sentences:
-                        # 간단한 해시 기반 시드 (텍스트마다 다른 벡터 생성하지만 같은 텍스트는 같은 벡터)
-                        text_seed = sum(ord(c) for c in str(text)[:100]) % 10000
-                        np.random.seed(text_seed)
-                        vectors.append(np.random.rand(384).astype(np.float32))
-                    return np.array(vectors)
-                else:
-                    text_seed = sum(ord(c) for c in str(sentences)[:100]) % 10000
-                    np.random.seed(text_seed)
-                    return np.random.rand(384).astype(np.float32)
+                print(f"[오프라인 모드] SentenceTransformer 모델 '{model_name_or_path}' 로드 (해시 임베딩)")
         
         # 클래스 등록
         sentence_transformers.SentenceTransformer = SentenceTransformer
         
-        print("sentence_transformers 패치 적용 성공 (오프라인 스텁 구현)")
+        print("sentence_transformers 패치 적용 성공 (오프라인 해시 임베딩 구현)")
         return True
     except Exception as e:
         print(f"sentence_transformers 패치 오류: {e}")
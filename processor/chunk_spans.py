@@ -0,0 +1,169 @@
+"""
+청크 구간 모듈: 문서 텍스트를 한 번만 보관하고 청크는 시작/끝 오프셋과 페이지/단락 참조만 보유
+
+청크 텍스트는 chunk['text']로 접근할 때만 잘라서 만들며, ChunkSpan은 기존 청크 dict와 같은
+키('text', 'metadata')를 제공하므로 임베딩/RAG 엔진/검증 모듈에 그대로 전달할 수 있습니다.
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class DocumentText:
+    """
+    문서 텍스트 버퍼와 단락/블록(페이지) 위치 정보
+
+    텍스트는 블록을 줄 단위 단락으로 나누고 빈 단락을 뺀 뒤 '\\n'으로 이어 붙인 것으로,
+    iter_text_spans/split_text_spans의 오프셋 기준과 같습니다.
+    """
+
+    __slots__ = ('text', 'paragraph_offsets', 'paragraph_blocks', 'block_kind')
+
+    def __init__(self, blocks: Iterable[str], block_kind: str = "block"):
+        """
+        문서 텍스트 구성
+
+        Args:
+            blocks: 텍스트 블록 (PDF는 페이지, DOCX는 단락/표 셀)
+            block_kind: 블록 종류 ('page'이면 청크 메타데이터에 페이지 번호 기록)
+        """
+        parts, offsets, block_numbers = [], [], []
+        position = 0
+        for block_number, block in enumerate(blocks):
+            for para in block.split('\n'):
+                if not para.strip():
+                    continue
+                offsets.append(position)
+                block_numbers.append(block_number)
+                parts.append(para)
+                position += len(para) + 1
+        self.text = '\n'.join(parts)
+        self.paragraph_offsets = np.asarray(offsets, dtype=np.int64)
+        self.paragraph_blocks = np.asarray(block_numbers, dtype=np.int32)
+        self.block_kind = block_kind
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def paragraph_range(self, start: int, end: int) -> Tuple[int, int]:
+        """구간이 걸친 첫/마지막 단락 번호 (0부터)"""
+        first, last = np.searchsorted(self.paragraph_offsets, [start, max(start, end - 1)], side='right') - 1
+        return int(max(first, 0)), int(max(last, 0))
+
+    def reference_metadata(self, start: int, end: int) -> Dict[str, int]:
+        """
+        구간의 단락/페이지 참조
+
+        Returns:
+            paragraph_start/paragraph_end (0부터, 끝 포함), 페이지 블록이면 page_start/page_end (1부터)
+        """
+        if not len(self.paragraph_offsets):
+            return {}
+        first, last = self.paragraph_range(start, end)
+        references = {'paragraph_start': first, 'paragraph_end': last}
+        if self.block_kind == "page":
+            references['page_start'] = int(self.paragraph_blocks[first]) + 1
+            references['page_end'] = int(self.paragraph_blocks[last]) + 1
+        return references
+
+
+class ChunkSpan(MutableMapping):
+    """
+    문서 텍스트 버퍼의 한 구간으로 표현한 청크 (청크 dict와 같은 방식으로 사용)
+
+    'text'는 접근할 때마다 버퍼에서 잘라 반환하고, 그 밖의 키(임베딩 단계에서 붙는
+    'vector_id', 'embedding' 등)는 일반 dict처럼 저장합니다.
+    """
+
+    __slots__ = ('document', 'start', 'end', 'metadata', '_fields')
+
+    def __init__(self, document: DocumentText, start: int, end: int, metadata: Optional[Dict[str, Any]] = None):
+        self.document = document
+        self.start = start
+        self.end = end
+        self.metadata = metadata if metadata is not None else {}
+        self._fields: Optional[Dict[str, Any]] = None
+
+    @property
+    def text(self) -> str:
+        return self.document.text[self.start:self.end]
+
+    def __len__(self) -> int:
+        return 2 + (len(self._fields) if self._fields else 0)
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'text'
+        yield 'metadata'
+        if self._fields:
+            yield from self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'text':
+            return self.text
+        if key == 'metadata':
+            return self.metadata
+        if self._fields and key in self._fields:
+            return self._fields[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'text':
+            raise TypeError("ChunkSpan의 텍스트는 문서 버퍼 구간이므로 변경할 수 없습니다.")
+        if key == 'metadata':
+            self.metadata = value
+            return
+        if self._fields is None:
+            self._fields = {}
+        self._fields[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in ('text', 'metadata') or not self._fields or key not in self._fields:
+            raise KeyError(key)
+        del self._fields[key]
+
+    def __repr__(self) -> str:
+        return f"ChunkSpan({self.start}, {self.end}, metadata={self.metadata!r})"
+
+
+def build_chunk_spans(document: DocumentText, spans: Iterable[Tuple[int, int]], file_name: str,
+                      source: str) -> List[ChunkSpan]:
+    """
+    오프셋 구간 목록을 ChunkSpan 목록으로 변환 (메타데이터는 청크 dict와 같은 키 + 단락/페이지 참조)
+
+    Args:
+        document: 문서 텍스트
+        spans: (시작, 끝) 오프셋 목록
+        file_name: 메타데이터에 기록할 문서명
+        source: 원본 파일 경로
+
+    Returns:
+        청크 구간 목록
+    """
+    chunks = []
+    for chunk_id, (start, end) in enumerate(spans):
+        metadata = {'file_name': file_name, 'chunk_id': chunk_id, 'source': source}
+        metadata.update(document.reference_metadata(start, end))
+        chunks.append(ChunkSpan(document, start, end, metadata))
+    return chunks
+
+
+def chunks_document_text(chunks: Iterable[Any]) -> str:
+    """
+    청크 목록의 원본 텍스트 (같은 문서 버퍼를 공유하는 ChunkSpan이면 복사 없이 버퍼 반환)
+
+    Args:
+        chunks: ChunkSpan 또는 청크 dict 목록
+
+    Returns:
+        문서 텍스트
+    """
+    chunks = list(chunks)
+    documents = {id(getattr(chunk, 'document', None)) for chunk in chunks}
+    if chunks and len(documents) == 1 and getattr(chunks[0], 'document', None) is not None:
+        return chunks[0].document.text
+    return "\n".join(chunk['text'] for chunk in chunks)
@@ -3,11 +3,15 @@
 """
 
 import os
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 import docx
 import fitz  # PyMuPDF
 import re
 
+from processor.pdf_pages import iter_pages, DEFAULT_PAGES_PER_TASK, DEFAULT_TASK_TIMEOUT
+from processor.extraction_cache import DEFAULT_CACHE_DIR as DEFAULT_EXTRACTION_CACHE_DIR, file_digest, get_extraction_cache
+from processor.chunk_spans import ChunkSpan, DocumentText, build_chunk_spans
+
 # nltk 없이도 작동하는 간단한 문장 분리 함수
 def simple_sent_tokenize(text):
     """nltk 없이 기본적인 문장 분리를 수행합니다."""
@@ -35,12 +39,13 @@ except ImportError:
     sentence_tokenizer = simple_sent_tokenize
     print("NLTK 패키지가 없어 기본 문장 분리 기능을 사용합니다.")
 
-def extract_text(file_path: str) -> str:
+def extract_text(file_path: str, pdf_options: Optional[Dict[str, Any]] = None) -> str:
     """
     DOCX 또는 PDF 파일에서 텍스트를 추출
     
     Args:
         file_path: 처리할 파일 경로
+        pdf_options: PDF 병렬 추출 설정 (_extract_from_pdf의 workers, pages_per_task, timeout)
         
     Returns:
         추출된 전체 텍스트
@@ -50,66 +55,267 @@ def extract_text(file_path: str) -> str:
     if file_ext == '.docx':
         return _extract_from_docx(file_path)
     elif file_ext == '.pdf':
-        return _extract_from_pdf(file_path)
+        return _extract_from_pdf(file_path, **(pdf_options or {}))
     else:
         raise ValueError(f"지원하지 않는 파일 형식입니다: {file_ext}")
 
-def _extract_from_docx(file_path: str) -> str:
-    """DOCX 파일에서 텍스트를 추출"""
+def iter_text_blocks(file_path: str, pdf_options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """
+    DOCX 단락/표 셀 또는 PDF 페이지 단위로 텍스트 블록 생성 (전체 텍스트 문자열을 만들지 않음)
+    
+    블록을 '\n'으로 이어 붙이면 extract_text 결과와 같습니다.
+    
+    Args:
+        file_path: 처리할 파일 경로
+        pdf_options: PDF 병렬 추출 설정 (_extract_from_pdf의 workers, pages_per_task, timeout)
+        
+    Yields:
+        텍스트 블록
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.docx':
+        return _iter_docx_blocks(file_path)
+    elif file_ext == '.pdf':
+        return _iter_pdf_pages(file_path, **(pdf_options or {}))
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {file_ext}")
+
+def _report_file_error(file_path: str, error: Exception, file_type: str) -> None:
+    print(f"{file_type} 파일 처리 중 오류: {str(error)}")
+    # 파일 존재 여부 확인
+    if os.path.exists(file_path):
+        file_size = os.path.getsize(file_path)
+        print(f"파일은 존재함 (크기: {file_size} 바이트)")
+    else:
+        print(f"파일이 존재하지 않음: {file_path}")
+
+def _iter_docx_blocks(file_path: str) -> Iterator[str]:
+    """DOCX 단락 텍스트, 이어서 표 셀 텍스트 생성"""
     try:
         doc = docx.Document(file_path)
-        full_text = []
         
         # 디버깅 정보
         print(f"DOCX 파일 처리: {file_path}")
         print(f"단락 수: {len(doc.paragraphs)}")
         
         for para in doc.paragraphs:
-            full_text.append(para.text)
+            yield para.text
         
         # 표(tables)에서 텍스트 추출
         for table in doc.tables:
             for row in table.rows:
                 for cell in row.cells:
-                    full_text.append(cell.text)
-        
-        return '\n'.join(full_text)
+                    yield cell.text
     except Exception as e:
-        print(f"DOCX 파일 처리 중 오류: {str(e)}")
-        # 파일 존재 여부 확인
-        import os
-        if os.path.exists(file_path):
-            file_size = os.path.getsize(file_path)
-            print(f"파일은 존재함 (크기: {file_size} 바이트)")
-        else:
-            print(f"파일이 존재하지 않음: {file_path}")
+        _report_file_error(file_path, e, "DOCX")
         raise
 
-def _extract_from_pdf(file_path: str) -> str:
-    """PDF 파일에서 텍스트를 추출"""
+def _iter_pdf_pages(file_path: str, workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                    timeout: Optional[float] = DEFAULT_TASK_TIMEOUT) -> Iterator[str]:
+    """PDF 페이지 텍스트를 페이지 순서대로 생성 (인자는 _extract_from_pdf 참고)"""
     try:
-        doc = fitz.open(file_path)
-        full_text = []
+        with fitz.open(file_path) as doc:
+            page_count = len(doc)
         
         # 디버깅 정보
         print(f"PDF 파일 처리: {file_path}")
-        print(f"페이지 수: {len(doc)}")
-        
-        for page in doc:
-            full_text.append(page.get_text())
+        print(f"페이지 수: {page_count}")
         
-        return '\n'.join(full_text)
+        yield from iter_pages(file_path, page_count, workers=workers, pages_per_task=pages_per_task,
+                              timeout=timeout)
     except Exception as e:
-        print(f"PDF 파일 처리 중 오류: {str(e)}")
-        # 파일 존재 여부 확인
-        import os
-        if os.path.exists(file_path):
-            file_size = os.path.getsize(file_path)
-            print(f"파일은 존재함 (크기: {file_size} 바이트)")
-        else:
-            print(f"파일이 존재하지 않음: {file_path}")
+        _report_file_error(file_path, e, "PDF")
         raise
 
+def _extract_from_docx(file_path: str) -> str:
+    """DOCX 파일에서 텍스트를 추출"""
+    return '\n'.join(_iter_docx_blocks(file_path))
+
+def _extract_from_pdf(file_path: str, workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                      timeout: Optional[float] = DEFAULT_TASK_TIMEOUT) -> str:
+    """
+    PDF 파일에서 텍스트를 추출 (페이지가 많으면 페이지 범위를 프로세스 풀에 나누어 추출)
+    
+    Args:
+        file_path: PDF 파일 경로
+        workers: 작업자 프로세스 수 (None이면 CPU 코어 수, 1 이하이면 현재 프로세스에서 추출)
+        pages_per_task: 작업 하나가 처리할 페이지 수
+        timeout: 페이지 범위 하나의 결과를 기다리는 최대 시간 (초, None이면 제한 없음)
+        
+    Returns:
+        페이지 순서대로 이어 붙인 텍스트
+    """
+    return '\n'.join(_iter_pdf_pages(file_path, workers=workers, pages_per_task=pages_per_task, timeout=timeout))
+
+def _iter_paragraphs(blocks: Iterable[str]) -> Iterator[str]:
+    """텍스트 블록을 줄 단위 단락으로 나누고 빈 단락 제외 ('\n'.join 후 split과 같은 결과)"""
+    for block in blocks:
+        for para in block.split('\n'):
+            if para.strip():
+                yield para
+
+# 문서 중간의 빈 줄(공백만 있는 줄 포함). '\n'으로 시작하는 패턴이라 re가 빠르게 건너뜀
+_INNER_BLANK_LINE = re.compile(r'\n[^\S\n]*\n')
+
+def _has_blank_line(text: str) -> bool:
+    if _INNER_BLANK_LINE.search(text) is not None:
+        return True
+    first_end, last_start = text.find('\n'), text.rfind('\n')
+    if first_end == -1:
+        return not text.strip()
+    return not text[:first_end].strip() or not text[last_start + 1:].strip()
+
+def paragraph_text(text: str) -> str:
+    """
+    빈 줄을 뺀 텍스트 (청크 구간 오프셋의 기준)
+    
+    빈 줄이 없으면 복사하지 않고 text를 그대로 반환합니다.
+    
+    Args:
+        text: 원본 텍스트
+        
+    Returns:
+        공백만 있는 줄을 제외하고 '\n'으로 이어 붙인 텍스트
+    """
+    if not _has_blank_line(text):
+        return text
+    return '\n'.join(_iter_paragraphs([text]))
+
+# 청크 경계 후보 (우선순위 순): 줄바꿈 > 문장 끝 > 공백
+_SENTENCE_ENDS = ('. ', '? ', '! ')
+_WHITESPACE = (' ', '\t')
+
+def _validate_chunk_params(chunk_size: int, chunk_overlap: int) -> None:
+    if chunk_size <= 0:
+        raise ValueError(f"청크 크기는 1 이상이어야 합니다: {chunk_size}")
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError(f"청크 겹침은 0 이상, 청크 크기({chunk_size}) 미만이어야 합니다: {chunk_overlap}")
+
+def _chunk_end(text: str, start: int, chunk_size: int, chunk_overlap: int) -> int:
+    """
+    start에서 시작하는 청크의 끝 위치 (text에 start + chunk_size보다 긴 내용이 있어야 함)
+    
+    청크 뒤쪽 절반(겹침보다 뒤) 안에서 마지막 줄바꿈, 문장 끝, 공백 순으로 경계를 찾고
+    없으면 chunk_size에서 자릅니다. 다음 청크는 끝 위치 - chunk_overlap에서 시작하므로
+    경계는 항상 start + chunk_overlap보다 뒤에 있어야 합니다.
+    """
+    limit = start + chunk_size
+    lowest = start + max(chunk_overlap + 1, chunk_size // 2)
+    
+    position = text.rfind('\n', lowest, limit + 1)
+    if position != -1:
+        return position
+    position = max(text.rfind(mark, lowest - 1, limit + 1) for mark in _SENTENCE_ENDS)
+    if position != -1:
+        return position + 1
+    position = max(text.rfind(mark, lowest, limit + 1) for mark in _WHITESPACE)
+    if position != -1:
+        return position
+    return limit
+
+def split_text_spans(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Tuple[int, int]]:
+    """
+    텍스트를 청크 구간(문자 오프셋)으로 분할
+    
+    process_document(iter_text_spans)와 같은 청크를 만들도록 빈 줄은 제외하며, 오프셋은
+    paragraph_text(text) 기준입니다 (빈 줄이 없는 텍스트, 예: DocumentText.text이면 text 그대로).
+    텍스트를 한 번만 훑습니다. 각 청크는 chunk_size 문자 이하이고, 이어지는 청크는 정확히
+    chunk_overlap 문자를 겹칩니다. 문서 앞뒤의 공백은 청크에 포함하지 않습니다.
+    
+    Args:
+        text: 분할할 텍스트
+        chunk_size: 각 청크의 최대 크기
+        chunk_overlap: 청크 간 겹치는 문자 수
+        
+    Returns:
+        (시작, 끝) 오프셋 목록 (끝 미포함, paragraph_text(text)[시작:끝]이 청크 텍스트)
+    """
+    _validate_chunk_params(chunk_size, chunk_overlap)
+    text = paragraph_text(text)
+    start = len(text) - len(text.lstrip())
+    end = start
+    spans = []
+    while len(text) - start > chunk_size:
+        end = _chunk_end(text, start, chunk_size, chunk_overlap)
+        spans.append((start, end))
+        start = end - chunk_overlap
+    # 마지막 청크 (뒤쪽 공백을 빼면 앞 청크와 겹치는 부분뿐이면 생략)
+    length = len(text.rstrip())
+    if length > max(start, end):
+        spans.append((start, length))
+    return spans
+
+def iter_text_spans(blocks: Iterable[str], chunk_size: int = 1000,
+                    chunk_overlap: int = 200) -> Iterator[Tuple[int, int, str]]:
+    """
+    텍스트 블록 스트림을 청크로 분할하며 생성 (split_text_spans의 스트리밍 버전)
+    
+    오프셋은 블록을 줄 단위 단락으로 나누고 빈 단락을 뺀 뒤 '\n'으로 이어 붙인 문서 텍스트 기준입니다.
+    다음 청크를 만드는 데 필요한 부분(청크 하나 크기 + 아직 분할하지 않은 단락)만 메모리에 유지합니다.
+    
+    Args:
+        blocks: 텍스트 블록 (iter_text_blocks 결과 또는 문자열 목록)
+        chunk_size: 각 청크의 최대 크기
+        chunk_overlap: 청크 간 겹치는 문자 수
+        
+    Yields:
+        (시작 오프셋, 끝 오프셋, 청크 텍스트)
+    """
+    _validate_chunk_params(chunk_size, chunk_overlap)
+    window = ""    # 문서 텍스트 중 base 위치부터 읽은 부분
+    base = 0
+    pending = []   # window 뒤에 이어 붙일 단락
+    available = 0  # 지금까지 읽은 문서 텍스트 길이
+    start = end = 0
+    
+    def flush():
+        nonlocal window, base
+        # 현재 청크 시작 이전은 버리고 새 단락을 한 번에 이어 붙임
+        window = window[start - base:] + ''.join(pending)
+        base = start
+        pending.clear()
+    
+    for para in _iter_paragraphs(blocks):
+        if available:
+            pending.append('\n')
+            available += 1
+        else:
+            # 문서 맨 앞 공백은 청크에 포함하지 않음
+            start = end = base = available = len(para) - len(para.lstrip())
+            para = para[start:]
+        pending.append(para)
+        available += len(para)
+        if available - start <= chunk_size:
+            continue
+        
+        flush()
+        while available - start > chunk_size:
+            end = base + _chunk_end(window, start - base, chunk_size, chunk_overlap)
+            yield start, end, window[start - base:end - base]
+            start = end - chunk_overlap
+    
+    flush()
+    # 마지막 청크 (뒤쪽 공백을 빼면 앞 청크와 겹치는 부분뿐이면 생략)
+    text = window[start - base:].rstrip()
+    if text and start + len(text) > end:
+        yield start, start + len(text), text
+
+def iter_split_text(blocks: Iterable[str], chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator[str]:
+    """
+    텍스트 블록 스트림을 청크로 분할하며 생성 (iter_text_spans의 청크 텍스트만 반환)
+    
+    Args:
+        blocks: 텍스트 블록 (iter_text_blocks 결과 또는 문자열 목록)
+        chunk_size: 각 청크의 최대 크기
+        chunk_overlap: 청크 간 겹치는 문자 수
+        
+    Yields:
+        텍스트 청크
+    """
+    for _, _, chunk_text in iter_text_spans(blocks, chunk_size, chunk_overlap):
+        yield chunk_text
+
 def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
     """
     텍스트를 청크로 분할
@@ -122,101 +328,198 @@ def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> L
     Returns:
         분할된 텍스트 청크 리스트
     """
-    # 텍스트가 비어있는 경우
-    if not text:
-        return []
-    
-    # 단락 단위로 분할
-    paragraphs = text.split('\n')
-    paragraphs = [p for p in paragraphs if p.strip()]
-    
-    chunks = []
-    current_chunk = []
-    current_size = 0
-    
-    for para in paragraphs:
-        # 단락이 청크 사이즈보다 크면 추가 분할
-        if len(para) > chunk_size:
-            # 현재 청크를 저장
-            if current_chunk:
-                chunks.append('\n'.join(current_chunk))
-                # 겹치는 부분 유지
-                overlap_paras = current_chunk[-1:] if current_chunk else []
-                current_chunk = overlap_paras
-                current_size = sum(len(p) for p in current_chunk)
-            
-            # 큰 단락 분할
-            words = para.split()
-            temp_chunk = []
-            temp_size = 0
-            
-            for word in words:
-                if temp_size + len(word) + 1 > chunk_size:
-                    chunks.append(' '.join(temp_chunk))
-                    # 겹치는 부분 유지
-                    overlap_point = max(0, len(temp_chunk) - int(chunk_overlap / 5))
-                    temp_chunk = temp_chunk[overlap_point:]
-                    temp_size = sum(len(w) + 1 for w in temp_chunk)
-                
-                temp_chunk.append(word)
-                temp_size += len(word) + 1
-            
-            if temp_chunk:
-                current_chunk.append(' '.join(temp_chunk))
-                current_size += temp_size
-        
-        # 일반적인 경우: 단락 추가
-        elif current_size + len(para) > chunk_size:
-            chunks.append('\n'.join(current_chunk))
-            # 겹치는 부분 유지
-            overlap_paras = current_chunk[-1:] if current_chunk else []
-            current_chunk = overlap_paras
-            current_size = sum(len(p) for p in current_chunk)
-            current_chunk.append(para)
-            current_size += len(para)
-        else:
-            current_chunk.append(para)
-            current_size += len(para)
+    text = paragraph_text(text)
+    return [text[start:end] for start, end in split_text_spans(text, chunk_size, chunk_overlap)]
+
+def _chunk_record(chunk_id: int, chunk_text: str, file_name: str, file_path: str) -> Dict[str, Any]:
+    return {
+        'text': chunk_text,
+        'metadata': {
+            'file_name': file_name,
+            'chunk_id': chunk_id,
+            'source': file_path
+        }
+    }
+
+def _iter_cached_chunk_texts(file_path: str, chunk_size: int, chunk_overlap: int,
+                             pdf_options: Optional[Dict[str, Any]], cache_dir: str) -> Iterator[str]:
+    """
+    추출 캐시를 거쳐 청크 텍스트 생성
     
-    # 마지막 청크 추가
-    if current_chunk:
-        chunks.append('\n'.join(current_chunk))
+    - 텍스트 블록이 있으면 파싱 없이 블록 문서 텍스트에서 청크를 잘라 반환
+      (같은 분할 설정의 청크 구간이 있으면 그대로 사용, 없으면 다시 분할하여 구간 저장)
+    - 없으면 추출/분할하며 블록과 청크 구간을 모아 두었다가 끝나면 저장
+    """
+    cache = get_extraction_cache(cache_dir)
+    digest = file_digest(file_path)
+    try:
+        spans = cache.get_spans(digest, chunk_size, chunk_overlap)
+        blocks = cache.get_blocks(digest)
+        if blocks is not None:
+            text = '\n'.join(_iter_paragraphs(blocks))
+            if spans is None:
+                spans = split_text_spans(text, chunk_size, chunk_overlap)
+                cache.put_spans(digest, chunk_size, chunk_overlap, spans)
+            else:
+                print(f"추출 캐시 적중: {os.path.basename(file_path)} (청크 {len(spans)}개)")
+            for start, end in spans:
+                yield text[start:end]
+            return
+        
+        blocks = []
+        spans = []
+        
+        def recorded_blocks():
+            for block in iter_text_blocks(file_path, pdf_options):
+                blocks.append(block)
+                yield block
+        
+        for start, end, chunk_text in iter_text_spans(recorded_blocks(), chunk_size, chunk_overlap):
+            spans.append((start, end))
+            yield chunk_text
+        
+        # 소비자가 끝까지 읽은 경우에만 저장 (중간에 멈춘 결과는 불완전)
+        cache.put_blocks(digest, blocks)
+        cache.put_spans(digest, chunk_size, chunk_overlap, spans)
+    finally:
+        cache.flush_stats()
+
+def iter_document_chunks(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200,
+                         file_name: Optional[str] = None,
+                         pdf_options: Optional[Dict[str, Any]] = None,
+                         use_cache: bool = True,
+                         cache_dir: str = DEFAULT_EXTRACTION_CACHE_DIR) -> Iterator[Dict[str, Any]]:
+    """
+    문서를 읽는 대로 청크 레코드를 생성 (process_document의 스트리밍 버전)
     
-    return chunks
+    문서 전체 텍스트나 전체 청크 목록을 만들지 않으므로, embedder.index_chunk_stream과
+    함께 사용하면 추출/임베딩/색인이 일정 크기 배치 단위로 진행됩니다.
+    추출 캐시를 사용하면 캐시에 저장할 블록/청크 텍스트는 끝까지 보관합니다.
+    
+    Args:
+        file_path: 처리할 파일 경로
+        chunk_size: 각 청크의 최대 크기
+        chunk_overlap: 청크 간 겹치는 문자 수
+        file_name: 메타데이터에 기록할 문서명 (기본값: 파일 경로의 파일명)
+        pdf_options: PDF 병렬 추출 설정 (예: {'workers': 4, 'pages_per_task': 16, 'timeout': 120})
+        use_cache: 파일 내용 해시 기준 추출 캐시 사용 여부
+        cache_dir: 추출 캐시 디렉토리
+        
+    Yields:
+        청크 레코드 (메타데이터 포함)
+    """
+    # 메타데이터 추가 (파일명, 페이지 번호 등)
+    file_name = file_name or os.path.basename(file_path)
+    if use_cache:
+        chunk_texts = _iter_cached_chunk_texts(file_path, chunk_size, chunk_overlap, pdf_options, cache_dir)
+    else:
+        chunk_texts = iter_split_text(iter_text_blocks(file_path, pdf_options), chunk_size, chunk_overlap)
+    
+    for i, chunk_text in enumerate(chunk_texts):
+        yield _chunk_record(i, chunk_text, file_name, file_path)
 
-def process_document(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Dict[str, Any]]:
+def process_document(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200,
+                     file_name: Optional[str] = None,
+                     pdf_options: Optional[Dict[str, Any]] = None,
+                     use_cache: bool = True,
+                     cache_dir: str = DEFAULT_EXTRACTION_CACHE_DIR) -> List[Dict[str, Any]]:
     """
     문서를 처리하여 청크 단위로 분리
     
+    같은 내용의 파일을 같은 분할 설정으로 처리한 적이 있으면 추출 캐시(data/processed)에서 바로 반환합니다.
+    
     Args:
         file_path: 처리할 파일 경로
         chunk_size: 각 청크의 최대 크기
         chunk_overlap: 청크 간 겹치는 문자 수
+        file_name: 메타데이터에 기록할 문서명 (기본값: 파일 경로의 파일명)
+        pdf_options: PDF 병렬 추출 설정 (예: {'workers': 4, 'pages_per_task': 16, 'timeout': 120})
+        use_cache: 파일 내용 해시 기준 추출 캐시 사용 여부
+        cache_dir: 추출 캐시 디렉토리
         
     Returns:
         청크 리스트 (메타데이터 포함)
     """
-    # 텍스트 추출
-    text = extract_text(file_path)
+    return list(iter_document_chunks(file_path, chunk_size, chunk_overlap, file_name, pdf_options,
+                                     use_cache=use_cache, cache_dir=cache_dir))
+
+def _document_block_kind(file_path: str) -> str:
+    return "page" if os.path.splitext(file_path)[1].lower() == '.pdf' else "block"
+
+def _load_cached_document(file_path: str, pdf_options: Optional[Dict[str, Any]],
+                          cache) -> Tuple[DocumentText, str]:
+    """추출 캐시의 텍스트 블록으로 문서 텍스트 구성 (없으면 추출 후 저장), (문서 텍스트, 파일 해시) 반환"""
+    digest = file_digest(file_path)
+    blocks = cache.get_blocks(digest)
+    if blocks is None:
+        blocks = list(iter_text_blocks(file_path, pdf_options))
+        cache.put_blocks(digest, blocks)
+    else:
+        print(f"추출 캐시 적중: {os.path.basename(file_path)} (블록 {len(blocks)}개)")
+    return DocumentText(blocks, _document_block_kind(file_path)), digest
+
+def load_document(file_path: str, pdf_options: Optional[Dict[str, Any]] = None, use_cache: bool = True,
+                  cache_dir: str = DEFAULT_EXTRACTION_CACHE_DIR) -> DocumentText:
+    """
+    문서 텍스트를 하나의 버퍼로 로드 (단락/페이지 위치 포함)
     
-    # 텍스트 분할
-    chunks = split_text(text, chunk_size, chunk_overlap)
+    Args:
+        file_path: 처리할 파일 경로
+        pdf_options: PDF 병렬 추출 설정 (예: {'workers': 4, 'pages_per_task': 16, 'timeout': 120})
+        use_cache: 파일 내용 해시 기준 추출 캐시(텍스트 블록) 사용 여부
+        cache_dir: 추출 캐시 디렉토리
+        
+    Returns:
+        문서 텍스트 (PDF는 블록이 페이지)
+    """
+    if not use_cache:
+        return DocumentText(iter_text_blocks(file_path, pdf_options), _document_block_kind(file_path))
     
-    # 메타데이터 추가 (파일명, 페이지 번호 등)
-    file_name = os.path.basename(file_path)
-    processed_chunks = []
+    cache = get_extraction_cache(cache_dir)
+    try:
+        return _load_cached_document(file_path, pdf_options, cache)[0]
+    finally:
+        cache.flush_stats()
+
+def process_document_spans(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200,
+                           file_name: Optional[str] = None,
+                           pdf_options: Optional[Dict[str, Any]] = None,
+                           use_cache: bool = True,
+                           cache_dir: str = DEFAULT_EXTRACTION_CACHE_DIR) -> List[ChunkSpan]:
+    """
+    문서를 처리하여 문서 텍스트 버퍼를 공유하는 청크 구간으로 분리
     
-    for i, chunk_text in enumerate(chunks):
-        processed_chunks.append({
-            'text': chunk_text,
-            'metadata': {
-                'file_name': file_name,
-                'chunk_id': i,
-                'source': file_path
-            }
-        })
-    
-    return processed_chunks
+    process_document와 같은 청크를 만들지만 청크마다 텍스트를 복사하지 않습니다.
+    각 청크는 chunk['text']로 접근할 때 텍스트를 만들고, 메타데이터에 단락(과 PDF 페이지) 범위를 기록합니다.
+    원본 텍스트는 chunks[0].document로 접근합니다.
+    
+    Args:
+        file_path: 처리할 파일 경로
+        chunk_size: 각 청크의 최대 크기
+        chunk_overlap: 청크 간 겹치는 문자 수
+        file_name: 메타데이터에 기록할 문서명 (기본값: 파일 경로의 파일명)
+        pdf_options: PDF 병렬 추출 설정 (예: {'workers': 4, 'pages_per_task': 16, 'timeout': 120})
+        use_cache: 파일 내용 해시 기준 추출 캐시(텍스트 블록, 청크 구간) 사용 여부
+        cache_dir: 추출 캐시 디렉토리
+        
+    Returns:
+        청크 구간 리스트
+    """
+    if use_cache:
+        cache = get_extraction_cache(cache_dir)
+        try:
+            document, digest = _load_cached_document(file_path, pdf_options, cache)
+            spans = cache.get_spans(digest, chunk_size, chunk_overlap)
+            if spans is None:
+                spans = split_text_spans(document.text, chunk_size, chunk_overlap)
+                cache.put_spans(digest, chunk_size, chunk_overlap, spans)
+            spans = [(int(start), int(end)) for start, end in spans]
+        finally:
+            cache.flush_stats()
+    else:
+        document = load_document(file_path, pdf_options, use_cache=False)
+        spans = split_text_spans(document.text, chunk_size, chunk_overlap)
+    return build_chunk_spans(document, spans, file_name or os.path.basename(file_path), file_path)
 
 # 예시 기획서 데이터 추가 (테스트 용도)
 def generate_sample_game_design_doc() -> List[Dict[str, Any]]:
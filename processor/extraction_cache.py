@@ -0,0 +1,342 @@
+"""
+추출 캐시 모듈: 파일 내용 해시(SHA-256) 기준으로 추출한 텍스트 블록과 청크 분할 결과를 data/processed에 보관
+
+같은 파일을 다시 업로드하면 DOCX/PDF를 다시 파싱하지 않고 캐시에서 바로 청크를 반환합니다.
+
+저장 형식 (항목마다 디렉토리 하나: <SHA-256>.v<추출기 버전>/)
+- blocks.npz: 텍스트 블록(페이지/단락)을 이어 붙인 UTF-8 바이트와 블록 경계 오프셋 (zlib 압축)
+- spans_<청크 크기>_<겹침>.npy: 분할 설정별 청크 (시작, 끝) 문자 오프셋. 블록의 빈 줄을 빼고
+  '\n'으로 이어 붙인 문서 텍스트(DocumentText.text) 기준이라 문서 텍스트를 두 번 보관하지 않음
+- stats.json (캐시 루트): 누적 적중/미적중/제거 수 (메모리에 모았다가 문서 처리가 끝나거나 종료할 때 기록)
+
+항목 디렉토리의 수정 시각을 마지막 사용 시각으로 사용하여, 크기 한도를 넘으면 오래 사용하지 않은 항목부터 삭제합니다.
+
+사용 예:
+    python -m processor.extraction_cache stats
+    python -m processor.extraction_cache clear
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 통계 기록을 파일 잠금 없이 수행
+    fcntl = None
+
+# 기본 캐시 경로 및 크기 한도
+DEFAULT_CACHE_DIR = os.path.join("data", "processed")
+DEFAULT_MAX_SIZE_MB = 256
+
+# 텍스트 추출/청크 분할 방식이 바뀌면 올려서 이전 캐시 항목을 무효화
+EXTRACTOR_VERSION = 3
+
+BLOCKS_FILE = "blocks.npz"
+STATS_FILE = "stats.json"
+LOCK_FILE = "stats.lock"
+
+_HASH_READ_BYTES = 1024 * 1024
+
+
+def file_digest(file_path: str) -> str:
+    """
+    파일 내용의 SHA-256 해시
+
+    Args:
+        file_path: 파일 경로
+
+    Returns:
+        16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_READ_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _save_texts(path: str, texts: List[str]) -> None:
+    """텍스트 목록을 이어 붙인 UTF-8 바이트 + 경계 오프셋으로 압축 저장"""
+    encoded = [text.encode('utf-8') for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    with open(path + ".tmp", 'wb') as f:
+        np.savez_compressed(f, data=np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets=offsets)
+    os.replace(path + ".tmp", path)
+
+
+def _load_texts(path: str) -> List[str]:
+    with np.load(path, allow_pickle=False) as arrays:
+        data = arrays['data'].tobytes()
+        offsets = arrays['offsets'].tolist()
+    return [data[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+class ExtractionCache:
+    """파일 내용 해시 기준 텍스트 블록/청크 디스크 캐시 (크기 한도 LRU)"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        """
+        추출 캐시 초기화
+
+        Args:
+            cache_dir: 캐시 루트 디렉토리
+            max_size_mb: 캐시 전체 최대 크기 (MB)
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        # 아직 stats.json에 반영하지 않은 통계
+        self._pending: Dict[str, int] = {}
+
+    def _entry_directory(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.v{EXTRACTOR_VERSION}")
+
+    @staticmethod
+    def _spans_file(chunk_size: int, chunk_overlap: int) -> str:
+        return f"spans_{chunk_size}_{chunk_overlap}.npy"
+
+    def _record(self, **counts: int) -> None:
+        """통계 누적 (메모리에만 기록, flush_stats()에서 stats.json에 반영)"""
+        with self._lock:
+            for key, value in counts.items():
+                self._pending[key] = self._pending.get(key, 0) + value
+
+    @contextmanager
+    def _stats_lock(self):
+        """여러 프로세스가 stats.json을 동시에 갱신할 때 누락되지 않도록 파일 잠금"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def flush_stats(self) -> None:
+        """메모리에 모은 통계를 stats.json에 더해서 기록 (문서 처리가 끝날 때와 프로세스 종료 시)"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            with self._stats_lock():
+                stats = self._read_counters()
+                for key, value in pending.items():
+                    stats[key] = stats.get(key, 0) + value
+                path = os.path.join(self.cache_dir, STATS_FILE)
+                with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                    json.dump(stats, f)
+                os.replace(path + ".tmp", path)
+
+    def _read_counters(self) -> Dict[str, int]:
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _touch(entry: str) -> None:
+        # 마지막 사용 시각 갱신
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+    def get_blocks(self, digest: str) -> Optional[List[str]]:
+        """캐시된 텍스트 블록 (없으면 None)"""
+        entry = self._entry_directory(digest)
+        try:
+            blocks = _load_texts(os.path.join(entry, BLOCKS_FILE))
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            self._record(block_misses=1)
+            return None
+        self._touch(entry)
+        self._record(block_hits=1)
+        return blocks
+
+    def put_blocks(self, digest: str, blocks: List[str]) -> None:
+        """텍스트 블록 저장"""
+        entry = self._entry_directory(digest)
+        os.makedirs(entry, exist_ok=True)
+        _save_texts(os.path.join(entry, BLOCKS_FILE), blocks)
+        self._touch(entry)
+        self.evict()
+
+    def get_spans(self, digest: str, chunk_size: int, chunk_overlap: int) -> Optional[np.ndarray]:
+        """
+        분할 설정에 해당하는 캐시된 청크 구간 (없으면 None)
+
+        Returns:
+            (청크 수, 2) int64 배열 - 블록 문서 텍스트 기준 (시작, 끝) 오프셋
+        """
+        entry = self._entry_directory(digest)
+        try:
+            spans = np.load(os.path.join(entry, self._spans_file(chunk_size, chunk_overlap)), allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            self._record(misses=1)
+            return None
+        self._touch(entry)
+        self._record(hits=1)
+        return spans.reshape(-1, 2)
+
+    def put_spans(self, digest: str, chunk_size: int, chunk_overlap: int, spans) -> None:
+        """분할 설정별 청크 (시작, 끝) 오프셋 저장 (같은 항목의 블록 기준)"""
+        entry = self._entry_directory(digest)
+        os.makedirs(entry, exist_ok=True)
+        path = os.path.join(entry, self._spans_file(chunk_size, chunk_overlap))
+        with open(path + ".tmp", 'wb') as f:
+            np.save(f, np.asarray(spans, dtype=np.int64).reshape(-1, 2), allow_pickle=False)
+        os.replace(path + ".tmp", path)
+        self._touch(entry)
+        self.evict()
+
+    def entries(self) -> List[Dict]:
+        """캐시 항목 목록 (오래 사용하지 않은 순)"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path) or '.v' not in name:
+                continue
+            digest, _, version = name.rpartition('.v')
+            try:
+                entries.append({'digest': digest, 'version': int(version), 'path': path,
+                                'bytes': _directory_size(path), 'last_used': os.stat(path).st_mtime,
+                                'chunk_settings': sum(1 for f in os.listdir(path) if f.startswith("spans_"))})
+            except (OSError, ValueError):
+                continue
+        return sorted(entries, key=lambda entry: entry['last_used'])
+
+    def evict(self, max_size_bytes: Optional[int] = None) -> int:
+        """
+        크기 한도를 넘으면 오래 사용하지 않은 항목부터 삭제 (이전 추출기 버전 항목은 항상 삭제)
+
+        Args:
+            max_size_bytes: 크기 한도 (None이면 초기화 때 설정한 한도)
+
+        Returns:
+            삭제한 항목 수
+        """
+        limit = self.max_size_bytes if max_size_bytes is None else max_size_bytes
+        entries = self.entries()
+        total = sum(entry['bytes'] for entry in entries)
+        removed = 0
+        for entry in entries:
+            if entry['version'] == EXTRACTOR_VERSION and total <= limit:
+                continue
+            shutil.rmtree(entry['path'], ignore_errors=True)
+            total -= entry['bytes']
+            removed += 1
+        if removed:
+            self._record(evictions=removed)
+        return removed
+
+    def clear(self) -> int:
+        """모든 항목 삭제 후 삭제한 항목 수 반환"""
+        return self.evict(max_size_bytes=-1)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        캐시 사용 통계 반환
+
+        Returns:
+            항목 수, 전체 크기, 크기 한도, 누적 청크 구간 적중/미적중 수와 적중률,
+            텍스트 블록 적중 수(문서 파싱 생략), 제거 수
+        """
+        entries = self.entries()
+        counters = self._read_counters()
+        with self._lock:
+            for key, value in self._pending.items():
+                counters[key] = counters.get(key, 0) + value
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        return {
+            'entries': len(entries),
+            'bytes': sum(entry['bytes'] for entry in entries),
+            'max_bytes': self.max_size_bytes,
+            'hits': hits,
+            'misses': misses,
+            'block_hits': counters.get('block_hits', 0),
+            'evictions': counters.get('evictions', 0),
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+_caches: Dict[str, ExtractionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_extraction_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> ExtractionCache:
+    """캐시 경로별로 공유되는 추출 캐시 인스턴스 반환"""
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = ExtractionCache(cache_dir)
+        return _caches[cache_dir]
+
+
+@atexit.register
+def _flush_caches() -> None:
+    """프로세스 종료 시 아직 기록하지 않은 통계 기록"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        try:
+            cache.flush_stats()
+        except OSError:
+            pass
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="문서 추출 캐시 관리")
+    parser.add_argument("command", choices=["stats", "evict", "clear"], help="stats: 통계 출력, evict: 한도 적용, clear: 전체 삭제")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"캐시 경로 (기본값: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--max-size-mb", type=float, default=DEFAULT_MAX_SIZE_MB, help="크기 한도 (MB)")
+    args = parser.parse_args()
+
+    cache = ExtractionCache(args.cache_dir, max_size_mb=args.max_size_mb)
+    if args.command == "clear":
+        print(f"추출 캐시 항목 {cache.clear()}개 삭제")
+        cache.flush_stats()
+        return
+    if args.command == "evict":
+        print(f"추출 캐시 항목 {cache.evict()}개 삭제")
+        cache.flush_stats()
+
+    stats = cache.stats()
+    print(f"추출 캐시: {args.cache_dir} (추출기 버전 {EXTRACTOR_VERSION})")
+    print(f"- 항목 {stats['entries']}개, {stats['bytes'] / 1024 / 1024:.2f} MB / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    print(f"- 적중 {stats['hits']}회, 미적중 {stats['misses']}회 (적중률 {stats['hit_ratio']:.1%}), "
+          f"블록 재사용 {stats['block_hits']}회, 제거 {stats['evictions']}개")
+    for entry in reversed(cache.entries()):
+        used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+        print(f"  {entry['digest'][:16]}  v{entry['version']}  {entry['bytes'] / 1024:8.1f} KB  "
+              f"분할 설정 {entry['chunk_settings']}개  마지막 사용 {used}")
+
+
+if __name__ == "__main__":
+    main()
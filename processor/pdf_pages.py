@@ -0,0 +1,177 @@
+"""
+PDF 페이지 병렬 추출 모듈: 페이지 범위를 프로세스 풀에 나누어 텍스트를 추출하고 페이지 순서대로 재조립
+
+PyMuPDF 문서 객체는 프로세스 간에 공유할 수 없으므로 작업자마다 파일을 직접 엽니다.
+작업자가 문서 처리 모듈(nltk, docx 등)을 가져오지 않도록 별도 모듈로 분리했습니다.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# 이 페이지 수보다 적으면 풀을 쓰지 않고 현재 프로세스에서 추출 (작업 분배 비용이 더 큼)
+PARALLEL_MIN_PAGES = 32
+
+# 작업 하나가 처리할 페이지 수
+DEFAULT_PAGES_PER_TASK = 16
+
+# 작업 하나(페이지 범위)의 결과를 기다리는 최대 시간 (초)
+DEFAULT_TASK_TIMEOUT = 120.0
+
+# 작업자 수별로 재사용하는 프로세스 풀과 풀별 작업자 PID 기록 큐
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_pid_queues: Dict[int, Any] = {}
+_pools_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    """기본 작업자 수 (CPU 코어 수, 최대 8)"""
+    return min(os.cpu_count() or 1, 8)
+
+
+def page_ranges(page_count: int, pages_per_task: int = DEFAULT_PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    """
+    페이지를 작업 단위 범위로 분할
+
+    Args:
+        page_count: 전체 페이지 수
+        pages_per_task: 작업 하나가 처리할 페이지 수
+
+    Returns:
+        (시작 페이지, 끝 페이지) 목록 (끝 페이지 미포함)
+    """
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    페이지 범위의 텍스트 추출 (작업자에서 실행, 문서를 직접 엶)
+
+    Args:
+        file_path: PDF 파일 경로
+        start: 시작 페이지 (0부터)
+        end: 끝 페이지 (미포함)
+
+    Returns:
+        페이지별 텍스트 목록
+    """
+    with fitz.open(file_path) as doc:
+        return [doc[page_number].get_text() for page_number in range(start, end)]
+
+
+def _init_worker(pid_queue) -> None:
+    """작업자 초기화 - 응답하지 않을 때 강제 종료할 수 있도록 PID 기록"""
+    pid_queue.put(os.getpid())
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if workers not in _pools:
+            # 멀티스레드 프로세스(Streamlit)에서 fork하면 다른 스레드가 잡고 있던 잠금이 복사되어
+            # 작업자가 멈출 수 있으므로 spawn 사용
+            context = multiprocessing.get_context('spawn')
+            pid_queue = context.SimpleQueue()
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                  initializer=_init_worker, initargs=(pid_queue,))
+            _pool_pid_queues[workers] = pid_queue
+        return _pools[workers]
+
+
+def _discard_pool(workers: int) -> None:
+    """응답하지 않는 작업자가 있는 풀을 종료하고 다음 호출에서 새로 생성"""
+    with _pools_lock:
+        pool = _pools.pop(workers, None)
+        pid_queue = _pool_pid_queues.pop(workers, None)
+    if pool is None:
+        return
+    pool.shutdown(wait=False, cancel_futures=True)
+    # 실행 중인 작업은 취소할 수 없으므로 초기화 때 기록한 작업자 프로세스를 직접 종료
+    while pid_queue is not None and not pid_queue.empty():
+        try:
+            os.kill(pid_queue.get(), signal.SIGTERM)
+        except (OSError, ValueError):
+            pass
+
+
+def shutdown_pdf_pools() -> None:
+    """생성된 PDF 추출 프로세스 풀을 모두 종료"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True)
+        _pools.clear()
+        _pool_pid_queues.clear()
+
+
+def iter_pages(file_path: str, page_count: int, workers: Optional[int] = None,
+               pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+               timeout: Optional[float] = DEFAULT_TASK_TIMEOUT) -> Iterator[str]:
+    """
+    PDF 페이지 텍스트를 페이지 순서대로 생성 (앞쪽 페이지 범위가 끝나는 대로 바로 반환)
+
+    Args:
+        file_path: PDF 파일 경로
+        page_count: 전체 페이지 수
+        workers: 작업자 프로세스 수 (None이면 CPU 코어 수, 1 이하이면 현재 프로세스에서 추출)
+        pages_per_task: 작업 하나가 처리할 페이지 수
+        timeout: 페이지 범위 하나의 결과를 기다리는 최대 시간 (초, None이면 제한 없음).
+            초과하면 풀을 종료하고 TimeoutError 발생
+
+    Yields:
+        페이지 텍스트
+    """
+    workers = default_workers() if workers is None else workers
+    ranges = page_ranges(page_count, pages_per_task)
+    if workers <= 1 or len(ranges) <= 1 or page_count < PARALLEL_MIN_PAGES:
+        # 현재 프로세스에서는 문서를 한 번만 열고 페이지 단위로 생성
+        with fitz.open(file_path) as doc:
+            for page_number in range(page_count):
+                yield doc[page_number].get_text()
+        return
+
+    workers = min(workers, len(ranges))
+    pool = _get_pool(workers)
+    try:
+        futures = [pool.submit(extract_page_range, file_path, start, end) for start, end in ranges]
+    except BrokenProcessPool:
+        _discard_pool(workers)
+        yield from extract_page_range(file_path, 0, page_count)
+        return
+
+    # 제출 순서(= 페이지 순서)대로 결과를 반환
+    try:
+        for (start, end), future in zip(ranges, futures):
+            try:
+                pages = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                _discard_pool(workers)
+                raise TimeoutError(f"PDF 페이지 {start + 1}-{end} 추출이 {timeout}초 안에 끝나지 않았습니다.")
+            except BrokenProcessPool:
+                # 작업자가 비정상 종료되면 남은 페이지는 현재 프로세스에서 추출
+                print(f"PDF 추출 작업자 오류, 페이지 {start + 1}부터 현재 프로세스에서 추출합니다.")
+                _discard_pool(workers)
+                yield from extract_page_range(file_path, start, page_count)
+                return
+            yield from pages
+    finally:
+        # 소비자가 중간에 멈추면 아직 시작하지 않은 작업 취소
+        for future in futures:
+            future.cancel()
+
+
+def extract_pages(file_path: str, page_count: int, workers: Optional[int] = None,
+                  pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                  timeout: Optional[float] = DEFAULT_TASK_TIMEOUT) -> List[str]:
+    """
+    PDF 전체 페이지 텍스트를 페이지 순서대로 추출 (인자는 iter_pages 참고)
+
+    Returns:
+        페이지별 텍스트 목록
+    """
+    return list(iter_pages(file_path, page_count, workers=workers, pages_per_task=pages_per_task, timeout=timeout))
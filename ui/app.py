@@ -7,6 +7,7 @@ import sys
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from contextlib import nullcontext
 import tempfile
 
 # 환경 변수 설정을 맨 위로 이동
@@ -90,8 +91,9 @@ except ImportError as e:
     st.warning(f"huggingface_hub 가져오기 경고: {e}")
 
 try:
-    from processor.document_processor import process_document
-    from embedding.embedder import create_embeddings, build_vector_db, load_vector_db
+    from processor.document_processor import process_document_spans
+    from embedding.embedder import index_chunk_stream, remote_vector_db
+    from embedding.snapshots import get_vector_db_handle
     from engine.rag_engine import process_rag, generate_testcases
     from validator.validator import validate_testcases
     from excel_exporter.excel_exporter import export_to_excel, export_validation_results, export_to_bytes
@@ -146,6 +148,36 @@ def main():
             help="RAG 검색 시 반환할 결과 수를 설정합니다."
         )
         
+        # 최소 유사도 (코사인 인덱스에서만 적용)
+        min_similarity = st.slider(
+            "최소 유사도",
+            min_value=0.0,
+            max_value=1.0,
+            value=0.3,
+            step=0.05,
+            help="이 값보다 유사도가 낮은 검색 결과는 테스트케이스 생성에 사용하지 않습니다."
+        )
+        
+        # MMR 다양성 가중치
+        diversity = st.slider(
+            "검색 다양성",
+            min_value=0.0,
+            max_value=0.9,
+            value=0.3,
+            step=0.1,
+            help="값이 클수록 서로 겹치는 청크 대신 다른 내용의 청크를 검색 결과로 고릅니다. 0이면 관련도 순서 그대로 사용합니다."
+        )
+        
+        # 검색 방식
+        search_mode_labels = {"벡터": "vector", "키워드 (BM25)": "lexical", "혼합": "fused"}
+        search_mode_label = st.selectbox(
+            "검색 방식",
+            options=list(search_mode_labels),
+            index=2,
+            help="키워드 검색은 장착, 세트 효과, COOLDOWN 같은 정확한 용어/필드명에 강하고, 혼합은 두 결과의 순위를 합칩니다."
+        )
+        search_mode = search_mode_labels[search_mode_label]
+        
         # 벡터 DB 디렉토리
         vector_db_dir = st.text_input(
             "벡터 DB 디렉토리",
@@ -220,54 +252,36 @@ def main():
             if st.button("문서 처리 시작", type="primary"):
                 try:
                     with st.spinner("문서를 처리하고 있습니다..."):
-                        # 1. 문서 처리
-                        st.info("1/4 단계: 문서를 텍스트로 추출하고 청크로 분할 중...")
+                        # 1~3. 문서 추출/청크 분할 -> 임베딩 -> 벡터 DB 반영 (임베딩/반영은 배치 단위)
+                        # 문서 텍스트는 한 번만 보관하고 청크는 그 구간(오프셋)으로 표현
+                        st.info("1~3/4 단계: 문서를 청크로 분할하고 배치 단위로 임베딩/벡터 DB에 반영 중...")
                         try:
                             # 디버깅을 위한 정보 출력
                             st.write(f"파일 경로: {st.session_state.uploaded_file_path}")
                             st.write(f"파일 존재 여부: {os.path.exists(st.session_state.uploaded_file_path)}")
                             
-                            chunks = process_document(
+                            chunks = process_document_spans(
                                 st.session_state.uploaded_file_path, 
                                 chunk_size=chunk_size, 
-                                chunk_overlap=chunk_overlap
+                                chunk_overlap=chunk_overlap,
+                                file_name=st.session_state.uploaded_file_name
                             )
-                            st.write(f"처리된 청크 수: {len(chunks)}")
-                        except Exception as doc_error:
-                            st.error(f"문서 처리 오류: {doc_error}")
-                            import traceback
-                            st.code(traceback.format_exc())
-                            raise
-                        
-                        # 2. 임베딩 생성
-                        st.info("2/4 단계: 텍스트 청크 임베딩 생성 중...")
-                        try:
-                            embedded_chunks = create_embeddings(chunks)
-                            st.write(f"임베딩된 청크 수: {len(embedded_chunks)}")
-                        except Exception as emb_error:
-                            st.error(f"임베딩 생성 오류: {emb_error}")
-                            import traceback
-                            st.code(traceback.format_exc())
-                            raise
-                        
-                        # 3. 벡터 DB 구축
-                        st.info("3/4 단계: 벡터 DB 구축 중...")
-                        try:
-                            vector_db = build_vector_db(embedded_chunks, vector_db_dir)
+                            # 기존 벡터 DB가 있으면 이 문서의 변경된 청크만 갱신
+                            index_result = index_chunk_stream(chunks, vector_db_dir,
+                                                              index_config={'metric': 'cosine'})
+                            st.write(f"처리된 청크 수: {index_result['chunks']} (배치 {index_result['batches']}개)")
                             st.write(f"벡터 DB 디렉토리: {vector_db_dir}")
-                        except Exception as db_error:
-                            st.error(f"벡터 DB 구축 오류: {db_error}")
+                        except Exception as index_error:
+                            st.error(f"문서 처리/벡터 DB 구축 오류: {index_error}")
                             import traceback
                             st.code(traceback.format_exc())
                             raise
                         
-                        # 4. 원본 텍스트 저장
-                        original_text = "\n".join([chunk['text'] for chunk in chunks])
+                        # 4. 원본 텍스트 저장 (청크가 공유하는 문서 텍스트 버퍼, 복사하지 않음)
+                        original_text = chunks[0].document if chunks else ""
                         
                         # 세션 상태에 저장
                         st.session_state.chunks = chunks
-                        st.session_state.embedded_chunks = embedded_chunks
-                        st.session_state.vector_db = vector_db
                         st.session_state.vector_db_dir = vector_db_dir
                         st.session_state.original_text = original_text
                         st.session_state.document_processed = True
@@ -295,26 +309,38 @@ def main():
             if st.button("테스트케이스 생성", type="primary"):
                 try:
                     with st.spinner("테스트케이스를 생성하고 있습니다..."):
-                        # 벡터 DB가 세션에 없다면 로드
-                        if 'vector_db' not in st.session_state:
-                            vector_db = load_vector_db(st.session_state.vector_db_dir)
-                            st.session_state.vector_db = vector_db
-                        
-                        if query:
-                            # 쿼리 기반 테스트케이스 생성
-                            st.info("쿼리 기반 테스트케이스 생성 중...")
-                            testcases = process_rag(
-                                st.session_state.vector_db, 
-                                query,
-                                n_results=n_results
-                            )
-                        else:
-                            # 전체 문서 기반 테스트케이스 생성
-                            st.info("전체 문서 기반 테스트케이스 생성 중...")
-                            testcases = generate_testcases(
-                                st.session_state.vector_db, 
-                                st.session_state.chunks
-                            )
+                        # 세션마다 로드하지 않고 프로세스 전역 핸들을 공유하며, 요청 동안 같은 버전으로 고정
+                        # (다른 세션이 새 버전을 공개하면 다음 요청부터 반영)
+                        # 검색 서버(TC_SEARCH_SERVER)가 실행 중이면 모델/인덱스는 서버가 보유
+                        remote_db = remote_vector_db(st.session_state.vector_db_dir)
+                        vector_db_context = (nullcontext(remote_db) if remote_db is not None
+                                             else get_vector_db_handle(st.session_state.vector_db_dir).pinned())
+                        with vector_db_context as vector_db:
+                            if query:
+                                # 쿼리 기반 테스트케이스 생성
+                                st.info("쿼리 기반 테스트케이스 생성 중...")
+                                testcases, mmr_report = process_rag(
+                                    vector_db,
+                                    query,
+                                    n_results=n_results,
+                                    min_similarity=min_similarity,
+                                    # 벡터 DB에 여러 문서가 있어도 현재 문서 안에서만 검색
+                                    filters={'file_name': st.session_state.uploaded_file_name},
+                                    search_mode=search_mode,
+                                    diversity=diversity,
+                                    return_report=True
+                                )
+                                if mmr_report:
+                                    st.caption(f"중복 청크 제거: 문장 {mmr_report['sentences_saved']}개, "
+                                               f"테스트케이스 {'약 ' if mmr_report['estimated_sentences'] else ''}"
+                                               f"{mmr_report['testcases_saved']}개 절감")
+                            else:
+                                # 전체 문서 기반 테스트케이스 생성
+                                st.info("전체 문서 기반 테스트케이스 생성 중...")
+                                testcases = generate_testcases(
+                                    vector_db,
+                                    st.session_state.chunks
+                                )
                         
                         # 검증 절차
                         st.info("생성된 테스트케이스 검증 중...")
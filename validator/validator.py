@@ -2,9 +2,11 @@
 테스트케이스 검증 모듈: 생성된 테스트케이스의 품질 및 정확성 검증
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import re
 
+from processor.chunk_spans import DocumentText, chunks_document_text
+
 # 검증 프롬프트 템플릿
 VALIDATION_PROMPT = """
 당신은 테스트케이스 검증 전문가입니다.
@@ -71,17 +73,18 @@ class TestcaseValidator:
         """검증기 초기화"""
         pass
     
-    def validate_testcase(self, testcase: Dict[str, str], original_content: str) -> Dict[str, Any]:
+    def validate_testcase(self, testcase: Dict[str, str], original_content: Union[str, DocumentText]) -> Dict[str, Any]:
         """
         테스트케이스 검증
         
         Args:
             testcase: 검증할 테스트케이스
-            original_content: 원본 기획서 내용
+            original_content: 원본 기획서 내용 (문자열 또는 DocumentText)
             
         Returns:
             검증 결과
         """
+        original_content = original_content_text(original_content)
         # 테스트케이스 정보 추출
         major = testcase.get("대분류", "")
         medium = testcase.get("중분류", "")
@@ -205,17 +208,35 @@ class TestcaseValidator:
         
         return validation_result
 
-def validate_testcases(testcases: List[Dict[str, str]], original_content: str) -> List[Dict[str, Any]]:
+def original_content_text(original_content: Union[str, DocumentText, List[Any]]) -> str:
+    """
+    원본 기획서 내용을 문자열로 변환
+    
+    Args:
+        original_content: 문자열, 문서 텍스트(DocumentText) 또는 청크 목록(ChunkSpan/청크 dict)
+        
+    Returns:
+        원본 기획서 텍스트 (문서 텍스트 버퍼가 있으면 복사 없이 그대로 반환)
+    """
+    if isinstance(original_content, str):
+        return original_content
+    if isinstance(original_content, DocumentText):
+        return original_content.text
+    return chunks_document_text(original_content)
+
+def validate_testcases(testcases: List[Dict[str, str]],
+                       original_content: Union[str, DocumentText, List[Any]]) -> List[Dict[str, Any]]:
     """
     테스트케이스 목록 검증
     
     Args:
         testcases: 검증할 테스트케이스 목록
-        original_content: 원본 기획서 내용
+        original_content: 원본 기획서 내용 (문자열, DocumentText 또는 청크 목록)
         
     Returns:
         각 테스트케이스의 검증 결과
     """
+    original_content = original_content_text(original_content)
     validator = TestcaseValidator()
     validation_results = []
     